@@ -0,0 +1,129 @@
+# admin_panel/analytics.py - Grouped time-series queries for the admin charts
+
+from datetime import date, datetime, time, timedelta
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDay, TruncMonth
+from django.utils import timezone
+
+# Orders in these statuses count towards revenue
+REVENUE_STATUSES = ['PROCESSING', 'SHIPPED', 'DELIVERED']
+
+TRUNC_FUNCTIONS = {
+    'day': TruncDay,
+    'month': TruncMonth,
+}
+
+
+def revenue_sum(prefix='', **extra):
+    """Sum(quantity * price) over OrderItems; `prefix` lets Order querysets sum `items__...`"""
+    return Sum(
+        F(f'{prefix}quantity') * F(f'{prefix}price'),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+        **extra
+    )
+
+
+def start_of_day(day):
+    """Aware datetime for local midnight at the start of `day`"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def start_of_month(day):
+    return day.replace(day=1)
+
+
+def add_months(day, months):
+    """First day of the month `months` after (or before, if negative) `day`'s month"""
+    month_index = day.year * 12 + (day.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def iter_buckets(first, last, granularity):
+    """Yield every bucket date from `first` to `last` inclusive"""
+    current = first
+    while current <= last:
+        yield current
+        if granularity == 'month':
+            current = add_months(current, 1)
+        else:
+            current += timedelta(days=1)
+
+
+def _bucket_date(value):
+    """Trunc* returns aware datetimes when USE_TZ is on; reduce them to local dates"""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+def time_series(queryset, date_field, first, last, granularity='day', date_only=False, **aggregates):
+    """
+    Group `queryset` into day/month buckets with ONE query and zero-fill gaps.
+
+    `first` and `last` are local dates (for months, any day inside the month).
+    Pass date_only=True when `date_field` is a DateField rather than a
+    DateTimeField. Each keyword argument is an aggregate expression, e.g.
+    count=Count('id') or delivered=Count('id', filter=Q(status='DELIVERED')).
+
+    Returns a list of dicts: [{'bucket': date, <aggregate name>: value, ...}]
+    with one entry per bucket, in order.
+    """
+    if granularity not in TRUNC_FUNCTIONS:
+        raise ValueError(f'Unsupported granularity: {granularity}')
+    if not aggregates:
+        aggregates = {'count': Count('pk')}
+
+    if granularity == 'month':
+        first, last = start_of_month(first), start_of_month(last)
+        range_start, range_end = first, add_months(last, 1)
+    else:
+        range_start, range_end = first, last + timedelta(days=1)
+    if not date_only:
+        range_start, range_end = start_of_day(range_start), start_of_day(range_end)
+
+    rows = (
+        queryset
+        .filter(**{f'{date_field}__gte': range_start, f'{date_field}__lt': range_end})
+        .annotate(bucket=TRUNC_FUNCTIONS[granularity](date_field))
+        .values('bucket')
+        .annotate(**aggregates)
+        .order_by('bucket')
+    )
+
+    found = {}
+    for row in rows:
+        bucket = _bucket_date(row.pop('bucket'))
+        found[bucket] = row
+
+    series = []
+    for bucket in iter_buckets(first, last, granularity):
+        values = found.get(bucket, {})
+        entry = {'bucket': bucket}
+        for name in aggregates:
+            entry[name] = values.get(name) or 0
+        series.append(entry)
+    return series
+
+
+def last_n_days(days, today=None):
+    """(first, last) local dates covering the last `days` days including today"""
+    today = today or timezone.localdate()
+    return today - timedelta(days=days - 1), today
+
+
+def last_n_months(months, today=None):
+    """(first, last) month-start dates covering the last `months` months including this one"""
+    today = today or timezone.localdate()
+    this_month = start_of_month(today)
+    return add_months(this_month, -(months - 1)), this_month
+
+
+def growth_percentage(current, previous):
+    """Period-over-period growth, with the dashboard's 100% convention when there is no baseline"""
+    if previous > 0:
+        return ((current - previous) / previous) * 100
+    if current > 0:
+        return 100
+    return 0
@@ -0,0 +1,76 @@
+# admin_panel/counters.py - Status tile counts for the admin pages
+#
+# Every tile for a model comes from ONE aggregate(Count(..., filter=Q(...)))
+# query. Results can optionally be cached for a few seconds with
+# settings.ADMIN_STATUS_COUNTERS_TTL (0 disables caching).
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from store.models import Product, Order
+from services.models import ServiceRequest, JobSheet
+
+CACHE_KEY_PREFIX = 'admin_panel:status_counters'
+
+# name -> (model, {tile: filter}); an empty Q() counts every row
+COUNTER_GROUPS = {
+    'users': (get_user_model(), {
+        'total': Q(),
+        'customers': Q(role='CUSTOMER'),
+        'technicians': Q(role='TECHNICIAN'),
+    }),
+    'products': (Product, {
+        'total': Q(),
+        'active': Q(is_active=True),
+    }),
+    'orders': (Order, {
+        'total': Q(),
+        'pending': Q(status='PENDING'),
+        'processing': Q(status='PROCESSING'),
+        'delivered': Q(status='DELIVERED'),
+        'unassigned': Q(technician__isnull=True),
+    }),
+    'services': (ServiceRequest, {
+        'total': Q(),
+        'submitted': Q(status='SUBMITTED'),
+        'in_progress': Q(status='IN_PROGRESS'),
+        'completed': Q(status='COMPLETED'),
+        'unassigned': Q(technician__isnull=True),
+    }),
+    'job_sheets': (JobSheet, {
+        'total': Q(),
+        'pending': Q(approval_status='PENDING'),
+        'approved': Q(approval_status='APPROVED'),
+        'declined': Q(approval_status='DECLINED'),
+    }),
+}
+
+
+def _count(tile_filter):
+    if tile_filter:
+        return Count('pk', filter=tile_filter)
+    return Count('pk')
+
+
+def status_counters(name, ttl=None):
+    """
+    Return {tile: count} for one of COUNTER_GROUPS in a single query.
+    `ttl` overrides settings.ADMIN_STATUS_COUNTERS_TTL (seconds).
+    """
+    model, tiles = COUNTER_GROUPS[name]
+    if ttl is None:
+        ttl = getattr(settings, 'ADMIN_STATUS_COUNTERS_TTL', 0)
+
+    cache_key = f'{CACHE_KEY_PREFIX}:{name}'
+    if ttl:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    counts = model.objects.aggregate(**{tile: _count(tile_filter) for tile, tile_filter in tiles.items()})
+
+    if ttl:
+        cache.set(cache_key, counts, ttl)
+    return counts
@@ -0,0 +1,241 @@
+# admin_panel/exports.py - Streaming CSV / JSON Lines exports of the admin lists
+#
+# Each export is ONE values() query joining the rows with their children
+# (order line items, job sheet materials), read with .iterator(chunk_size=...)
+# - a server-side cursor on PostgreSQL - and written out as it arrives, so
+# memory stays flat however many rows match. Rows come back ordered by parent,
+# so the children of a parent are consecutive and can be grouped on the fly.
+#
+#   csv   - one line per child (parent columns repeated); parents without
+#           children get one line with empty child columns. Text cells that a
+#           spreadsheet would run as a formula are prefixed with ' (OWASP CSV injection)
+#   jsonl - one JSON object per parent with its children nested in a list
+
+import csv
+import json
+import zlib
+from itertools import groupby
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from services.models import JobSheet, ServiceRequest
+from store.models import Order
+from .filters import filter_job_sheets, filter_orders, filter_services
+
+EXPORT_CHUNK_SIZE = 2000
+# Bytes collected before a chunk is handed to the server
+BUFFER_SIZE = 64 * 1024
+FORMATS = ('csv', 'jsonl')
+
+
+class Dataset:
+    def __init__(self, name, model, filter_func, ordering, fields, children_key=None, child_fields=()):
+        self.name = name
+        self.model = model
+        self.filter_func = filter_func
+        self.ordering = ordering
+        # [(column name, values() lookup), ...]
+        self.fields = fields
+        self.children_key = children_key
+        self.child_fields = child_fields
+
+    def rows(self, params):
+        queryset = self.filter_func(self.model.objects.all(), params)
+        lookups = ['pk'] + [lookup for _, lookup in self.fields] + [lookup for _, lookup in self.child_fields]
+        # pk last in the ordering keeps each parent's rows together
+        ordering = list(self.ordering) + ['pk']
+        if self.child_fields:
+            ordering.append(self.child_fields[0][1])
+        return queryset.order_by(*ordering).values_list(*lookups).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    def records(self, params):
+        """(parent dict, [child dicts]) per parent, in export order"""
+        width = len(self.fields)
+        columns = [column for column, _ in self.fields]
+        child_columns = [column for column, _ in self.child_fields]
+        for _, group in groupby(self.rows(params), key=lambda row: row[0]):
+            children = []
+            for row in group:
+                parent = row[1:width + 1]
+                child = row[width + 1:]
+                # LEFT JOIN: a parent without children has one row of NULL child columns
+                if child and child[0] is not None:
+                    children.append(dict(zip(child_columns, child)))
+            yield dict(zip(columns, parent)), children
+
+
+DATASETS = {
+    'orders': Dataset(
+        'orders', Order, filter_orders, ['-order_date'],
+        fields=[
+            ('order_id', 'id'),
+            ('order_date', 'order_date'),
+            ('status', 'status'),
+            ('customer_name', 'customer__name'),
+            ('customer_email', 'customer__email'),
+            ('customer_phone', 'customer__phone'),
+            ('technician', 'technician__name'),
+            ('total_amount', 'total_amount'),
+            ('item_count', 'item_count'),
+            ('street_address', 'shipping_address__street_address'),
+            ('city', 'shipping_address__city'),
+            ('state', 'shipping_address__state'),
+            ('pincode', 'shipping_address__pincode'),
+        ],
+        children_key='items',
+        child_fields=[
+            ('item_id', 'items__id'),
+            ('product', 'items__product__name'),
+            ('product_slug', 'items__product__slug'),
+            ('quantity', 'items__quantity'),
+            ('price', 'items__price'),
+        ],
+    ),
+    'services': Dataset(
+        'services', ServiceRequest, filter_services, ['-request_date'],
+        fields=[
+            ('service_id', 'id'),
+            ('request_date', 'request_date'),
+            ('status', 'status'),
+            ('category', 'service_category__name'),
+            ('issue', 'issue__description'),
+            ('custom_description', 'custom_description'),
+            ('customer_name', 'customer__name'),
+            ('customer_email', 'customer__email'),
+            ('customer_phone', 'customer__phone'),
+            ('technician', 'technician__name'),
+            ('street_address', 'service_location__street_address'),
+            ('city', 'service_location__city'),
+            ('state', 'service_location__state'),
+            ('pincode', 'service_location__pincode'),
+            ('job_sheet_id', 'job_sheet__id'),
+            ('job_sheet_status', 'job_sheet__approval_status'),
+        ],
+    ),
+    'job_sheets': Dataset(
+        'job_sheets', JobSheet, filter_job_sheets, ['-created_at'],
+        fields=[
+            ('job_sheet_id', 'id'),
+            ('created_at', 'created_at'),
+            ('service_request_id', 'service_request_id'),
+            ('category', 'service_request__service_category__name'),
+            ('approval_status', 'approval_status'),
+            ('approved_at', 'approved_at'),
+            ('declined_reason', 'declined_reason'),
+            ('technician', 'created_by__name'),
+            ('customer_name', 'customer_name'),
+            ('customer_contact', 'customer_contact'),
+            ('service_address', 'service_address'),
+            ('equipment_type', 'equipment_type'),
+            ('equipment_brand', 'equipment_brand'),
+            ('equipment_model', 'equipment_model'),
+            ('serial_number', 'serial_number'),
+            ('problem_description', 'problem_description'),
+            ('work_performed', 'work_performed'),
+            ('date_of_service', 'date_of_service'),
+            ('start_time', 'start_time'),
+            ('finish_time', 'finish_time'),
+            ('total_time_taken', 'total_time_taken'),
+        ],
+        children_key='materials',
+        child_fields=[
+            ('material_id', 'materials__id'),
+            ('date_used', 'materials__date_used'),
+            ('item_description', 'materials__item_description'),
+            ('quantity', 'materials__quantity'),
+            ('unit_cost', 'materials__unit_cost'),
+            ('total_cost', 'materials__total_cost'),
+        ],
+    ),
+}
+
+
+# ==================== ENCODING ====================
+
+class _Echo:
+    """File-like object whose write() just returns the line, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+# A cell starting with one of these is a formula to Excel / Sheets
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Names, addresses and descriptions are user input
+        return "'" + value
+    return value
+
+
+def csv_lines(dataset, params):
+    writer = csv.writer(_Echo())
+    child_columns = [column for column, _ in dataset.child_fields]
+    yield writer.writerow([column for column, _ in dataset.fields] + child_columns)
+    for parent, children in dataset.records(params):
+        parent_cells = [_cell(value) for value in parent.values()]
+        for child in children or [dict.fromkeys(child_columns)]:
+            yield writer.writerow(parent_cells + [_cell(value) for value in child.values()])
+
+
+def jsonl_lines(dataset, params):
+    encoder = DjangoJSONEncoder()
+    for parent, children in dataset.records(params):
+        if dataset.children_key:
+            parent[dataset.children_key] = children
+        yield encoder.encode(parent) + '\n'
+
+
+def _buffered(lines):
+    """Join lines into ~BUFFER_SIZE byte chunks (one tiny chunk per row is slow to send)"""
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(dataset_name, params):
+    """
+    StreamingHttpResponse exporting `dataset_name` filtered like its list page.
+    params: export=csv|jsonl, gzip=1 for a .gz download, plus the page filters.
+    """
+    export_format = params.get('export', 'csv')
+    if export_format not in FORMATS:
+        return JsonResponse({'error': f'Unsupported export format "{export_format}"'}, status=400)
+
+    dataset = DATASETS[dataset_name]
+    lines = csv_lines(dataset, params) if export_format == 'csv' else jsonl_lines(dataset, params)
+    chunks = _buffered(lines)
+    filename = f'{dataset.name}-{timezone.localdate():%Y%m%d}.{export_format}'
+    content_type = 'text/csv; charset=utf-8' if export_format == 'csv' else 'application/x-ndjson'
+
+    if params.get('gzip') in ('1', 'true'):
+        chunks = _gzipped(chunks)
+        filename += '.gz'
+        content_type = 'application/gzip'
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,73 @@
+# admin_panel/filters.py - Filters shared by the admin list pages and their exports
+
+from django.db.models import Q
+
+
+def _technician(queryset, technician_filter, field='technician'):
+    if technician_filter == 'unassigned':
+        return queryset.filter(**{f'{field}__isnull': True})
+    if technician_filter:
+        return queryset.filter(**{f'{field}_id': technician_filter})
+    return queryset
+
+
+def filter_orders(queryset, params):
+    """Apply the orders page filters: status, technician (id or 'unassigned'), search"""
+    status_filter = params.get('status', '')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    queryset = _technician(queryset, params.get('technician', ''))
+
+    search = params.get('search', '')
+    if search:
+        queryset = queryset.filter(
+            Q(id__icontains=search) |
+            Q(customer__name__icontains=search) |
+            Q(customer__email__icontains=search)
+        )
+    return queryset
+
+
+def filter_services(queryset, params):
+    """Apply the services page filters: status, technician, category, search"""
+    status_filter = params.get('status', '')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+
+    queryset = _technician(queryset, params.get('technician', ''))
+
+    category_filter = params.get('category', '')
+    if category_filter:
+        queryset = queryset.filter(service_category_id=category_filter)
+
+    search = params.get('search', '')
+    if search:
+        queryset = queryset.filter(
+            Q(id__icontains=search) |
+            Q(customer__name__icontains=search) |
+            Q(customer__email__icontains=search) |
+            Q(custom_description__icontains=search)
+        )
+    return queryset
+
+
+def filter_job_sheets(queryset, params):
+    """Apply the job sheets page filters: approval, technician (creator), search"""
+    approval_filter = params.get('approval', '')
+    if approval_filter:
+        queryset = queryset.filter(approval_status=approval_filter)
+
+    technician_filter = params.get('technician', '')
+    if technician_filter:
+        queryset = queryset.filter(created_by_id=technician_filter)
+
+    search = params.get('search', '')
+    if search:
+        queryset = queryset.filter(
+            Q(id__icontains=search) |
+            Q(customer_name__icontains=search) |
+            Q(service_request__id__icontains=search) |
+            Q(equipment_type__icontains=search)
+        )
+    return queryset
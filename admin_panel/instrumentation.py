@@ -0,0 +1,293 @@
+# admin_panel/instrumentation.py - Per-endpoint query count / latency instrumentation
+#
+# Opt-in: QueryInstrumentationMiddleware disables itself unless
+# settings.QUERY_INSTRUMENTATION is on. For every request it records
+#   duration_ms     wall time of the request
+#   queries         DB queries executed (all database aliases)
+#   sql_ms          time spent inside those queries
+#   serializer_ms   time spent producing DRF serializer .data (includes the
+#                   queries lazy relations trigger while serializing)
+#   response_bytes  body size (None for streaming responses)
+# plus the SQL statements executed more than once in the same request - the
+# usual signature of an N+1 - keyed by the resolved URL name.
+#
+# Samples are aggregated in THIS process only; every server process keeps
+# its own numbers. Read them with the staff-only /admin-panel/api/instrumentation/
+# endpoint, or replay requests locally with `python manage.py query_report`.
+#
+# Works under WSGI and ASGI: queries are attributed through a context variable
+# by a wrapper installed on every connection, so ORM calls that async views run
+# in worker threads are counted against the request too.
+
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('duration_ms', 'queries', 'sql_ms', 'serializer_ms', 'response_bytes')
+PERCENTILES = (50, 95, 99)
+# Distinct duplicate-query signatures remembered per endpoint
+MAX_SIGNATURES = 100
+UNRESOLVED = '<unresolved>'
+
+_current = ContextVar('instrumentation_record', default=None)
+
+
+def enabled():
+    return getattr(settings, 'QUERY_INSTRUMENTATION', False)
+
+
+def sample_size():
+    return getattr(settings, 'QUERY_INSTRUMENTATION_SAMPLE_SIZE', 1000)
+
+
+class RequestRecord:
+    """Counters for one request, fed by the connection wrapper while it is current"""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.signatures = Counter()
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+            self.signatures[sql] += 1
+
+    def duplicates(self):
+        """{sql: times executed} for statements run more than once"""
+        return {sql: count for sql, count in self.signatures.items() if count > 1}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class EndpointStats:
+    def __init__(self, size):
+        self.count = 0
+        self.errors = 0
+        # Most recent samples only, so memory stays bounded
+        self.samples = deque(maxlen=size)
+        # sql -> [requests where it repeated, highest repeat count]
+        self.duplicates = {}
+
+    def add(self, sample, duplicates, status_code):
+        self.count += 1
+        if status_code >= 400:
+            self.errors += 1
+        self.samples.append(sample)
+        for sql, count in duplicates.items():
+            seen = self.duplicates.get(sql)
+            if seen is None:
+                if len(self.duplicates) >= MAX_SIGNATURES:
+                    continue
+                seen = self.duplicates[sql] = [0, 0]
+            seen[0] += 1
+            seen[1] = max(seen[1], count)
+
+    def summary(self, endpoint, top_duplicates=5):
+        result = {'endpoint': endpoint, 'requests': self.count, 'errors': self.errors, 'samples': len(self.samples)}
+        for metric in METRICS:
+            values = sorted(sample[metric] for sample in self.samples if sample[metric] is not None)
+            result[metric] = {f'p{pct}': percentile(values, pct) for pct in PERCENTILES}
+        worst = sorted(self.duplicates.items(), key=lambda item: (-item[1][0], -item[1][1]))[:top_duplicates]
+        result['duplicate_queries'] = [
+            {'sql': sql, 'requests': requests, 'max_repeats': repeats} for sql, (requests, repeats) in worst
+        ]
+        return result
+
+
+class Registry:
+    """Thread-safe per-endpoint aggregation for this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, sample, duplicates, status_code):
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats(sample_size())
+            stats.add(sample, duplicates, status_code)
+
+    def snapshot(self):
+        """Per-endpoint summaries, slowest p95 first"""
+        with self.lock:
+            summaries = [stats.summary(endpoint) for endpoint, stats in self.endpoints.items()]
+        return sorted(summaries, key=lambda row: -(row['duration_ms']['p95'] or 0))
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+registry = Registry()
+
+
+# ==================== QUERY WRAPPER ====================
+
+def _record_query(execute, sql, params, many, context):
+    record = _current.get()
+    if record is None:
+        return execute(sql, params, many, context)
+    return record(execute, sql, params, many, context)
+
+
+def _wrap_connection(sender=None, connection=None, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_query_wrapper():
+    """Count the queries of every connection, in any thread, against the current request"""
+    connection_created.connect(_wrap_connection, dispatch_uid='instrumentation_query_wrapper')
+    for connection in connections.all(initialized_only=True):
+        _wrap_connection(connection=connection)
+
+
+# ==================== SERIALIZER TIMING ====================
+
+_serializer_timer_installed = False
+
+
+def install_serializer_timer():
+    """Wrap BaseSerializer.data so the time spent in it is added to the current request"""
+    global _serializer_timer_installed
+    if _serializer_timer_installed:
+        return
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data.fget
+
+    def data(self):
+        record = _current.get()
+        # Nested .data calls are already inside the outer measurement
+        if record is None or record.serializer_depth:
+            return original(self)
+        record.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            record.serializer_time += time.perf_counter() - start
+            record.serializer_depth -= 1
+
+    BaseSerializer.data = property(data)
+    _serializer_timer_installed = True
+
+
+# ==================== MIDDLEWARE ====================
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match and match.view_name else UNRESOLVED
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.slow_ms = getattr(settings, 'QUERY_INSTRUMENTATION_SLOW_MS', 0)
+        self.slow_queries = getattr(settings, 'QUERY_INSTRUMENTATION_SLOW_QUERIES', 0)
+        install_query_wrapper()
+        install_serializer_timer()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        record = RequestRecord()
+        token = _current.set(record)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, record, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        record = RequestRecord()
+        token = _current.set(record)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, record, time.perf_counter() - start)
+        return response
+
+    def finish(self, request, response, record, duration):
+        endpoint = endpoint_name(request)
+        duplicates = record.duplicates()
+        sample = {
+            'duration_ms': round(duration * 1000, 2),
+            'queries': record.queries,
+            'sql_ms': round(record.sql_time * 1000, 2),
+            'serializer_ms': round(record.serializer_time * 1000, 2),
+            'response_bytes': None if response.streaming else len(response.content),
+        }
+        registry.record(endpoint, sample, duplicates, response.status_code)
+
+        if (self.slow_ms and sample['duration_ms'] >= self.slow_ms) or \
+                (self.slow_queries and sample['queries'] >= self.slow_queries):
+            logger.warning(
+                'Slow request %s %s (%s): %.1f ms, %d queries (%.1f ms SQL), %d repeated statements',
+                request.method, request.path, endpoint, sample['duration_ms'], sample['queries'],
+                sample['sql_ms'], len(duplicates)
+            )
+
+
+# ==================== REPORTING ====================
+
+def format_table(summaries):
+    """Plain-text p50/p95/p99 table of registry.snapshot() rows"""
+    headers = ['endpoint', 'reqs'] + [f'{metric} p50/p95/p99' for metric in METRICS] + ['dup sql']
+    rows = []
+    for summary in summaries:
+        row = [summary['endpoint'], str(summary['requests'])]
+        for metric in METRICS:
+            row.append('/'.join(_number(summary[metric][f'p{pct}']) for pct in PERCENTILES))
+        row.append(str(len(summary['duplicate_queries'])))
+        rows.append(row)
+
+    widths = [max(len(cell) for cell in column) for column in zip(headers, *rows)]
+    lines = ['  '.join(cell.ljust(width) for cell, width in zip(line, widths)) for line in [headers] + rows]
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(lines)
+
+
+def _number(value):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f'{value:.1f}'
+    return str(value)
@@ -0,0 +1,105 @@
+# admin_panel/management/commands/query_report.py
+# p50/p95/p99 query count / latency table per endpoint (see admin_panel.instrumentation)
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from admin_panel import instrumentation
+
+# The usual N+1 suspects: customer order history, the technician job feed, analytics
+DEFAULT_URL_NAMES = ['api_orders_list', 'api_technician_services', 'admin_panel:analytics']
+
+
+class Command(BaseCommand):
+    help = (
+        'Print per-endpoint query count / latency percentiles, either by replaying GET requests '
+        'in-process or from a snapshot saved from /admin-panel/api/instrumentation/'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--input',
+            help='JSON saved from the instrumentation endpoint (skips the replay)',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Path to request, may be repeated (default: orders list, technician feed, analytics)',
+        )
+        parser.add_argument(
+            '--user',
+            help='Email of the user the requests are made as (default: anonymous)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Requests per path (default: 20)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the raw summaries as JSON instead of a table',
+        )
+        parser.add_argument(
+            '--duplicates',
+            action='store_true',
+            help='Also list the statements repeated within a request',
+        )
+
+    def handle(self, *args, **options):
+        if options['input']:
+            summaries = self.load(options['input'])
+        else:
+            summaries = self.replay(options)
+
+        if options['json']:
+            self.stdout.write(json.dumps(summaries, indent=2))
+            return
+
+        if not summaries:
+            self.stdout.write('No requests recorded.')
+            return
+
+        self.stdout.write(instrumentation.format_table(summaries))
+        if options['duplicates']:
+            for summary in summaries:
+                if not summary['duplicate_queries']:
+                    continue
+                self.stdout.write(f"\n{summary['endpoint']}:")
+                for duplicate in summary['duplicate_queries']:
+                    self.stdout.write(
+                        f"  {duplicate['requests']} requests, up to {duplicate['max_repeats']}x: {duplicate['sql']}"
+                    )
+
+    def load(self, path):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+        return data['endpoints'] if isinstance(data, dict) else data
+
+    def replay(self, options):
+        paths = options['paths'] or [reverse(name) for name in DEFAULT_URL_NAMES]
+        client = Client(SERVER_NAME='localhost')
+        if options['user']:
+            user = get_user_model().objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f'No user with email {options["user"]}')
+            client.force_login(user)
+
+        instrumentation.registry.reset()
+        # The middleware reads the setting when the client builds its handler
+        with override_settings(QUERY_INSTRUMENTATION=True, QUERY_INSTRUMENTATION_SAMPLE_SIZE=max(options['repeat'], 1)):
+            for path in paths:
+                for _ in range(options['repeat']):
+                    client.get(path)
+        summaries = instrumentation.registry.snapshot()
+        instrumentation.registry.reset()
+        return summaries
@@ -0,0 +1,38 @@
+# admin_panel/management/commands/refresh_rollups.py
+# Incrementally rebuild the daily sales/service rollups (safe to run from cron)
+
+from django.core.management.base import BaseCommand
+from admin_panel.models import RollupState
+from admin_panel.rollups import refresh_rollup
+
+class Command(BaseCommand):
+    help = 'Refresh the DailySalesRollup / DailyServiceRollup tables from their high-water marks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rollup',
+            choices=[name for name, _ in RollupState.NAME_CHOICES],
+            help='Only refresh one rollup (default: all)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild the whole history instead of refreshing incrementally',
+        )
+        parser.add_argument(
+            '--overlap-days',
+            type=int,
+            default=1,
+            help='Days before the high-water mark to recompute on every run (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        names = [options['rollup']] if options['rollup'] else [name for name, _ in RollupState.NAME_CHOICES]
+
+        for name in names:
+            summary = refresh_rollup(name, full=options['full'], overlap_days=options['overlap_days'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{summary['rollup']}: rebuilt {summary['days']} days in {summary['runs']} runs "
+                f"({summary['rows']} rows, {summary['dirty_days']} dirty days), "
+                f"high-water mark {summary['high_water_mark']}"
+            ))
@@ -0,0 +1,53 @@
+# admin_panel/management/commands/sync_replica.py
+# Copy the sqlite primary into the sqlite replica file (local two-file replica setup)
+
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ecom_project.replica import REPLICA_ALIAS, SQLITE_SYNC_TABLE, replica_configured
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the sqlite database into the replica file (DB_REPLICA_NAME) and stamp it, '
+        'standing in for replication in local setups'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            help='Keep syncing every this many seconds (default: sync once)',
+        )
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('No replica configured; set DB_REPLICA_NAME.')
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[REPLICA_ALIAS]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('sync_replica only copies sqlite databases; a PostgreSQL replica is fed by replication.')
+
+        while True:
+            seconds = self.sync(primary, replica.settings_dict['NAME'])
+            self.stdout.write(self.style.SUCCESS(f'Replica synced in {seconds * 1000:.0f} ms'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self, primary, replica_name):
+        started = time.time()
+        primary.ensure_connection()
+        target = sqlite3.connect(replica_name)
+        try:
+            primary.connection.backup(target)
+            # Stamped with the start of the copy: the replica holds everything committed before it
+            target.execute(f'CREATE TABLE IF NOT EXISTS {SQLITE_SYNC_TABLE} (synced_at REAL NOT NULL)')
+            target.execute(f'DELETE FROM {SQLITE_SYNC_TABLE}')
+            target.execute(f'INSERT INTO {SQLITE_SYNC_TABLE} (synced_at) VALUES (?)', (started,))
+            target.commit()
+        finally:
+            target.close()
+        return time.time() - started
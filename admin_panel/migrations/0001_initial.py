@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('services', '0003_jobsheet_jobsheetmaterial'),
+        ('store', '0005_order_total_amount_order_item_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(choices=[('sales', 'Daily sales'), ('services', 'Daily services')], max_length=20, unique=True)),
+                ('high_water_mark', models.DateField()),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupDirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rollup', models.CharField(choices=[('sales', 'Daily sales'), ('services', 'Daily services')], max_length=20)),
+                ('day', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('rollup', 'day'), name='unique_rollup_dirty_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_rollups', to='store.productcategory')),
+            ],
+            options={
+                'ordering': ['day'],
+                'indexes': [models.Index(fields=['status', 'day'], name='admin_panel_status_eef914_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'status', 'category'), name='unique_daily_sales_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyServiceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('service_category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='services.servicecategory')),
+            ],
+            options={
+                'ordering': ['day'],
+                'indexes': [models.Index(fields=['status', 'day'], name='admin_panel_status_7c236b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'service_category', 'status'), name='unique_daily_service_rollup')],
+            },
+        ),
+    ]
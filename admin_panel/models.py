@@ -0,0 +1,89 @@
+# admin_panel/models.py - Pre-aggregated reporting tables for the admin dashboard
+
+from django.db import models
+
+
+class DailySalesRollup(models.Model):
+    """
+    Order item totals per day x order status x product category.
+    Built by the `refresh_rollups` management command.
+
+    order_count is the number of distinct orders with items in that
+    category, so summing it across categories over-counts mixed orders.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=20)
+    category = models.ForeignKey('store.ProductCategory', on_delete=models.CASCADE, related_name='sales_rollups')
+    order_count = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status', 'category'], name='unique_daily_sales_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status} {self.category_id}: ₹{self.revenue}"
+
+
+class DailyServiceRollup(models.Model):
+    """Service request counts per day x service category x status"""
+    day = models.DateField()
+    service_category = models.ForeignKey('services.ServiceCategory', on_delete=models.CASCADE, related_name='daily_rollups')
+    status = models.CharField(max_length=20)
+    request_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'service_category', 'status'], name='unique_daily_service_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.service_category_id} {self.status}: {self.request_count}"
+
+
+class RollupState(models.Model):
+    """
+    High-water mark per rollup. Days before `high_water_mark` are fully
+    materialized; that day and later are read live from the source tables.
+    """
+    SALES = 'sales'
+    SERVICES = 'services'
+    NAME_CHOICES = (
+        (SALES, 'Daily sales'),
+        (SERVICES, 'Daily services'),
+    )
+
+    name = models.CharField(max_length=20, choices=NAME_CHOICES, unique=True)
+    high_water_mark = models.DateField()
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} rollup up to {self.high_water_mark}"
+
+
+class RollupDirtyDay(models.Model):
+    """
+    A materialized day whose source rows changed (e.g. an old order changed
+    status) and must be recomputed on the next refresh.
+    """
+    rollup = models.CharField(max_length=20, choices=RollupState.NAME_CHOICES)
+    day = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rollup', 'day'], name='unique_rollup_dirty_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.rollup} {self.day}"
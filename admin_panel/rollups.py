@@ -0,0 +1,338 @@
+# admin_panel/rollups.py - Build and read the daily sales/service rollup tables
+#
+# Days before a rollup's high-water mark are read from the rollup table; the
+# high-water-mark day and later are read live from the source tables, so
+# reports stay exact between refreshes while the expensive history scan is
+# replaced by a small pre-aggregated table. Older days whose source rows
+# changed since they were built (RollupDirtyDay) are read live as well until
+# the next refresh rebuilds them.
+
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from django.db import router, transaction
+from django.db.models import Count, Q, Subquery, Sum, Value
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from store.models import Order, OrderItem
+from services.models import ServiceRequest
+from .analytics import REVENUE_STATUSES, revenue_sum, start_of_day, time_series
+from .models import DailySalesRollup, DailyServiceRollup, RollupState, RollupDirtyDay
+
+BULK_BATCH_SIZE = 1000
+
+
+# ==================== BUILDING ====================
+
+_seen = threading.local()
+
+
+def _first_time_in_transaction(keys):
+    """
+    The keys the current transaction hasn't handled yet, now recorded as
+    handled. A key is forgotten when the transaction commits, or when the
+    savepoint it was recorded in rolls back (with the rows written for it).
+    Outside a transaction every key is new.
+    """
+    connection = transaction.get_connection(router.db_for_write(RollupDirtyDay))
+    if not connection.in_atomic_block:
+        return set(keys)
+    # Each batch of keys is tied to an on_commit marker; Django drops the
+    # markers of rolled-back savepoints and clears them all on commit
+    pending = {callback for _, callback, _ in connection.run_on_commit}
+    seen = {key: marker for key, marker in getattr(_seen, 'keys', {}).items() if marker in pending}
+    new = set(keys) - seen.keys()
+    if new:
+        marker = lambda: None
+        transaction.on_commit(marker, using=connection.alias)
+        seen.update(dict.fromkeys(new, marker))
+    _seen.keys = seen
+    return new
+
+
+def _flag_dirty_days(rollup_days):
+    RollupDirtyDay.objects.bulk_create(
+        [RollupDirtyDay(rollup=rollup, day=day) for rollup, day in sorted(rollup_days)],
+        ignore_conflicts=True
+    )
+
+
+def mark_dirty(rollup, moment):
+    """
+    Flag the local day of `moment` for recomputation on the next refresh.
+
+    The row is written in the caller's transaction, so it commits (or rolls
+    back) with the change that made the day dirty; a day is written once
+    per transaction however many rows of it are saved.
+    """
+    if moment is None:
+        return
+    days = _first_time_in_transaction({('day', rollup, timezone.localdate(moment))})
+    if days:
+        _flag_dirty_days({(rollup, day) for _, rollup, day in days})
+
+
+def mark_order_dirty(order_id):
+    """mark_dirty() for a line item saved without its order loaded: one date lookup per order"""
+    if _first_time_in_transaction({('order', order_id)}):
+        order_date = Order.objects.filter(pk=order_id).values_list('order_date', flat=True).first()
+        mark_dirty(RollupState.SALES, order_date)
+
+
+def _contiguous_runs(days):
+    """Split a set of dates into sorted (first, last) runs of consecutive days"""
+    runs = []
+    for day in sorted(days):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+def _rebuild_sales(first, last):
+    DailySalesRollup.objects.filter(day__range=[first, last]).delete()
+
+    rows = OrderItem.objects.filter(
+        order__order_date__gte=start_of_day(first),
+        order__order_date__lt=start_of_day(last + timedelta(days=1)),
+    ).annotate(
+        day=TruncDate('order__order_date')
+    ).values(
+        'day', 'order__status', 'product__category'
+    ).annotate(
+        order_count=Count('order', distinct=True),
+        units=Sum('quantity'),
+        revenue=revenue_sum(),
+    ).order_by()
+
+    rollups = [
+        DailySalesRollup(
+            day=row['day'],
+            status=row['order__status'],
+            category_id=row['product__category'],
+            order_count=row['order_count'],
+            units=row['units'] or 0,
+            revenue=row['revenue'] or Decimal('0.00'),
+        )
+        for row in rows
+    ]
+    DailySalesRollup.objects.bulk_create(rollups, batch_size=BULK_BATCH_SIZE)
+    return len(rollups)
+
+
+def _rebuild_services(first, last):
+    DailyServiceRollup.objects.filter(day__range=[first, last]).delete()
+
+    rows = ServiceRequest.objects.filter(
+        request_date__gte=start_of_day(first),
+        request_date__lt=start_of_day(last + timedelta(days=1)),
+    ).annotate(
+        day=TruncDate('request_date')
+    ).values(
+        'day', 'service_category', 'status'
+    ).annotate(
+        request_count=Count('id'),
+    ).order_by()
+
+    rollups = [
+        DailyServiceRollup(
+            day=row['day'],
+            service_category_id=row['service_category'],
+            status=row['status'],
+            request_count=row['request_count'],
+        )
+        for row in rows
+    ]
+    DailyServiceRollup.objects.bulk_create(rollups, batch_size=BULK_BATCH_SIZE)
+    return len(rollups)
+
+
+ROLLUPS = {
+    RollupState.SALES: {
+        'rebuild': _rebuild_sales,
+        'model': DailySalesRollup,
+        'earliest': lambda: Order.objects.order_by('order_date').values_list('order_date', flat=True).first(),
+    },
+    RollupState.SERVICES: {
+        'rebuild': _rebuild_services,
+        'model': DailyServiceRollup,
+        'earliest': lambda: ServiceRequest.objects.order_by('request_date').values_list('request_date', flat=True).first(),
+    },
+}
+
+
+def refresh_rollup(name, full=False, overlap_days=1, today=None):
+    """
+    Incrementally refresh one rollup and return a summary dict.
+
+    Recomputes every day from (high-water mark - overlap_days) to today, plus
+    any older day flagged in RollupDirtyDay. Each day is deleted and rebuilt
+    as a whole, so re-running is always safe. With full=True (or on the
+    first run) the whole history is rebuilt.
+    """
+    config = ROLLUPS[name]
+    today = today or timezone.localdate()
+    state = RollupState.objects.filter(name=name).first()
+
+    # Claim dirty days first: a change committed after this point re-flags its day
+    with transaction.atomic():
+        dirty = list(RollupDirtyDay.objects.select_for_update().filter(rollup=name).values_list('id', 'day'))
+        RollupDirtyDay.objects.filter(id__in=[dirty_id for dirty_id, _ in dirty]).delete()
+    dirty_days = {day for _, day in dirty}
+
+    try:
+        with transaction.atomic():
+            if full or state is None:
+                earliest = config['earliest']()
+                first = timezone.localdate(earliest) if earliest else today
+                config['model'].objects.filter(day__lt=first).delete()
+            else:
+                first = state.high_water_mark - timedelta(days=overlap_days)
+
+            days = {first + timedelta(days=offset) for offset in range((today - first).days + 1)}
+            days |= {day for day in dirty_days if day <= today}
+
+            rows = 0
+            runs = _contiguous_runs(days)
+            for run_first, run_last in runs:
+                rows += config['rebuild'](run_first, run_last)
+
+            RollupState.objects.update_or_create(name=name, defaults={'high_water_mark': today})
+    except Exception:
+        # Put the claimed days back so the next run still picks them up
+        RollupDirtyDay.objects.bulk_create(
+            [RollupDirtyDay(rollup=name, day=day) for day in dirty_days],
+            ignore_conflicts=True
+        )
+        raise
+
+    return {
+        'rollup': name,
+        'days': len(days),
+        'runs': len(runs),
+        'rows': rows,
+        'dirty_days': len(dirty_days),
+        'high_water_mark': today,
+    }
+
+
+# ==================== READING ====================
+
+def _live_days(name):
+    """
+    (high-water mark, [dirty days before it]) in one query: the days reads
+    must take from the source tables. (None, []) if never built.
+    """
+    hwm = RollupState.objects.filter(name=name).values('high_water_mark')
+    rows = hwm.values_list('high_water_mark', Value(True)).union(
+        RollupDirtyDay.objects.filter(rollup=name, day__lt=Subquery(hwm)).values_list('day', Value(False)),
+        all=True
+    )
+    hwm, dirty_days = None, []
+    for day, is_hwm in rows:
+        if is_hwm:
+            hwm = day
+        else:
+            dirty_days.append(day)
+    return hwm, sorted(dirty_days)
+
+
+def _live_range(field, hwm, dirty_days):
+    """Source rows to read live: from the high-water mark on, plus the dirty days"""
+    condition = Q(**{f'{field}__gte': start_of_day(hwm)})
+    for first, last in _contiguous_runs(dirty_days):
+        condition |= Q(**{
+            f'{field}__gte': start_of_day(first),
+            f'{field}__lt': start_of_day(last + timedelta(days=1)),
+        })
+    return condition
+
+
+def revenue_for_periods(periods, statuses=REVENUE_STATUSES):
+    """
+    Revenue for several date windows at once.
+
+    `periods` maps a name to a (first_day, last_day) tuple of local dates;
+    either end may be None for an open range. Costs three queries in total
+    regardless of the number of periods or the size of the order history.
+    """
+    hwm, dirty_days = _live_days(RollupState.SALES)
+
+    def _in_period(prefix, first, last, to_moment):
+        condition = Q()
+        if first is not None:
+            condition &= Q(**{f'{prefix}__gte': to_moment(first)})
+        if last is not None:
+            condition &= Q(**{f'{prefix}__lt': to_moment(last + timedelta(days=1))})
+        return condition
+
+    totals = {name: Decimal('0.00') for name in periods}
+
+    live = OrderItem.objects.filter(order__status__in=statuses)
+    if hwm is not None:
+        rolled = DailySalesRollup.objects.filter(status__in=statuses, day__lt=hwm).exclude(day__in=dirty_days).aggregate(**{
+            name: Sum('revenue', filter=_in_period('day', first, last, lambda day: day))
+            for name, (first, last) in periods.items()
+        })
+        for name, value in rolled.items():
+            totals[name] += value or 0
+        live = live.filter(_live_range('order__order_date', hwm, dirty_days))
+
+    live_totals = live.aggregate(**{
+        name: revenue_sum(filter=_in_period('order__order_date', first, last, start_of_day))
+        for name, (first, last) in periods.items()
+    })
+    for name, value in live_totals.items():
+        totals[name] += value or 0
+
+    return totals
+
+
+def all_time_revenue(statuses=REVENUE_STATUSES):
+    """All-time revenue"""
+    return revenue_for_periods({'total': (None, None)}, statuses)['total']
+
+
+def _merge_series(*series_list):
+    """Add up several aligned time_series() results bucket by bucket"""
+    merged = [dict(entry) for entry in series_list[0]]
+    for series in series_list[1:]:
+        for target, entry in zip(merged, series):
+            for key, value in entry.items():
+                if key != 'bucket':
+                    target[key] += value
+    return merged
+
+
+def revenue_series(first, last, granularity='day', statuses=REVENUE_STATUSES):
+    """Revenue per day/month bucket: rollup history plus the live tail"""
+    hwm, dirty_days = _live_days(RollupState.SALES)
+    live = OrderItem.objects.filter(order__status__in=statuses)
+    series = []
+    if hwm is not None:
+        series.append(time_series(
+            DailySalesRollup.objects.filter(status__in=statuses, day__lt=hwm).exclude(day__in=dirty_days),
+            'day', first, last, granularity, date_only=True,
+            amount=Sum('revenue')
+        ))
+        live = live.filter(_live_range('order__order_date', hwm, dirty_days))
+    series.append(time_series(live, 'order__order_date', first, last, granularity, amount=revenue_sum()))
+    return _merge_series(*series)
+
+
+def service_request_series(first, last, granularity='day'):
+    """Service requests created per day/month bucket: rollup history plus the live tail"""
+    hwm, dirty_days = _live_days(RollupState.SERVICES)
+    live = ServiceRequest.objects.all()
+    series = []
+    if hwm is not None:
+        series.append(time_series(
+            DailyServiceRollup.objects.filter(day__lt=hwm).exclude(day__in=dirty_days),
+            'day', first, last, granularity, date_only=True,
+            count=Sum('request_count')
+        ))
+        live = live.filter(_live_range('request_date', hwm, dirty_days))
+    series.append(time_series(live, 'request_date', first, last, granularity, count=Count('id')))
+    return _merge_series(*series)
@@ -0,0 +1,29 @@
+# admin_panel/signals.py - Flag rollup days whose source rows changed (in the same transaction)
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from store.models import Order, OrderItem
+from services.models import ServiceRequest
+from .models import RollupState
+from .rollups import mark_dirty, mark_order_dirty
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def mark_order_day_dirty(sender, instance, **kwargs):
+    mark_dirty(RollupState.SALES, instance.order_date)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def mark_order_item_day_dirty(sender, instance, **kwargs):
+    if OrderItem.order.is_cached(instance):
+        mark_dirty(RollupState.SALES, instance.order.order_date)
+    else:
+        mark_order_dirty(instance.order_id)
+
+
+@receiver(post_save, sender=ServiceRequest)
+@receiver(post_delete, sender=ServiceRequest)
+def mark_service_day_dirty(sender, instance, **kwargs):
+    mark_dirty(RollupState.SERVICES, instance.request_date)
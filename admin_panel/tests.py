@@ -0,0 +1,220 @@
+import csv
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from store.models import Order, OrderItem, Product, ProductCategory
+from . import instrumentation
+from .analytics import last_n_days, start_of_day
+from .counters import CACHE_KEY_PREFIX, COUNTER_GROUPS, status_counters
+from .exports import DATASETS, csv_lines, jsonl_lines
+from .models import RollupDirtyDay, RollupState
+from .rollups import all_time_revenue, refresh_rollup, revenue_series
+
+
+class ExportTests(TestCase):
+    def test_csv_cells_that_start_a_formula_are_escaped(self):
+        customer = get_user_model().objects.create_user(
+            email='mallory@example.com', password='pass12345', name='=HYPERLINK("http://evil.example","x")'
+        )
+        category = ProductCategory.objects.create(name='Cables', slug='cables')
+        product = Product.objects.create(
+            category=category, name='@SUM(1+1)', slug='cable', description='-', price=Decimal('10.00'),
+            image='products/test.jpg', stock=5, delivery_time_info='2-3 days'
+        )
+        order = Order.objects.create(customer=customer, status='PENDING')
+        OrderItem.objects.create(order=order, product=product, quantity=2, price=product.price)
+
+        row, = csv.DictReader(csv_lines(DATASETS['orders'], {}))
+        self.assertEqual(row['customer_name'], '\'=HYPERLINK("http://evil.example","x")')
+        self.assertEqual(row['product'], "'@SUM(1+1)")
+        self.assertEqual((row['quantity'], row['product_slug']), ('2', 'cable'))
+
+        # JSON Lines is data, not a spreadsheet: values are exported as they are
+        self.assertIn('"customer_name": "=HYPERLINK', next(jsonl_lines(DATASETS['orders'], {})))
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.customer = get_user_model().objects.create_user(
+            email='rollup@example.com', password='pass12345', name='Rollup'
+        )
+        category = ProductCategory.objects.create(name='Phones', slug='phones')
+        self.product = Product.objects.create(
+            category=category, name='Phone', slug='phone', description='-', price=Decimal('250.00'),
+            image='products/test.jpg', stock=5, delivery_time_info='2-3 days'
+        )
+        self.day = timezone.localdate() - timedelta(days=5)
+
+    def _old_order(self, status):
+        order = Order.objects.create(customer=self.customer, status=status)
+        OrderItem.objects.create(order=order, product=self.product, quantity=2, price=self.product.price)
+        Order.objects.filter(pk=order.pk).update(order_date=timezone.now() - timedelta(days=5))
+        return Order.objects.get(pk=order.pk)
+
+    def test_days_are_flagged_once_in_the_writing_transaction(self):
+        order = self._old_order('PENDING')
+        RollupDirtyDay.objects.all().delete()
+        with CaptureQueriesContext(connection) as queries:
+            # On-commit callbacks are captured and never run
+            with self.captureOnCommitCallbacks(), transaction.atomic():
+                for status in ('PROCESSING', 'SHIPPED'):
+                    order.status = status
+                    order.save()
+                OrderItem.objects.create(order=order, product=self.product, quantity=1, price=self.product.price)
+                OrderItem.objects.filter(order=order).first().save()
+                # Written before commit: nothing is lost if the process dies after it
+                self.assertTrue(RollupDirtyDay.objects.filter(rollup=RollupState.SALES, day=self.day).exists())
+        flags = [query['sql'] for query in queries if query['sql'].startswith('INSERT OR IGNORE INTO "admin_panel_rollupdirtyday"')]
+        self.assertEqual(len(flags), 1)
+
+    def test_day_flagged_in_a_rolled_back_savepoint_is_flagged_again(self):
+        order = self._old_order('PENDING')
+        RollupDirtyDay.objects.all().delete()
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    order.status = 'PROCESSING'
+                    order.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.assertFalse(RollupDirtyDay.objects.exists())
+            order.status = 'SHIPPED'
+            order.save()
+        self.assertTrue(RollupDirtyDay.objects.filter(rollup=RollupState.SALES, day=self.day).exists())
+
+    def test_dirty_days_below_the_high_water_mark_are_read_live(self):
+        order = self._old_order('DELIVERED')
+        refresh_rollup(RollupState.SALES, full=True)
+        self.assertEqual(all_time_revenue(), Decimal('500.00'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'CANCELLED'
+            order.save()
+
+        self.assertEqual(all_time_revenue(), Decimal('0.00'))
+        series = revenue_series(self.day, self.day)
+        self.assertEqual([entry['amount'] for entry in series], [Decimal('0.00')])
+
+        # The refresh rebuilds the day, which is then read from the rollup again
+        refresh_rollup(RollupState.SALES)
+        self.assertFalse(RollupDirtyDay.objects.exists())
+        self.assertEqual(all_time_revenue(), Decimal('0.00'))
+
+
+@override_settings(QUERY_INSTRUMENTATION=True)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        caches[settings.CATALOG_CACHE_ALIAS].clear()
+        instrumentation.registry.reset()
+        self.addCleanup(instrumentation.registry.reset)
+
+    def test_requests_are_aggregated_per_endpoint(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/products/?page_size=5').status_code, 200)
+        self.client.get('/api/products/missing/')
+
+        summaries = {row['endpoint']: row for row in instrumentation.registry.snapshot()}
+        products = summaries['api_product_list']
+        self.assertEqual((products['requests'], products['errors'], products['samples']), (3, 0, 3))
+        # The first page is built (queries), the other two come from the catalog cache
+        self.assertEqual(products['queries']['p50'], 0)
+        self.assertGreater(products['queries']['p99'], 0)
+        self.assertGreater(products['response_bytes']['p99'], 0)
+        self.assertEqual(summaries['api_product_detail']['errors'], 1)
+
+    def test_repeated_statements_are_reported(self):
+        record = instrumentation.RequestRecord()
+        execute = lambda sql, params, many, context: None
+        for _ in range(3):
+            record(execute, 'SELECT 1', (), False, {})
+        record(execute, 'SELECT 2', (), False, {})
+        self.assertEqual((record.queries, record.duplicates()), (4, {'SELECT 1': 3}))
+
+
+class AdminProductSearchTests(TestCase):
+    def setUp(self):
+        category = ProductCategory.objects.create(name='Mobiles', slug='mobiles')
+        for name, slug, model_number in [
+            ('Galaxy Smartphone', 'galaxy', 'SM-A5560'),
+            ('Phone Stand', 'stand', 'PS-1'),
+            ('USB Cable', 'cable', 'UC-9'),
+        ]:
+            with self.captureOnCommitCallbacks(execute=True):
+                Product.objects.create(
+                    category=category, name=name, slug=slug, description='-', price=Decimal('10.00'),
+                    image='products/test.jpg', stock=5, delivery_time_info='2-3 days', model_number=model_number
+                )
+        self.client.force_login(get_user_model().objects.create_superuser(
+            email='admin@example.com', password='pass12345', name='Admin'
+        ))
+
+    def _search(self, term):
+        response = self.client.get('/admin-panel/products/', {'search': term})
+        return sorted(product.slug for product in response.context['products'])
+
+    def test_substrings_match_as_well_as_indexed_words(self):
+        self.assertEqual(self._search('phone'), ['galaxy', 'stand'])
+        self.assertEqual(self._search('a556'), ['galaxy'])
+        self.assertEqual(self._search('usb cab'), ['cable'])
+
+
+class StatusCounterTests(TestCase):
+    # Tiles of the dashboard; the orders page shows the 'orders' group
+    DASHBOARD_GROUPS = ['users', 'products', 'orders', 'services']
+
+    def setUp(self):
+        caches['default'].delete_many([f'{CACHE_KEY_PREFIX}:{name}' for name in COUNTER_GROUPS])
+        User = get_user_model()
+        customer = User.objects.create_user(email='counts@example.com', password='pass12345', name='Counts')
+        technician = User.objects.create_user(
+            email='tech@example.com', password='pass12345', name='Tech', role='TECHNICIAN'
+        )
+        for status, assigned in [('PENDING', False), ('PENDING', True), ('PROCESSING', False), ('DELIVERED', True)]:
+            Order.objects.create(customer=customer, status=status, technician=technician if assigned else None)
+
+    def test_one_query_per_group(self):
+        with self.assertNumQueries(1):
+            counts = status_counters('orders', ttl=0)
+        self.assertEqual(counts, {'total': 4, 'pending': 2, 'processing': 1, 'delivered': 1, 'unassigned': 2})
+
+        with self.assertNumQueries(len(self.DASHBOARD_GROUPS)):
+            for name in self.DASHBOARD_GROUPS:
+                status_counters(name, ttl=0)
+
+    def test_cached_counts_match_the_uncached_ones(self):
+        for name in COUNTER_GROUPS:
+            with self.subTest(group=name):
+                uncached = status_counters(name, ttl=0)
+                self.assertEqual(status_counters(name, ttl=60), uncached)
+                with self.assertNumQueries(0):
+                    self.assertEqual(status_counters(name, ttl=60), uncached)
+
+
+class AnalyticsCustomerGrowthTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.client.force_login(User.objects.create_superuser(
+            email='admin@example.com', password='pass12345', name='Admin'
+        ))
+        first_day, _ = last_n_days(7)
+        for email, joined in [
+            ('boundary@example.com', start_of_day(first_day)),
+            ('previous@example.com', start_of_day(first_day - timedelta(days=3))),
+        ]:
+            customer = User.objects.create_user(email=email, password='pass12345', name='Customer')
+            User.objects.filter(pk=customer.pk).update(date_joined=joined)
+
+    def test_boundary_day_counts_in_the_current_period_only(self):
+        response = self.client.get('/admin-panel/analytics/', {'days': 7})
+        self.assertEqual(response.context['total_customers'], 2)
+        # One customer in each period
+        self.assertEqual(response.context['customer_growth'], 0)
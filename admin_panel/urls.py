@@ -51,6 +51,9 @@ urlpatterns = [
     path('api/assign-service-technician/', views.assign_service_technician_api, name='api_assign_service_technician'),
     path('api/update-order-status/', views.update_order_status_api, name='api_update_order_status'),
     path('api/update-service-status/', views.update_service_status_api, name='api_update_service_status'),
+    path('api/import-products/', views.import_products_api, name='api_import_products'),
+    path('api/instrumentation/', views.instrumentation_api, name='api_instrumentation'),
+    path('api/instrumentation/reset/', views.reset_instrumentation_api, name='api_instrumentation_reset'),
 
     # Job Sheets management
     path('job-sheets/', views.AdminJobSheetsView.as_view(), name='job_sheets'),
@@ -8,6 +8,7 @@ from django.views.generic import TemplateView
 from django.http import JsonResponse
 from django.contrib.auth import get_user_model
 from django.db.models import Count, Sum, Avg, Q, F, DecimalField
+from django.db.models.functions import Coalesce
 from django.core.paginator import Paginator
 from django.contrib import messages
 from django.views.decorators.http import require_POST
@@ -16,13 +17,27 @@ from django.utils.text import slugify
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.db import transaction
+import csv
 import json
 from datetime import datetime, timedelta
 from django.utils import timezone
 import os
 
+from jobs.queue import enqueue
+from notifications.outbox import notify
+from ecom_project.replica import ReplicaReadMixin, read_from_replica
+
+from . import instrumentation
+from .analytics import time_series, start_of_day, last_n_days, last_n_months, growth_percentage
+from .counters import status_counters
+from .exports import export_response
+from .filters import filter_job_sheets, filter_orders, filter_services
+from .rollups import all_time_revenue, revenue_for_periods, revenue_series, service_request_series
+
 # Import models
 from store.models import Product, ProductCategory, Order, OrderItem, ProductImage, ProductSpecification
+from store.importer import detect_format, import_products, read_rows, text_stream, unique_slug
+from store.search import search_product_ids, substring_q
 from services.models import ServiceRequest, ServiceCategory, TechnicianRating, ServiceIssue
 from users.models import CustomUser
 from users.forms import CustomUserCreationForm
@@ -30,8 +45,11 @@ from django.views.decorators.http import require_http_methods
 
 User = get_user_model()
 
+# Matched by substring in the admin product search, on top of the full-text index
+ADMIN_SUBSTRING_FIELDS = ['name', 'brand', 'model_number']
+
 @method_decorator(staff_member_required, name='dispatch')
-class AdminDashboardView(TemplateView):
+class AdminDashboardView(ReplicaReadMixin, TemplateView):
     template_name = 'admin_panel/dashboard.html'
     
     def get_context_data(self, **kwargs):
@@ -42,19 +60,23 @@ class AdminDashboardView(TemplateView):
         current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
         
-        # Basic stats - ALL REAL DATA
+        # Basic stats - one conditional-aggregate query per table
+        users = status_counters('users')
+        products = status_counters('products')
+        orders = status_counters('orders')
+        services = status_counters('services')
         context.update({
-            'total_users': User.objects.count(),
-            'total_customers': User.objects.filter(role='CUSTOMER').count(),
-            'total_technicians': User.objects.filter(role='TECHNICIAN').count(),
-            'total_products': Product.objects.count(),
-            'active_products': Product.objects.filter(is_active=True).count(),
-            'total_orders': Order.objects.count(),
-            'pending_orders': Order.objects.filter(status='PENDING').count(),
-            'unassigned_orders': Order.objects.filter(technician__isnull=True).count(),
-            'total_services': ServiceRequest.objects.count(),
-            'pending_services': ServiceRequest.objects.filter(status='SUBMITTED').count(),
-            'unassigned_services': ServiceRequest.objects.filter(technician__isnull=True).count(),
+            'total_users': users['total'],
+            'total_customers': users['customers'],
+            'total_technicians': users['technicians'],
+            'total_products': products['total'],
+            'active_products': products['active'],
+            'total_orders': orders['total'],
+            'pending_orders': orders['pending'],
+            'unassigned_orders': orders['unassigned'],
+            'total_services': services['total'],
+            'pending_services': services['submitted'],
+            'unassigned_services': services['unassigned'],
         })
         
         # Recent orders - REAL DATA
@@ -65,29 +87,25 @@ class AdminDashboardView(TemplateView):
             'customer', 'technician', 'service_category'
         ).order_by('-request_date')[:10]
         
-        # Monthly revenue - REAL DATA (calculated from OrderItems)
+        # Monthly revenue - read from the daily sales rollup plus today's live tail
         try:
-            current_month_revenue_data = OrderItem.objects.filter(
-                order__order_date__gte=current_month_start,
-                order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
-            ).aggregate(
-                total=Sum(F('quantity') * F('price'), output_field=DecimalField())
+            current_month_revenue = float(
+                revenue_for_periods({'month': (current_month_start.date(), None)})['month']
             )
-            current_month_revenue = float(current_month_revenue_data['total'] or 0)
         except:
             current_month_revenue = 0
         
         context['current_month_revenue'] = current_month_revenue
         
-        # Top technicians by rating - REAL DATA
+        # Top technicians by rating - read from the pre-aggregated TechnicianStats rows
         context['top_technicians'] = User.objects.filter(
             role='TECHNICIAN'
         ).annotate(
-            avg_rating=Avg('ratings_received__rating'),
-            total_orders=Count('assigned_orders'),
-            total_services=Count('assigned_services'),
-            total_jobs=Count('assigned_orders') + Count('assigned_services')
-        ).order_by('-avg_rating')[:5]
+            avg_rating=F('technician_stats__average_rating'),
+            total_orders=Coalesce('technician_stats__total_orders', 0),
+            total_services=Coalesce('technician_stats__total_services', 0),
+            total_jobs=Coalesce('technician_stats__total_orders', 0) + Coalesce('technician_stats__total_services', 0)
+        ).order_by(F('avg_rating').desc(nulls_last=True), 'id')[:5]
         
         return context
 
@@ -147,10 +165,11 @@ class AdminProductsView(View):
             products = products.filter(is_active=False)
         
         if search:
+            # Full-text index lookup (store.search), plus substring matches the
+            # index can't make ("phone" in "smartphone", part of a model number)
             products = products.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(brand__icontains=search)
+                Q(id__in=search_product_ids(search, limit=None, active_only=False)) |
+                substring_q(search, fields=ADMIN_SUBSTRING_FIELDS)
             )
         
         products = products.order_by('-created_at')
@@ -209,13 +228,8 @@ class AdminCreateProductView(View):
                     messages.error(request, 'Invalid category selected')
                     return redirect('admin_panel:create_product')
                 
-                # Create slug
-                slug = slugify(name)
-                original_slug = slug
-                counter = 1
-                while Product.objects.filter(slug=slug).exists():
-                    slug = f"{original_slug}-{counter}"
-                    counter += 1
+                # Create slug (first free name / name-N, in one query)
+                slug = unique_slug(name)
                 
                 # Create product
                 product = Product.objects.create(
@@ -311,10 +325,10 @@ class AdminEditProductView(View):
                     category = get_object_or_404(ProductCategory, id=category_id)
                     product.category = category
                 
-                # Handle new main image
+                # Handle new main image (the old file is deleted by a job after commit)
                 if 'new_main_image' in request.FILES:
                     if product.image:
-                        product.image.delete()
+                        enqueue('store.delete_files', paths=[product.image.name])
                     product.image = request.FILES['new_main_image']
                 
                 product.save()
@@ -487,35 +501,19 @@ class AdminDeleteUserView(View):
 @method_decorator(staff_member_required, name='dispatch')
 class AdminOrdersView(View):
     def get(self, request):
+        # ?export=csv|jsonl streams every matching order instead of one page
+        if request.GET.get('export'):
+            return export_response('orders', request.GET)
+
         status_filter = request.GET.get('status', '')
         technician_filter = request.GET.get('technician', '')
         search = request.GET.get('search', '')
         
         orders = Order.objects.select_related('customer', 'technician', 'shipping_address').prefetch_related('items__product')
+        orders = filter_orders(orders, request.GET).order_by('-order_date')
         
-        if status_filter:
-            orders = orders.filter(status=status_filter)
-        
-        if technician_filter == 'unassigned':
-            orders = orders.filter(technician__isnull=True)
-        elif technician_filter:
-            orders = orders.filter(technician_id=technician_filter)
-        
-        if search:
-            orders = orders.filter(
-                Q(id__icontains=search) |
-                Q(customer__name__icontains=search) |
-                Q(customer__email__icontains=search)
-            )
-        
-        orders = orders.order_by('-order_date')
-        
-        # REAL STATS
-        all_orders = Order.objects.all()
-        pending_count = all_orders.filter(status='PENDING').count()
-        unassigned_count = all_orders.filter(technician__isnull=True).count()
-        processing_count = all_orders.filter(status='PROCESSING').count()
-        completed_count = all_orders.filter(status='DELIVERED').count()
+        # REAL STATS - single conditional-aggregate query
+        order_counts = status_counters('orders')
         
         paginator = Paginator(orders, 20)
         page_number = request.GET.get('page')
@@ -528,10 +526,10 @@ class AdminOrdersView(View):
             'status_filter': status_filter,
             'technician_filter': technician_filter,
             'search': search,
-            'pending_count': pending_count,
-            'unassigned_count': unassigned_count,
-            'processing_count': processing_count,
-            'completed_count': completed_count,
+            'pending_count': order_counts['pending'],
+            'unassigned_count': order_counts['unassigned'],
+            'processing_count': order_counts['processing'],
+            'completed_count': order_counts['delivered'],
         }
         
         return render(request, 'admin_panel/orders.html', context)
@@ -606,6 +604,9 @@ class AdminAssignTechnicianView(View):
 @method_decorator(staff_member_required, name='dispatch')
 class AdminServicesView(View):
     def get(self, request):
+        if request.GET.get('export'):
+            return export_response('services', request.GET)
+
         status_filter = request.GET.get('status', '')
         technician_filter = request.GET.get('technician', '')
         category_filter = request.GET.get('category', '')
@@ -615,34 +616,10 @@ class AdminServicesView(View):
         services = ServiceRequest.objects.select_related(
             'customer', 'technician', 'service_category', 'service_location'
         ).prefetch_related('job_sheet')  # ADD THIS
+        services = filter_services(services, request.GET).order_by('-request_date')
         
-        if status_filter:
-            services = services.filter(status=status_filter)
-        
-        if technician_filter == 'unassigned':
-            services = services.filter(technician__isnull=True)
-        elif technician_filter:
-            services = services.filter(technician_id=technician_filter)
-        
-        if category_filter:
-            services = services.filter(service_category_id=category_filter)
-        
-        if search:
-            services = services.filter(
-                Q(id__icontains=search) |
-                Q(customer__name__icontains=search) |
-                Q(customer__email__icontains=search) |
-                Q(custom_description__icontains=search)
-            )
-        
-        services = services.order_by('-request_date')
-        
-        # REAL STATS - NOT MOCK DATA
-        all_services = ServiceRequest.objects.all()
-        submitted_count = all_services.filter(status='SUBMITTED').count()
-        unassigned_count = all_services.filter(technician__isnull=True).count()
-        in_progress_count = all_services.filter(status='IN_PROGRESS').count()
-        completed_count = all_services.filter(status='COMPLETED').count()
+        # REAL STATS - single conditional-aggregate query
+        service_counts = status_counters('services')
         
         paginator = Paginator(services, 20)
         page_number = request.GET.get('page')
@@ -658,10 +635,10 @@ class AdminServicesView(View):
             'category_filter': category_filter,
             'search': search,
             # REAL STATS
-            'submitted_count': submitted_count,
-            'unassigned_count': unassigned_count,
-            'in_progress_count': in_progress_count,
-            'completed_count': completed_count,
+            'submitted_count': service_counts['submitted'],
+            'unassigned_count': service_counts['unassigned'],
+            'in_progress_count': service_counts['in_progress'],
+            'completed_count': service_counts['completed'],
         }
         
         return render(request, 'admin_panel/services.html', context)
@@ -940,126 +917,80 @@ class AdminDeleteCategoryView(View):
 
 # ==================== ANALYTICS (FULLY CONNECTED WITH REAL DATA) ====================
 @method_decorator(staff_member_required, name='dispatch')
-class AdminAnalyticsView(TemplateView):
+class AdminAnalyticsView(ReplicaReadMixin, TemplateView):
     template_name = 'admin_panel/analytics.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         # Get date range from query params (default 30 days)
-        days = int(self.request.GET.get('days', 30))
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # Previous period for comparison
-        previous_start = start_date - timedelta(days=days)
-        previous_end = start_date
+        try:
+            days = max(1, int(self.request.GET.get('days', 30)))
+        except ValueError:
+            days = 30
+        first_day, last_day = last_n_days(days)
+        previous_first_day = first_day - timedelta(days=days)
+        previous_last_day = first_day - timedelta(days=1)
         
-        # Current period data
-        current_orders = Order.objects.filter(order_date__range=[start_date, end_date])
-        previous_orders = Order.objects.filter(order_date__range=[previous_start, previous_end])
+        end_date = timezone.now()
+        start_date = start_of_day(first_day)
+        previous_start = start_of_day(previous_first_day)
         
-        # Calculate revenue from order items (REAL DATA)
-        current_revenue_data = OrderItem.objects.filter(
-            order__order_date__range=[start_date, end_date],
-            order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
+        # Current vs previous order counts and current status split - one query
+        status_counts = {
+            f'status_{code}': Count('id', filter=Q(order_date__gte=start_date, status=code))
+            for code, _ in Order.STATUS_CHOICES
+        }
+        order_stats = Order.objects.filter(
+            order_date__range=[previous_start, end_date]
         ).aggregate(
-            total=Sum(F('quantity') * F('price'), output_field=DecimalField())
+            current=Count('id', filter=Q(order_date__gte=start_date)),
+            previous=Count('id', filter=Q(order_date__lt=start_date)),
+            **status_counts
         )
-        current_revenue = float(current_revenue_data['total'] or 0)
+        current_order_count = order_stats['current']
+        previous_order_count = order_stats['previous']
         
-        previous_revenue_data = OrderItem.objects.filter(
-            order__order_date__range=[previous_start, previous_end],
-            order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
-        ).aggregate(
-            total=Sum(F('quantity') * F('price'), output_field=DecimalField())
-        )
-        previous_revenue = float(previous_revenue_data['total'] or 0)
+        # Revenue for both periods from the sales rollup (+ live tail)
+        revenue_stats = revenue_for_periods({
+            'current': (first_day, last_day),
+            'previous': (previous_first_day, previous_last_day),
+        })
+        current_revenue = float(revenue_stats['current'])
+        previous_revenue = float(revenue_stats['previous'])
         
         # Calculate growth percentages
-        revenue_growth = 0
-        if previous_revenue > 0:
-            revenue_growth = ((current_revenue - previous_revenue) / previous_revenue) * 100
-        elif current_revenue > 0:
-            revenue_growth = 100
-        
-        order_growth = 0
-        if previous_orders.count() > 0:
-            order_growth = ((current_orders.count() - previous_orders.count()) / previous_orders.count()) * 100
-        elif current_orders.count() > 0:
-            order_growth = 100
+        revenue_growth = growth_percentage(current_revenue, previous_revenue)
+        order_growth = growth_percentage(current_order_count, previous_order_count)
         
         # Average order value
-        avg_order_value = current_revenue / current_orders.count() if current_orders.count() > 0 else 0
-        prev_avg_order_value = previous_revenue / previous_orders.count() if previous_orders.count() > 0 else 0
-        
-        aov_growth = 0
-        if prev_avg_order_value > 0:
-            aov_growth = ((avg_order_value - prev_avg_order_value) / prev_avg_order_value) * 100
-        elif avg_order_value > 0:
-            aov_growth = 100
-        
-        # Customer growth
-        current_customers = User.objects.filter(
-            role='CUSTOMER',
-            date_joined__range=[start_date, end_date]
-        ).count()
-        
-        previous_customers = User.objects.filter(
-            role='CUSTOMER',
-            date_joined__range=[previous_start, previous_end]
-        ).count()
-        
-        customer_growth = 0
-        if previous_customers > 0:
-            customer_growth = ((current_customers - previous_customers) / previous_customers) * 100
-        elif current_customers > 0:
-            customer_growth = 100
-        
-        # Monthly revenue data for chart (last 12 months) - REAL DATA
-        monthly_revenue = []
-        for i in range(11, -1, -1):
-            month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0) - timedelta(days=30*i)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
-            
-            revenue_data = OrderItem.objects.filter(
-                order__order_date__range=[month_start, month_end],
-                order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
-            ).aggregate(
-                total=Sum(F('quantity') * F('price'), output_field=DecimalField())
-            )
-            revenue = float(revenue_data['total'] or 0)
-            
-            monthly_revenue.append({
-                'month': month_start.strftime('%b %y'),
-                'amount': revenue
-            })
-        
-        # Daily orders for last 30 days - REAL DATA
-        daily_orders = []
-        for i in range(29, -1, -1):
-            day = timezone.now().date() - timedelta(days=i)
-            day_start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
-            day_end = timezone.make_aware(datetime.combine(day, datetime.max.time()))
-            
-            count = Order.objects.filter(order_date__range=[day_start, day_end]).count()
-            daily_orders.append({
-                'day': day.strftime('%m/%d'),
-                'count': count
-            })
-        
-        # Daily services for last 30 days - REAL DATA
-        daily_services = []
-        for i in range(29, -1, -1):
-            day = timezone.now().date() - timedelta(days=i)
-            day_start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
-            day_end = timezone.make_aware(datetime.combine(day, datetime.max.time()))
-            
-            count = ServiceRequest.objects.filter(request_date__range=[day_start, day_end]).count()
-            daily_services.append({
-                'day': day.strftime('%m/%d'),
-                'count': count
-            })
+        avg_order_value = current_revenue / current_order_count if current_order_count > 0 else 0
+        prev_avg_order_value = previous_revenue / previous_order_count if previous_order_count > 0 else 0
+        aov_growth = growth_percentage(avg_order_value, prev_avg_order_value)
+        
+        # Customer growth - one query for totals and both periods
+        customer_stats = User.objects.filter(role='CUSTOMER').aggregate(
+            total=Count('id'),
+            current=Count('id', filter=Q(date_joined__range=[start_date, end_date])),
+            previous=Count('id', filter=Q(date_joined__gte=previous_start, date_joined__lt=start_date)),
+        )
+        customer_growth = growth_percentage(customer_stats['current'], customer_stats['previous'])
+        
+        # Monthly revenue data for chart (last 12 months) - from the sales rollup
+        monthly_revenue = [
+            {'month': row['bucket'].strftime('%b %y'), 'amount': float(row['amount'])}
+            for row in revenue_series(*last_n_months(12), granularity='month')
+        ]
+        
+        # Daily orders / services for last 30 days - one grouped query each
+        daily_orders = [
+            {'day': row['bucket'].strftime('%m/%d'), 'count': row['count']}
+            for row in time_series(Order.objects.all(), 'order_date', *last_n_days(30))
+        ]
+        daily_services = [
+            {'day': row['bucket'].strftime('%m/%d'), 'count': row['count']}
+            for row in service_request_series(*last_n_days(30))
+        ]
         
         # Top products by sales - REAL DATA
         top_products = OrderItem.objects.filter(
@@ -1069,17 +1000,11 @@ class AdminAnalyticsView(TemplateView):
             total_sales=Sum(F('quantity') * F('price'), output_field=DecimalField())
         ).order_by('-total_sales')[:5]
         
-        # Order status distribution - REAL DATA
-        total_orders_count = Order.objects.filter(order_date__range=[start_date, end_date]).count()
+        # Order status distribution - from the aggregate above
         order_status_distribution = []
-        
         for status_code, status_name in Order.STATUS_CHOICES:
-            count = Order.objects.filter(
-                order_date__range=[start_date, end_date],
-                status=status_code
-            ).count()
-            
-            percentage = (count / total_orders_count * 100) if total_orders_count > 0 else 0
+            count = order_stats[f'status_{status_code}']
+            percentage = (count / current_order_count * 100) if current_order_count > 0 else 0
             
             if count > 0:
                 order_status_distribution.append({
@@ -1177,11 +1102,11 @@ class AdminAnalyticsView(TemplateView):
             # Summary stats - ALL REAL
             'total_revenue': current_revenue,
             'revenue_growth': revenue_growth,
-            'total_orders': current_orders.count(),
+            'total_orders': current_order_count,
             'order_growth': order_growth,
             'avg_order_value': avg_order_value,
             'aov_growth': aov_growth,
-            'total_customers': User.objects.filter(role='CUSTOMER').count(),
+            'total_customers': customer_stats['total'],
             'customer_growth': customer_growth,
             
             # Chart data (JSON serialized) - ALL REAL
@@ -1204,21 +1129,18 @@ class AdminSettingsView(TemplateView):
 
 # ==================== API VIEWS FOR AJAX ====================
 @staff_member_required
+@read_from_replica
 def admin_stats_api(request):
     """API endpoint for dashboard stats - REAL DATA"""
     try:
-        # Calculate real revenue from OrderItems
-        revenue_data = OrderItem.objects.filter(
-            order__status__in=['PROCESSING', 'SHIPPED', 'DELIVERED']
-        ).aggregate(
-            total=Sum(F('quantity') * F('price'), output_field=DecimalField())
-        )
-        total_revenue = float(revenue_data['total'] or 0)
+        # All-time revenue from the daily sales rollup (+ live tail)
+        total_revenue = float(all_time_revenue())
         
+        order_counts = status_counters('orders')
         stats = {
-            'total_users': User.objects.count(),
-            'total_orders': Order.objects.count(),
-            'pending_orders': Order.objects.filter(status='PENDING').count(),
+            'total_users': status_counters('users')['total'],
+            'total_orders': order_counts['total'],
+            'pending_orders': order_counts['pending'],
             'total_revenue': total_revenue,
         }
         return JsonResponse(stats)
@@ -1234,12 +1156,9 @@ def get_order_details_api(request, order_id):
             id=order_id
         )
         
-        # Calculate total from OrderItems
         items_data = []
-        total_amount = 0
         for item in order.items.all():
             item_total = float(item.price) * item.quantity
-            total_amount += item_total
             items_data.append({
                 'product_name': item.product.name,
                 'quantity': item.quantity,
@@ -1250,7 +1169,7 @@ def get_order_details_api(request, order_id):
         order_data = {
             'id': order.id,
             'status': order.status,
-            'total_amount': str(total_amount),
+            'total_amount': str(order.total_amount),
             'order_date': order.order_date.strftime('%B %d, %Y at %I:%M %p'),
             'customer': {
                 'name': order.customer.name,
@@ -1286,10 +1205,15 @@ def assign_technician_api(request):
         order = get_object_or_404(Order, id=order_id)
         technician = get_object_or_404(User, id=technician_id, role='TECHNICIAN')
         
-        order.technician = technician
-        if order.status == 'PENDING':
-            order.status = 'PROCESSING'
-        order.save()
+        with transaction.atomic():
+            order.technician = technician
+            if order.status == 'PENDING':
+                order.status = 'PROCESSING'
+            order.save()
+
+            # Sent in the background by the notifications dispatcher
+            notify(order.customer, 'order_technician_assigned', order_id=order.id, technician=technician.name)
+            notify(technician, 'order_assigned', order_id=order.id)
         
         return JsonResponse({'success': True, 'message': 'Technician assigned successfully'})
     
@@ -1307,14 +1231,54 @@ def update_order_status_api(request):
         status = data.get('status')
         
         order = get_object_or_404(Order, id=order_id)
-        order.status = status
-        order.save()
+        previous_status = order.status
+        with transaction.atomic():
+            order.status = status
+            order.save()
+
+            if order.status != previous_status:
+                notify(order.customer, 'order_status', order_id=order.id, status=order.get_status_display())
         
         return JsonResponse({'success': True, 'message': 'Order status updated successfully'})
     
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
+@staff_member_required
+@require_POST
+@csrf_exempt
+def import_products_api(request):
+    """Bulk create/update products from an uploaded CSV or JSONL file (see store.importer)"""
+    upload = request.FILES.get('file')
+    if not upload:
+        return JsonResponse({'success': False, 'error': 'No file uploaded'}, status=400)
+
+    dry_run = request.POST.get('dry_run') in ('1', 'true')
+    try:
+        rows = read_rows(text_stream(upload.file), detect_format(upload.name))
+        report = import_products(rows, dry_run=dry_run)
+    except (UnicodeDecodeError, csv.Error) as e:
+        return JsonResponse({'success': False, 'error': f'Could not read {upload.name}: {e}'}, status=400)
+
+    return JsonResponse({'success': True, 'dry_run': dry_run, **report.as_dict()})
+
+@staff_member_required
+def instrumentation_api(request):
+    """Per-endpoint query/latency percentiles collected by this server process"""
+    return JsonResponse({
+        'enabled': instrumentation.enabled(),
+        'sample_size': instrumentation.sample_size(),
+        'endpoints': instrumentation.registry.snapshot(),
+    })
+
+@staff_member_required
+@require_POST
+@csrf_exempt
+def reset_instrumentation_api(request):
+    """Forget the stats collected so far (this process only)"""
+    instrumentation.registry.reset()
+    return JsonResponse({'success': True})
+
 @staff_member_required
 @require_POST
 @csrf_exempt
@@ -1360,6 +1324,9 @@ def assign_service_technician_api(request):
 @method_decorator(staff_member_required, name='dispatch')
 class AdminJobSheetsView(View):
     def get(self, request):
+        if request.GET.get('export'):
+            return export_response('job_sheets', request.GET)
+
         # Get filter parameters
         approval_filter = request.GET.get('approval', '')
         technician_filter = request.GET.get('technician', '')
@@ -1372,28 +1339,10 @@ class AdminJobSheetsView(View):
             'service_request__service_category',
             'created_by'
         ).prefetch_related('materials')
+        job_sheets = filter_job_sheets(job_sheets, request.GET).order_by('-created_at')
         
-        if approval_filter:
-            job_sheets = job_sheets.filter(approval_status=approval_filter)
-        
-        if technician_filter:
-            job_sheets = job_sheets.filter(created_by_id=technician_filter)
-        
-        if search:
-            job_sheets = job_sheets.filter(
-                Q(id__icontains=search) |
-                Q(customer_name__icontains=search) |
-                Q(service_request__id__icontains=search) |
-                Q(equipment_type__icontains=search)
-            )
-        
-        job_sheets = job_sheets.order_by('-created_at')
-        
-        # REAL STATS
-        all_job_sheets = JobSheet.objects.all()
-        pending_count = all_job_sheets.filter(approval_status='PENDING').count()
-        approved_count = all_job_sheets.filter(approval_status='APPROVED').count()
-        declined_count = all_job_sheets.filter(approval_status='DECLINED').count()
+        # REAL STATS - single conditional-aggregate query
+        job_sheet_counts = status_counters('job_sheets')
         
         # Pagination
         paginator = Paginator(job_sheets, 20)
@@ -1407,10 +1356,10 @@ class AdminJobSheetsView(View):
             'approval_filter': approval_filter,
             'technician_filter': technician_filter,
             'search': search,
-            'pending_count': pending_count,
-            'approved_count': approved_count,
-            'declined_count': declined_count,
-            'total_count': all_job_sheets.count(),
+            'pending_count': job_sheet_counts['pending'],
+            'approved_count': job_sheet_counts['approved'],
+            'declined_count': job_sheet_counts['declined'],
+            'total_count': job_sheet_counts['total'],
         }
         
         return render(request, 'admin_panel/job_sheets.html', context)
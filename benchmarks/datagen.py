@@ -0,0 +1,344 @@
+# benchmarks/datagen.py - Deterministic benchmark dataset
+#
+# generate(scale) bulk-inserts a catalogue, customers, orders and service
+# history sized FULL_SIZE * scale (scale=1: 100k products, 1M order items,
+# 200k service requests with their job sheets). The same seed and scale always
+# produce the same rows. Everything generated is recognisable (BENCH_SLUG_PREFIX,
+# BENCH_EMAIL_DOMAIN, BENCH_NAME_PREFIX) so clear() can remove it again.
+#
+# bulk_create skips save() and signals, so the denormalised data they would
+# maintain (order totals, job sheet durations, material totals) is computed
+# here, and the search index, rollups and technician stats are rebuilt at the end.
+
+import random
+from contextlib import contextmanager
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from admin_panel.models import RollupState
+from admin_panel.rollups import refresh_rollup
+from services.models import JobSheet, JobSheetMaterial, ServiceCategory, ServiceIssue, ServiceRequest
+from services.technician_stats import refresh_technician_stats
+from store.cache import bump, product_namespaces
+from store.models import Address, Order, OrderItem, Product, ProductCategory, ProductSpecification
+from store.search import rebuild_index
+
+BENCH_SLUG_PREFIX = 'bench-'
+BENCH_EMAIL_DOMAIN = 'bench.techverse.local'
+BENCH_NAME_PREFIX = 'Bench '
+BENCH_PASSWORD = 'bench-password'
+
+# Row counts at scale=1
+FULL_SIZE = {
+    'categories': 20,
+    'products': 100_000,
+    'customers': 20_000,
+    'technicians': 200,
+    'orders': 300_000,
+    'order_items': 1_000_000,
+    'service_categories': 10,
+    'service_requests': 200_000,
+}
+SPECS_PER_PRODUCT = 3
+ISSUES_PER_SERVICE_CATEGORY = 5
+# Generated history spreads over this many days before now
+HISTORY_DAYS = 365
+BATCH_SIZE = 2000
+
+ORDER_STATUSES = ['PENDING', 'PROCESSING', 'SHIPPED', 'DELIVERED', 'DELIVERED', 'DELIVERED', 'CANCELLED']
+SERVICE_STATUSES = ['SUBMITTED', 'ASSIGNED', 'IN_PROGRESS', 'COMPLETED', 'COMPLETED', 'CANCELLED']
+BRANDS = ['Dell', 'HP', 'Lenovo', 'Asus', 'Acer', 'Apple', 'Samsung', 'Logitech', 'Intel', 'AMD']
+SPEC_VALUES = {
+    'RAM': ['8GB', '16GB', '32GB', '64GB'],
+    'Storage': ['256GB SSD', '512GB SSD', '1TB SSD', '2TB HDD'],
+    'Processor': ['Core i5', 'Core i7', 'Ryzen 5', 'Ryzen 7', 'M2'],
+}
+EQUIPMENT = ['Laptop', 'Desktop', 'Printer', 'Router', 'Monitor']
+
+
+# Lookup tables keep their size at every scale
+UNSCALED = {'categories', 'service_categories'}
+
+
+def sizes_for(scale):
+    return {
+        name: count if name in UNSCALED else max(int(count * scale), 1)
+        for name, count in FULL_SIZE.items()
+    }
+
+
+def bench_email(role, number):
+    return f'{role}-{number}@{BENCH_EMAIL_DOMAIN}'
+
+
+# The users the load driver and the query budgets log in as
+CUSTOMER_EMAIL = bench_email('customer', 0)
+TECHNICIAN_EMAIL = bench_email('technician', 0)
+ADMIN_EMAIL = bench_email('admin', 0)
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Let bulk_create keep the dates we set on auto_now_add fields"""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _batches(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Generator:
+    def __init__(self, scale=0.01, seed=0, stdout=None):
+        self.sizes = sizes_for(scale)
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.stdout = stdout
+        self.counts = {}
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def past(self):
+        return self.now - timedelta(seconds=self.random.randint(0, HISTORY_DAYS * 86400))
+
+    def run(self):
+        with transaction.atomic():
+            self.users()
+            self.catalogue()
+            self.orders()
+            self.services()
+        self.log('Rebuilding search index, rollups and technician stats...')
+        rebuild_index()
+        for name, _ in RollupState.NAME_CHOICES:
+            refresh_rollup(name, full=True)
+        refresh_technician_stats()
+        bump(*product_namespaces(category_slugs=self.category_slugs))
+        return self.counts
+
+    # ---------------- users ----------------
+
+    def users(self):
+        User = get_user_model()
+        password = make_password(BENCH_PASSWORD)
+
+        def user(role, number, **extra):
+            return User(
+                email=bench_email(role.lower(), number), name=f'{BENCH_NAME_PREFIX}{role.title()} {number}',
+                phone=f'9{number:09d}', role=role, password=password, **extra
+            )
+
+        User.objects.bulk_create([user('ADMIN', 0, is_staff=True, is_superuser=True)])
+        technicians = [user('TECHNICIAN', n) for n in range(self.sizes['technicians'])]
+        customers = [user('CUSTOMER', n) for n in range(self.sizes['customers'])]
+        for batch in _batches(technicians + customers):
+            User.objects.bulk_create(batch)
+
+        self.technician_ids = list(User.objects.filter(
+            email__endswith=f'@{BENCH_EMAIL_DOMAIN}', role='TECHNICIAN'
+        ).order_by('pk').values_list('pk', flat=True))
+        self.customer_ids = list(User.objects.filter(
+            email__endswith=f'@{BENCH_EMAIL_DOMAIN}', role='CUSTOMER'
+        ).order_by('pk').values_list('pk', flat=True))
+
+        addresses = [
+            Address(user_id=customer_id, street_address=f'{n} Benchmark Street', city='Bengaluru',
+                    state='Karnataka', pincode=f'{560000 + n % 100:06d}', is_default=True)
+            for n, customer_id in enumerate(self.customer_ids)
+        ]
+        for batch in _batches(addresses):
+            Address.objects.bulk_create(batch)
+        self.address_ids = dict(Address.objects.filter(
+            user_id__in=self.customer_ids
+        ).values_list('user_id', 'pk'))
+
+        self.counts.update(users=len(technicians) + len(customers) + 1, addresses=len(addresses))
+        self.log(f'Users: {self.counts["users"]}')
+
+    # ---------------- catalogue ----------------
+
+    def catalogue(self):
+        categories = ProductCategory.objects.bulk_create([
+            ProductCategory(name=f'{BENCH_NAME_PREFIX}Category {n}', slug=f'{BENCH_SLUG_PREFIX}category-{n}')
+            for n in range(self.sizes['categories'])
+        ])
+        category_ids = [category.pk for category in categories]
+        self.category_slugs = [category.slug for category in categories]
+
+        self.products = []  # (pk, price)
+        for start in range(0, self.sizes['products'], BATCH_SIZE):
+            batch = []
+            for n in range(start, min(start + BATCH_SIZE, self.sizes['products'])):
+                brand = self.random.choice(BRANDS)
+                batch.append(Product(
+                    category_id=self.random.choice(category_ids), name=f'{brand} Bench Product {n}',
+                    slug=f'{BENCH_SLUG_PREFIX}product-{n}', description=f'Benchmark product {n} by {brand}.',
+                    price=Decimal(self.random.randint(500, 200000)) / 100, image='products/bench.jpg',
+                    stock=self.random.randint(0, 500), delivery_time_info='2-3 business days',
+                    brand=brand, model_number=f'BM-{n}', features='Fast, Reliable, Compact',
+                    is_featured=n % 50 == 0, is_active=n % 20 != 0,
+                ))
+            created = Product.objects.bulk_create(batch)
+            ProductSpecification.objects.bulk_create([
+                ProductSpecification(product_id=product.pk, name=name, value=self.random.choice(values), order=order)
+                for product in created
+                for order, (name, values) in enumerate(list(SPEC_VALUES.items())[:SPECS_PER_PRODUCT])
+            ])
+            self.products.extend((product.pk, product.price) for product in created)
+
+        self.counts.update(categories=len(category_ids), products=len(self.products))
+        self.log(f'Products: {len(self.products)}')
+
+    # ---------------- orders ----------------
+
+    def orders(self):
+        total_orders, total_items = self.sizes['orders'], self.sizes['order_items']
+        items_created = 0
+        order_field = Order._meta.get_field('order_date')
+
+        with explicit_dates(order_field):
+            for start in range(0, total_orders, BATCH_SIZE):
+                batch_orders, batch_lines = [], []
+                for n in range(start, min(start + BATCH_SIZE, total_orders)):
+                    # Spread the items evenly: order n ends at item (n + 1) * items / orders
+                    line_count = max((n + 1) * total_items // total_orders - n * total_items // total_orders, 1)
+                    lines = []
+                    for _ in range(line_count):
+                        product_id, price = self.random.choice(self.products)
+                        lines.append((product_id, self.random.randint(1, 3), price))
+                    customer_id = self.random.choice(self.customer_ids)
+                    status = self.random.choice(ORDER_STATUSES)
+                    batch_orders.append(Order(
+                        customer_id=customer_id, status=status, order_date=self.past(),
+                        shipping_address_id=self.address_ids.get(customer_id),
+                        technician_id=self.random.choice(self.technician_ids) if status != 'PENDING' else None,
+                        total_amount=sum(price * quantity for _, quantity, price in lines),
+                        item_count=len(lines),
+                    ))
+                    batch_lines.append(lines)
+
+                created = Order.objects.bulk_create(batch_orders)
+                items = [
+                    OrderItem(order_id=order.pk, product_id=product_id, quantity=quantity, price=price)
+                    for order, lines in zip(created, batch_lines)
+                    for product_id, quantity, price in lines
+                ]
+                for batch in _batches(items):
+                    OrderItem.objects.bulk_create(batch)
+                items_created += len(items)
+
+        self.counts.update(orders=total_orders, order_items=items_created)
+        self.log(f'Orders: {total_orders} ({items_created} items)')
+
+    # ---------------- services ----------------
+
+    def services(self):
+        categories = ServiceCategory.objects.bulk_create([
+            ServiceCategory(name=f'{BENCH_NAME_PREFIX}Service {n}') for n in range(self.sizes['service_categories'])
+        ])
+        issues = ServiceIssue.objects.bulk_create([
+            ServiceIssue(category_id=category.pk, description=f'Issue {n} of {category.name}',
+                         price=Decimal(self.random.randint(200, 5000)))
+            for category in categories for n in range(ISSUES_PER_SERVICE_CATEGORY)
+        ])
+
+        request_field = ServiceRequest._meta.get_field('request_date')
+        sheet_field = JobSheet._meta.get_field('created_at')
+        total = self.sizes['service_requests']
+        sheets_created = materials_created = 0
+
+        with explicit_dates(request_field, sheet_field):
+            for start in range(0, total, BATCH_SIZE):
+                requests = []
+                for _ in range(start, min(start + BATCH_SIZE, total)):
+                    issue = self.random.choice(issues)
+                    customer_id = self.random.choice(self.customer_ids)
+                    status = self.random.choice(SERVICE_STATUSES)
+                    requests.append(ServiceRequest(
+                        customer_id=customer_id, service_category_id=issue.category_id, issue_id=issue.pk,
+                        service_location_id=self.address_ids.get(customer_id), status=status,
+                        technician_id=self.random.choice(self.technician_ids) if status != 'SUBMITTED' else None,
+                        request_date=self.past(),
+                    ))
+                created = ServiceRequest.objects.bulk_create(requests)
+
+                # Every request has a job sheet, written by its technician (or the first one)
+                sheets, sheet_materials = [], []
+                for request in created:
+                    start_time = time(self.random.randint(8, 15), self.random.choice([0, 15, 30, 45]))
+                    hours = self.random.randint(1, 3)
+                    finish_time = time(start_time.hour + hours, start_time.minute)
+                    approval = self.random.choice(['PENDING', 'APPROVED', 'APPROVED', 'DECLINED'])
+                    sheets.append(JobSheet(
+                        service_request_id=request.pk, customer_name=f'Customer {request.customer_id}',
+                        customer_contact=f'9{request.customer_id:09d}', service_address='1 Benchmark Street, Bengaluru',
+                        equipment_type=self.random.choice(EQUIPMENT), equipment_brand=self.random.choice(BRANDS),
+                        problem_description='Does not power on.', work_performed='Replaced the faulty part.',
+                        date_of_service=request.request_date.date(), start_time=start_time, finish_time=finish_time,
+                        total_time_taken=timedelta(hours=hours), approval_status=approval,
+                        approved_at=request.request_date + timedelta(days=1) if approval == 'APPROVED' else None,
+                        created_by_id=request.technician_id or self.technician_ids[0],
+                        created_at=request.request_date,
+                    ))
+                    sheet_materials.append([
+                        (f'Part {n}', Decimal(self.random.randint(1, 3)), Decimal(self.random.randint(100, 3000)))
+                        for n in range(self.random.randint(0, 2))
+                    ])
+                created_sheets = JobSheet.objects.bulk_create(sheets)
+                materials = [
+                    JobSheetMaterial(job_sheet_id=sheet.pk, date_used=sheet.date_of_service, item_description=name,
+                                     quantity=quantity, unit_cost=unit_cost, total_cost=quantity * unit_cost)
+                    for sheet, lines in zip(created_sheets, sheet_materials)
+                    for name, quantity, unit_cost in lines
+                ]
+                JobSheetMaterial.objects.bulk_create(materials)
+                sheets_created += len(created_sheets)
+                materials_created += len(materials)
+
+        self.counts.update(
+            service_categories=len(categories), service_requests=total,
+            job_sheets=sheets_created, job_sheet_materials=materials_created,
+        )
+        self.log(f'Service requests: {total} ({sheets_created} job sheets)')
+
+
+def generate(scale=0.01, seed=0, stdout=None):
+    """Insert the benchmark dataset; returns {table: rows created}"""
+    return Generator(scale=scale, seed=seed, stdout=stdout).run()
+
+
+def exists():
+    return get_user_model().objects.filter(email=CUSTOMER_EMAIL).exists()
+
+
+def clear():
+    """Delete everything generate() created"""
+    User = get_user_model()
+    bench_users = User.objects.filter(email__endswith=f'@{BENCH_EMAIL_DOMAIN}')
+    category_slugs = list(ProductCategory.objects.filter(
+        slug__startswith=BENCH_SLUG_PREFIX
+    ).values_list('slug', flat=True))
+    with transaction.atomic():
+        # Orders only SET_NULL their customer, so they go first
+        Order.objects.filter(customer__in=bench_users).delete()
+        bench_users.delete()
+        Product.objects.filter(slug__startswith=BENCH_SLUG_PREFIX).delete()
+        ProductCategory.objects.filter(slug__startswith=BENCH_SLUG_PREFIX).delete()
+        ServiceCategory.objects.filter(name__startswith=BENCH_NAME_PREFIX).delete()
+    rebuild_index()
+    for name, _ in RollupState.NAME_CHOICES:
+        refresh_rollup(name, full=True)
+    refresh_technician_stats()
+    bump(*product_namespaces(category_slugs=category_slugs))
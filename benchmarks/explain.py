@@ -0,0 +1,154 @@
+# benchmarks/explain.py - EXPLAIN the queries behind the hot views and flag full scans
+#
+# Each target view is requested once as a benchmark user (see datagen), every
+# query it runs is captured with its parameters, and the slowest ones are
+# re-run under EXPLAIN. A plan step that reads a whole table instead of going
+# through an index is flagged:
+#   sqlite      "SCAN <table>" without "USING [COVERING] INDEX"
+#   postgresql  a "Seq Scan" node
+# Small lookup tables (SMALL_TABLES) are expected to be scanned and ignored.
+#
+# PostgreSQL prefers sequential scans on small tables even when a usable index
+# exists, so plans are taken with enable_seqscan off by default: a Seq Scan
+# left in the plan then means no index can serve the query at all.
+
+import json
+import time
+
+from django.db import connection, transaction
+from django.urls import reverse
+
+from store.cache import catalog_cache
+from .datagen import ADMIN_EMAIL, CUSTOMER_EMAIL, TECHNICIAN_EMAIL
+from .load import client_for
+
+# (url name, user email, query string)
+TARGETS = [
+    ('api_product_list', None, ''),
+    ('api_product_list', None, 'category=bench-category-0'),
+    ('api_orders_list', CUSTOMER_EMAIL, ''),
+    ('api_technician_orders', TECHNICIAN_EMAIL, ''),
+    ('api_technician_services', TECHNICIAN_EMAIL, ''),
+    ('api_technician_stats', TECHNICIAN_EMAIL, ''),
+    ('admin_panel:dashboard', ADMIN_EMAIL, ''),
+    ('admin_panel:orders', ADMIN_EMAIL, ''),
+    ('admin_panel:orders', ADMIN_EMAIL, 'status=PENDING'),
+    ('admin_panel:orders', ADMIN_EMAIL, 'technician=unassigned'),
+    ('admin_panel:services', ADMIN_EMAIL, 'status=SUBMITTED'),
+    ('admin_panel:job_sheets', ADMIN_EMAIL, 'approval=PENDING'),
+    ('admin_panel:analytics', ADMIN_EMAIL, ''),
+]
+
+# Lookup tables small enough that a full scan is the right plan
+SMALL_TABLES = {
+    'django_content_type', 'django_site', 'auth_permission', 'store_productcategory',
+    'services_servicecategory', 'services_serviceissue', 'admin_panel_rollupstate',
+}
+
+
+class QueryRecorder:
+    """execute_wrapper collecting (sql, params, seconds) of single-statement queries"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not many and sql.lstrip().upper().startswith('SELECT'):
+                self.queries.append((sql, params, time.perf_counter() - start))
+
+
+def capture(url_name, email=None, query_string=''):
+    """Request the view once (after a warm-up) and return its SELECTs, slowest first"""
+    client = client_for(email)
+    path = reverse(url_name) + (f'?{query_string}' if query_string else '')
+    client.get(path)
+    # Catalog responses would come from the cache the warm-up filled
+    catalog_cache().clear()
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        client.get(path)
+
+    # The same statement with the same parameters is explained once
+    unique = {}
+    for sql, params, seconds in recorder.queries:
+        key = (sql, tuple(params or ()))
+        if key not in unique or unique[key][2] < seconds:
+            unique[key] = (sql, params, seconds)
+    return sorted(unique.values(), key=lambda query: -query[2])
+
+
+def _sqlite_plan(cursor, sql, params):
+    cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+    steps = [row[-1] for row in cursor.fetchall()]
+    scans = []
+    for step in steps:
+        words = step.split()
+        if words[:1] == ['SCAN'] and 'INDEX' not in step and len(words) > 1:
+            # "SCAN store_order", "SCAN CONSTANT ROW", "SCAN (subquery-1)"
+            table = words[1]
+            if table not in SMALL_TABLES and table != 'CONSTANT' and not table.startswith('('):
+                scans.append(table)
+    return steps, scans
+
+
+def _postgresql_plan(cursor, sql, params, strict):
+    if strict:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    steps, scans = [], []
+
+    def walk(node, depth=0):
+        relation = node.get('Relation Name')
+        steps.append('  ' * depth + node['Node Type'] + (f' on {relation}' if relation else ''))
+        if node['Node Type'] == 'Seq Scan' and relation not in SMALL_TABLES:
+            scans.append(relation)
+        for child in node.get('Plans', []):
+            walk(child, depth + 1)
+
+    walk(plan[0]['Plan'])
+    return steps, scans
+
+
+def explain(sql, params, strict=True):
+    """(plan steps, [tables read with a full scan])"""
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            return _postgresql_plan(cursor, sql, params, strict)
+        if connection.vendor == 'sqlite':
+            return _sqlite_plan(cursor, sql, params)
+        cursor.execute('EXPLAIN ' + sql, params)
+        return [' '.join(str(value) for value in row) for row in cursor.fetchall()], []
+
+
+def advise(targets=TARGETS, top=5, strict=True):
+    """
+    [{view, query_string, queries, checked: [{sql, ms, plan, scans}]}] - the `top`
+    slowest queries of every target with their plans and flagged scans.
+    """
+    report = []
+    for url_name, email, query_string in targets:
+        queries = capture(url_name, email, query_string)
+        checked = []
+        for sql, params, seconds in queries[:top]:
+            plan, scans = explain(sql, params, strict=strict)
+            checked.append({
+                'sql': sql,
+                'ms': round(seconds * 1000, 2),
+                'plan': plan,
+                'scans': sorted(set(scans)),
+            })
+        report.append({
+            'view': url_name,
+            'query_string': query_string,
+            'queries': len(queries),
+            'checked': checked,
+        })
+    return report
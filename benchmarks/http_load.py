@@ -0,0 +1,171 @@
+# benchmarks/http_load.py - Load test a running server over HTTP (WSGI vs ASGI workers)
+#
+# benchmarks.load drives views in-process; this drives a real server instead,
+# e.g. gunicorn sync workers against uvicorn workers serving the async views,
+# with `concurrency` clients on one event loop (so the load generator isn't
+# the bottleneck). Connections are kept alive when the server allows it; sync
+# gunicorn workers close them after every response and are reconnected.
+#
+# With the server's PID, the resident memory of the server and all its worker
+# processes is reported too (Linux /proc), so setups can be compared at the
+# same memory budget: requests_per_second_per_gb normalizes throughput by it.
+
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from admin_panel.instrumentation import percentile
+
+
+class HTTPError(Exception):
+    pass
+
+
+class Connection:
+    """Minimal HTTP/1.1 client connection over asyncio streams"""
+
+    def __init__(self, host, port, headers):
+        self.host, self.port = host, port
+        self.headers = headers
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def get(self, path):
+        """(status, body size) of GET `path`"""
+        if self.writer is None:
+            await self.open()
+        lines = [f'GET {path} HTTP/1.1', f'Host: {self.host}:{self.port}', *self.headers, '', '']
+        self.writer.write('\r\n'.join(lines).encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HTTPError('connection closed by the server')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            size = 0
+            while True:
+                chunk_size = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(chunk_size + 2)
+                size += chunk_size
+                if not chunk_size:
+                    break
+        elif 'content-length' in headers:
+            size = int(headers['content-length'])
+            await self.reader.readexactly(size)
+        else:
+            size = len(await self.reader.read())
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, size
+
+
+async def _client(base, path, headers, count, warmup, results):
+    connection = Connection(base.hostname, base.port or 80, headers)
+    try:
+        for number in range(warmup + count):
+            start = time.perf_counter()
+            try:
+                status, _ = await connection.get(path)
+            except (OSError, HTTPError, ValueError, asyncio.IncompleteReadError):
+                connection.close()
+                status = 'error'
+            if number >= warmup:
+                results['latencies'].append((time.perf_counter() - start) * 1000)
+                results['statuses'][status] += 1
+                results['started'] = results['started'] or start
+    finally:
+        connection.close()
+
+
+async def _run(base, path, headers, requests, concurrency, warmup):
+    shares = [requests // concurrency + (1 if n < requests % concurrency else 0) for n in range(concurrency)]
+    results = {'latencies': [], 'statuses': Counter(), 'started': None}
+    await asyncio.gather(*(_client(base, path, headers, share, warmup, results) for share in shares))
+    results['finished'] = time.perf_counter()
+    return results
+
+
+def process_tree_rss_mb(pid):
+    """Resident memory of `pid` and all its descendants in MB (Linux only)"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name can contain spaces; the parent pid follows its closing paren
+                parent = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    total_kb, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def drive(url, path, requests=2000, concurrency=50, warmup=10, headers=(), server_pid=None):
+    """GET `path` on the server at `url` over `concurrency` connections; throughput, latency, memory"""
+    base = urlsplit(url)
+    if base.scheme != 'http':
+        raise ValueError('Only plain http:// servers can be benchmarked')
+    concurrency = max(min(concurrency, requests), 1)
+    results = asyncio.run(_run(base, path, list(headers), requests, concurrency, warmup))
+
+    latencies = sorted(results['latencies'])
+    statuses = results['statuses']
+    elapsed = results['finished'] - results['started'] if results['started'] else None
+    rps = round(len(latencies) / elapsed, 1) if elapsed else None
+    row = {
+        'url': url.rstrip('/') + path,
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'errors': sum(count for status, count in statuses.items() if status == 'error' or status >= 400),
+        'statuses': {str(status): count for status, count in statuses.items()},
+        'elapsed_s': round(elapsed, 3) if elapsed else None,
+        'requests_per_second': rps,
+        'latency_ms': {
+            'mean': round(statistics.fmean(latencies), 2) if latencies else None,
+            'p50': round(percentile(latencies, 50), 2) if latencies else None,
+            'p95': round(percentile(latencies, 95), 2) if latencies else None,
+            'p99': round(percentile(latencies, 99), 2) if latencies else None,
+            'max': round(latencies[-1], 2) if latencies else None,
+        },
+    }
+    if server_pid:
+        # Taken after the run, once the workers have grown to their working size
+        row['server_rss_mb'] = process_tree_rss_mb(server_pid)
+        row['requests_per_second_per_gb'] = (
+            round(rps / (row['server_rss_mb'] / 1024), 1) if rps and row['server_rss_mb'] else None
+        )
+    return row
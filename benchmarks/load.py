@@ -0,0 +1,152 @@
+# benchmarks/load.py - In-process load driver and per-endpoint query budgets
+#
+# Requests go through the full Django stack (middleware, URL routing, views,
+# rendering) with django.test.Client, one client per worker thread, against
+# whatever database is configured. There is no network or WSGI server in the
+# way, so req/s here is an upper bound for one process; compare runs with each
+# other, not with production traffic. Catalog responses are served from the
+# catalog cache after the first request, like in production; their query
+# budgets are measured on a cache miss, which runs the view's queryset.
+#
+# WRITE_ENDPOINTS POST real changes (checkout creates orders and takes stock)
+# and only run when asked for. Under concurrency they show how the database
+# profile copes with competing writers - sqlite serializes them on one lock.
+
+import itertools
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from admin_panel.instrumentation import percentile
+from store.cache import catalog_cache
+from store.models import Address, Product
+from .datagen import ADMIN_EMAIL, CUSTOMER_EMAIL, TECHNICIAN_EMAIL
+
+
+class Endpoint:
+    def __init__(self, url_name, user_email=None, query_budget=None, payloads=None, catalog=False):
+        self.url_name = url_name
+        self.user_email = user_email
+        # Most queries one request may run; a regression past it fails the benchmark tests
+        self.query_budget = query_budget
+        # Response cached in the catalog cache (store.cache): budgeted on a miss
+        self.catalog = catalog
+        # Write endpoints: callable returning the JSON bodies to POST, used in turn
+        self.payloads = payloads
+
+    @property
+    def path(self):
+        return reverse(self.url_name)
+
+    def requester(self, client):
+        """A no-argument callable sending the next request with `client`"""
+        if self.payloads is None:
+            return lambda: client.get(self.path)
+        bodies = itertools.cycle(self.payloads())
+        return lambda: client.post(self.path, next(bodies), content_type='application/json')
+
+
+ENDPOINTS = [
+    Endpoint('api_product_list', query_budget=3, catalog=True),
+    Endpoint('api_orders_list', CUSTOMER_EMAIL, query_budget=5),
+    Endpoint('api_technician_services', TECHNICIAN_EMAIL, query_budget=3),
+    Endpoint('admin_panel:analytics', ADMIN_EMAIL, query_budget=20),
+]
+
+
+def checkout_payloads():
+    """create_order bodies for the benchmark customer, spread over the best-stocked products"""
+    address_id = Address.objects.filter(user__email=CUSTOMER_EMAIL).values_list('id', flat=True).first()
+    slugs = Product.objects.filter(is_active=True).order_by('-stock').values_list('slug', flat=True)[:50]
+    return [{'product_slug': slug, 'quantity': 1, 'address_id': address_id} for slug in slugs]
+
+
+WRITE_ENDPOINTS = [
+    Endpoint('api_create_order', CUSTOMER_EMAIL, query_budget=24, payloads=checkout_payloads),
+]
+
+
+def get_endpoint(url_name):
+    for endpoint in ENDPOINTS + WRITE_ENDPOINTS:
+        if endpoint.url_name == url_name:
+            return endpoint
+    raise KeyError(url_name)
+
+
+def client_for(email=None):
+    client = Client(SERVER_NAME='localhost')
+    if email:
+        client.force_login(get_user_model().objects.get(email=email))
+    return client
+
+
+def count_queries(endpoint, client=None):
+    """(queries, status code) of one request, after a warm-up request"""
+    send = endpoint.requester(client or client_for(endpoint.user_email))
+    send()
+    if endpoint.catalog:
+        # The warm-up filled the cache; a hit would run no queries at all
+        catalog_cache().clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = send()
+    return len(queries.captured_queries), response.status_code
+
+
+def _worker(endpoint, count, warmup, thread=False):
+    latencies, statuses = [], Counter()
+    try:
+        send = endpoint.requester(client_for(endpoint.user_email))
+        for _ in range(warmup):
+            send()
+        started = time.perf_counter()
+        for _ in range(count):
+            start = time.perf_counter()
+            response = send()
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] += 1
+        finished = time.perf_counter()
+    finally:
+        if thread:
+            # Pool threads open their own connection; don't leave it behind
+            connection.close()
+    return latencies, statuses, started, finished
+
+
+def drive(endpoint, requests=200, concurrency=1, warmup=5):
+    """Send `requests` requests over `concurrency` threads; returns throughput and latency percentiles"""
+    concurrency = max(min(concurrency, requests), 1)
+    shares = [requests // concurrency + (1 if n < requests % concurrency else 0) for n in range(concurrency)]
+
+    if concurrency == 1:
+        results = [_worker(endpoint, shares[0], warmup)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda share: _worker(endpoint, share, warmup, thread=True), shares))
+    # From the first measured request to the last one (warm-up excluded)
+    elapsed = max(result[3] for result in results) - min(result[2] for result in results)
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    statuses = sum((result[1] for result in results), Counter())
+    return {
+        'path': endpoint.path,
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'errors': sum(count for code, count in statuses.items() if code >= 400),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'latency_ms': {
+            'mean': round(statistics.fmean(latencies), 2) if latencies else None,
+            'p50': round(percentile(latencies, 50), 2) if latencies else None,
+            'p95': round(percentile(latencies, 95), 2) if latencies else None,
+            'p99': round(percentile(latencies, 99), 2) if latencies else None,
+            'max': round(latencies[-1], 2) if latencies else None,
+        },
+    }
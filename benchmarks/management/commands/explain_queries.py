@@ -0,0 +1,71 @@
+# benchmarks/management/commands/explain_queries.py
+# EXPLAIN the slowest queries of the hot views and flag full table scans
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import datagen
+from benchmarks.explain import TARGETS, advise
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the top queries of each hot view and flag sequential scans (needs generate_benchmark_data)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--view',
+            action='append',
+            dest='views',
+            choices=sorted({url_name for url_name, _, _ in TARGETS}),
+            help='Only check this URL name (can be repeated)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=5,
+            help='Slowest queries explained per view (default: 5)',
+        )
+        parser.add_argument(
+            '--no-strict',
+            action='store_true',
+            help='PostgreSQL: keep sequential scans enabled (report the plan the planner really picks)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the report as JSON',
+        )
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='Exit with an error if any full scan is flagged (for CI)',
+        )
+
+    def handle(self, *args, **options):
+        if not datagen.exists():
+            raise CommandError('No benchmark data; run `python manage.py generate_benchmark_data` first.')
+
+        targets = [target for target in TARGETS if not options['views'] or target[0] in options['views']]
+        report = advise(targets, top=options['top'], strict=not options['no_strict'])
+        flagged = sum(1 for view in report for query in view['checked'] if query['scans'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for view in report:
+                title = view['view'] + (f"?{view['query_string']}" if view['query_string'] else '')
+                self.stdout.write(f"\n{title} ({view['queries']} distinct queries)")
+                for query in view['checked']:
+                    line = f"  {query['ms']:>8.2f} ms  {query['sql'][:110]}"
+                    if query['scans']:
+                        self.stdout.write(self.style.WARNING(f"{line}\n{'':14}FULL SCAN: {', '.join(query['scans'])}"))
+                    else:
+                        self.stdout.write(line)
+                    if options['verbosity'] > 1:
+                        for step in query['plan']:
+                            self.stdout.write(f"{'':14}{step}")
+
+            summary = f'\n=== EXPLAIN COMPLETE ===\nQueries with full scans: {flagged}'
+            self.stdout.write(self.style.WARNING(summary) if flagged else self.style.SUCCESS(summary))
+
+        if flagged and options['fail_on_scan']:
+            raise CommandError(f'{flagged} queries read whole tables')
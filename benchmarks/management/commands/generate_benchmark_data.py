@@ -0,0 +1,47 @@
+# benchmarks/management/commands/generate_benchmark_data.py
+# Fill the configured database with the deterministic benchmark dataset
+
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import datagen
+
+class Command(BaseCommand):
+    help = (
+        'Generate benchmark data: --scale 1 is 100k products, 1M order items and 200k service '
+        'requests with job sheets. Use a dedicated database, not the development one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=0.01,
+            help='Fraction of the full-size dataset to generate (default: 0.01)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed; the same seed and scale give the same data (default: 0)',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously generated benchmark data and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            datagen.clear()
+            self.stdout.write(self.style.SUCCESS('Benchmark data deleted.'))
+            return
+
+        if datagen.exists():
+            raise CommandError('Benchmark data already exists; run with --clear first to regenerate it.')
+
+        counts = datagen.generate(scale=options['scale'], seed=options['seed'], stdout=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n=== BENCHMARK DATA GENERATED ===\n' +
+                '\n'.join(f'{name}: {count}' for name, count in counts.items())
+            )
+        )
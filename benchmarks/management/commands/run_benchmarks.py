@@ -0,0 +1,158 @@
+# benchmarks/management/commands/run_benchmarks.py
+# Serializer micro-benchmarks + in-process load test, written out as JSON
+#
+# Comparing database profiles: generate the same data in each database, then
+#   DB_SQLITE_TUNED=False python manage.py run_benchmarks --writes --concurrency 8 --output sqlite.json
+#   python manage.py run_benchmarks --writes --concurrency 8 --compare sqlite.json
+#   DB_ENGINE=postgresql ... python manage.py run_benchmarks --writes --concurrency 8 --compare sqlite.json
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import datagen, micro
+from benchmarks.load import ENDPOINTS, WRITE_ENDPOINTS, count_queries, drive, get_endpoint
+from benchmarks.results import compare, metadata
+from services.models import JobSheet, ServiceRequest
+from store.models import Order, OrderItem, Product
+
+class Command(BaseCommand):
+    help = 'Benchmark the serializers and the storefront / technician / admin endpoints (needs generate_benchmark_data)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file',
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON results of an earlier run to compare against',
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            dest='endpoints',
+            choices=[endpoint.url_name for endpoint in ENDPOINTS + WRITE_ENDPOINTS],
+            help='Only load-test this URL name (can be repeated)',
+        )
+        parser.add_argument(
+            '--writes',
+            action='store_true',
+            help='Also load-test the write endpoints (creates orders and takes stock in the benchmark data)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Measured requests per endpoint (default: 200)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Client threads per endpoint (default: 1)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Unmeasured requests per client thread (default: 5)',
+        )
+        parser.add_argument(
+            '--objects',
+            type=int,
+            default=micro.OBJECTS_PER_CASE,
+            help=f'Objects per serializer micro-benchmark (default: {micro.OBJECTS_PER_CASE})',
+        )
+        parser.add_argument(
+            '--skip-serializers',
+            action='store_true',
+            help='Skip the serializer micro-benchmarks',
+        )
+        parser.add_argument(
+            '--skip-load',
+            action='store_true',
+            help='Only count queries per endpoint, without the load test',
+        )
+
+    def handle(self, *args, **options):
+        if not datagen.exists():
+            raise CommandError('No benchmark data; run `python manage.py generate_benchmark_data` first.')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read {options["compare"]}: {e}')
+
+        results = {
+            'meta': metadata({
+                'products': Product.objects.count(),
+                'orders': Order.objects.count(),
+                'order_items': OrderItem.objects.count(),
+                'service_requests': ServiceRequest.objects.count(),
+                'job_sheets': JobSheet.objects.count(),
+            }),
+            'serializers': {},
+            'endpoints': {},
+        }
+
+        if not options['skip_serializers']:
+            results['serializers'] = micro.run_all(count=options['objects'])
+            self.stdout.write('\nSerializer                  objects  queries  best us/obj  median us/obj')
+            for name, row in results['serializers'].items():
+                self.stdout.write(
+                    f"{name:<27} {row['objects']:>7}  {row.get('queries', '-'):>7}  "
+                    f"{row.get('best_us_per_object', '-'):>11}  {row.get('median_us_per_object', '-'):>13}"
+                )
+
+        profile = results['meta']['database_profile']
+        self.stdout.write('Database: ' + ', '.join(f'{key}={value}' for key, value in profile.items()))
+
+        if options['endpoints']:
+            endpoints = [get_endpoint(name) for name in options['endpoints']]
+        else:
+            endpoints = ENDPOINTS + (WRITE_ENDPOINTS if options['writes'] else [])
+        self.stdout.write('\nEndpoint                   queries  budget    req/s   p50 ms   p95 ms   p99 ms  errors')
+        for endpoint in endpoints:
+            queries, status_code = count_queries(endpoint)
+            row = {
+                'path': endpoint.path,
+                'status': status_code,
+                'queries': queries,
+                'query_budget': endpoint.query_budget,
+                'over_budget': endpoint.query_budget is not None and queries > endpoint.query_budget,
+            }
+            if not options['skip_load']:
+                row.update(drive(
+                    endpoint, requests=options['requests'], concurrency=options['concurrency'],
+                    warmup=options['warmup']
+                ))
+            results['endpoints'][endpoint.url_name] = row
+
+            latency = row.get('latency_ms', {})
+            line = (
+                f"{endpoint.url_name:<26} {queries:>7}  {endpoint.query_budget or '-':>6}  "
+                f"{row.get('requests_per_second', '-'):>7}  {latency.get('p50', '-'):>7}  "
+                f"{latency.get('p95', '-'):>7}  {latency.get('p99', '-'):>7}  {row.get('errors', '-'):>6}"
+            )
+            self.stdout.write(self.style.ERROR(line + '  OVER BUDGET') if row['over_budget'] else line)
+
+        if baseline is not None:
+            results['comparison'] = compare(baseline, results)
+            self.stdout.write(f"\nCompared with {baseline.get('meta', {}).get('commit') or options['compare']}:")
+            baseline_profile = baseline.get('meta', {}).get('database_profile')
+            if baseline_profile and baseline_profile != profile:
+                self.stdout.write('  baseline database: ' + ', '.join(
+                    f'{key}={value}' for key, value in baseline_profile.items()
+                ))
+            for row in results['comparison']:
+                change = '-' if row['change_pct'] is None else f"{row['change_pct']:+.1f}%"
+                line = f"  {row['section']}/{row['name']} {row['metric']}: {row['baseline']} -> {row['current']} ({change})"
+                self.stdout.write(line if row['better'] else self.style.WARNING(line))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"\nResults written to {options['output']}"))
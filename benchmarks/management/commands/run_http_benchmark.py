@@ -0,0 +1,138 @@
+# benchmarks/management/commands/run_http_benchmark.py
+# Load test a running server over HTTP, written out as JSON
+#
+# Comparing sync workers with async workers at the same memory budget (same
+# generated data, worker counts chosen so both servers use about the same RSS;
+# gunicorn takes its worker count from WEB_CONCURRENCY, which settings check
+# against the cache backend):
+#   export CACHE_BACKEND=redis WEB_CONCURRENCY=4
+#   gunicorn ecom_project.wsgi -b 127.0.0.1:8000
+#   python manage.py run_http_benchmark --base-url http://127.0.0.1:8000 --server-pid <gunicorn pid> \
+#       --path products=/api/products/ --concurrency 64 --output wsgi.json
+#   gunicorn ecom_project.asgi -k uvicorn.workers.UvicornWorker -b 127.0.0.1:8001
+#   python manage.py run_http_benchmark --base-url http://127.0.0.1:8001 --server-pid <gunicorn pid> \
+#       --path products=/api/async/products/ --concurrency 64 --compare wsgi.json
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.http_load import drive
+from benchmarks.results import compare, metadata
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test a running server over HTTP: requests/s, latency percentiles and (with --server-pid) '
+        'the RSS of the server and its workers. Run once against `gunicorn ecom_project.wsgi` and '
+        'once against `gunicorn -k uvicorn.workers.UvicornWorker ecom_project.asgi`, with worker counts '
+        '(WEB_CONCURRENCY) giving the same memory budget and the same --path labels, and --compare the two.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            default='http://127.0.0.1:8000',
+            help='Server to load test (default: http://127.0.0.1:8000)',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='[label=]path to GET, e.g. products=/api/async/products/ (can be repeated; '
+                 'default: the product list). Label the sync and async paths alike to compare them',
+        )
+        parser.add_argument(
+            '--header',
+            action='append',
+            dest='headers',
+            default=[],
+            help='Extra request header, e.g. "Authorization: Bearer <token>" (can be repeated)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Measured requests per path (default: 2000)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Concurrent client connections (default: 50)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=10,
+            help='Unmeasured requests per connection (default: 10)',
+        )
+        parser.add_argument(
+            '--server-pid',
+            type=int,
+            help='PID of the server (e.g. the gunicorn master) to report its memory with its workers',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file',
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON results of an earlier run to compare against',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read {options["compare"]}: {e}')
+
+        paths = []
+        for entry in options['paths'] or ['/api/products/']:
+            label, _, path = entry.rpartition('=')
+            if not path.startswith('/'):
+                raise CommandError(f'Paths start with "/": {entry}')
+            paths.append((label or path, path))
+
+        results = {'meta': metadata(), 'http': {}}
+        results['meta']['server'] = {
+            'base_url': options['base_url'],
+            'concurrency': options['concurrency'],
+        }
+
+        self.stdout.write(f"Server: {options['base_url']}, {options['concurrency']} connections")
+        self.stdout.write('\nPath                       req/s   p50 ms   p95 ms   p99 ms  errors   RSS MB  req/s/GB')
+        for label, path in paths:
+            try:
+                row = drive(
+                    options['base_url'], path, requests=options['requests'],
+                    concurrency=options['concurrency'], warmup=options['warmup'],
+                    headers=options['headers'], server_pid=options['server_pid'],
+                )
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not load test {path}: {e}')
+            results['http'][label] = row
+
+            latency = row['latency_ms']
+            line = (
+                f"{label:<24} {row['requests_per_second'] or '-':>7}  {latency['p50'] or '-':>7}  "
+                f"{latency['p95'] or '-':>7}  {latency['p99'] or '-':>7}  {row['errors']:>6}  "
+                f"{row.get('server_rss_mb', '-'):>7}  {row.get('requests_per_second_per_gb') or '-':>8}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row['errors'] else line)
+
+        if baseline is not None:
+            results['comparison'] = compare(baseline, results)
+            self.stdout.write(f"\nCompared with {baseline.get('meta', {}).get('server', {}).get('base_url') or options['compare']}:")
+            for row in results['comparison']:
+                change = '-' if row['change_pct'] is None else f"{row['change_pct']:+.1f}%"
+                line = f"  {row['section']}/{row['name']} {row['metric']}: {row['baseline']} -> {row['current']} ({change})"
+                self.stdout.write(line if row['better'] else self.style.WARNING(line))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"\nResults written to {options['output']}"))
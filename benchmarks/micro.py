@@ -0,0 +1,83 @@
+# benchmarks/micro.py - Serializer micro-benchmarks
+#
+# Each case loads its objects ONCE with the same select_related /
+# prefetch_related the API view uses, then times serializer(objects, many=True).data
+# repeatedly, so the numbers measure serialization alone. A case that still
+# queries while serializing (a missing prefetch) reports it in `queries`.
+
+import statistics
+import time
+
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from services.models import JobSheet
+from services.serializers import JobSheetDetailSerializer
+from store.models import Order, Product
+from store.serializers import OrderSerializer, ProductSerializer
+
+OBJECTS_PER_CASE = 100
+
+
+def _products(count):
+    return list(
+        Product.objects.filter(is_active=True).select_related('category')
+        .prefetch_related('additional_images', 'specifications').order_by('pk')[:count]
+    )
+
+
+def _orders(count):
+    return list(
+        Order.objects.select_related('customer', 'shipping_address', 'technician')
+        .prefetch_related('items__product').with_can_rate().order_by('pk')[:count]
+    )
+
+
+def _job_sheets(count):
+    return list(
+        JobSheet.objects.select_related('service_request__service_category', 'created_by')
+        .prefetch_related('materials').order_by('pk')[:count]
+    )
+
+
+# name -> (serializer class, loader)
+CASES = {
+    'ProductSerializer': (ProductSerializer, _products),
+    'OrderSerializer': (OrderSerializer, _orders),
+    'JobSheetDetailSerializer': (JobSheetDetailSerializer, _job_sheets),
+}
+
+
+def run_case(name, count=OBJECTS_PER_CASE, repeat=5, number=10):
+    """
+    Time `number` serializations of `count` objects, `repeat` times.
+    Returns per-object microseconds (best and median of the repeats).
+    """
+    serializer_class, loader = CASES[name]
+    objects = loader(count)
+    if not objects:
+        return {'objects': 0}
+    context = {'request': RequestFactory().get('/', SERVER_NAME='localhost')}
+
+    # One untimed pass: warms caches and counts queries the prefetch missed
+    with CaptureQueriesContext(connection) as queries:
+        serializer_class(objects, many=True, context=context).data
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            serializer_class(objects, many=True, context=context).data
+        timings.append((time.perf_counter() - start) / (number * len(objects)) * 1_000_000)
+
+    return {
+        'objects': len(objects),
+        'queries': len(queries.captured_queries),
+        'best_us_per_object': round(min(timings), 2),
+        'median_us_per_object': round(statistics.median(timings), 2),
+    }
+
+
+def run_all(count=OBJECTS_PER_CASE, repeat=5, number=10):
+    return {name: run_case(name, count=count, repeat=repeat, number=number) for name in CASES}
@@ -0,0 +1,109 @@
+# benchmarks/results.py - Machine-readable benchmark results and run comparison
+#
+# A run is one JSON document:
+#   {"meta": {commit, timestamp, python, django, database, database_profile, dataset},
+#    "serializers": {name: {best_us_per_object, ...}},
+#    "endpoints": {url_name: {queries, query_budget, requests_per_second, latency_ms, ...}},
+#    "http": {label: {requests_per_second, latency_ms, server_rss_mb, ...}}}
+# compare() lines two of them up metric by metric, so runs from different
+# commits can be diffed. To compare database profiles (DB_* settings), run the
+# same suite once per profile against the same generated data and --compare.
+# The "http" section comes from run_http_benchmark (a real server, see
+# benchmarks.http_load); label the paths alike to compare WSGI and ASGI runs.
+
+import platform
+import subprocess
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+# (section, metric path, True if bigger is better)
+COMPARED_METRICS = [
+    ('serializers', ('best_us_per_object',), False),
+    ('serializers', ('queries',), False),
+    ('endpoints', ('queries',), False),
+    ('endpoints', ('requests_per_second',), True),
+    ('endpoints', ('latency_ms', 'p50'), False),
+    ('endpoints', ('latency_ms', 'p95'), False),
+    ('endpoints', ('latency_ms', 'p99'), False),
+    ('http', ('requests_per_second',), True),
+    ('http', ('latency_ms', 'p50'), False),
+    ('http', ('latency_ms', 'p95'), False),
+    ('http', ('latency_ms', 'p99'), False),
+    ('http', ('server_rss_mb',), False),
+    ('http', ('requests_per_second_per_gb',), True),
+]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def database_profile():
+    """The connection settings a database profile varies, as the server reports them"""
+    settings_dict = connection.settings_dict
+    options = settings_dict.get('OPTIONS', {})
+    profile = {
+        'vendor': connection.vendor,
+        'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+        'conn_health_checks': settings_dict.get('CONN_HEALTH_CHECKS'),
+        'pool': bool(options.get('pool')),
+        'replica': 'replica' in settings.DATABASES,
+    }
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for pragma in ('journal_mode', 'synchronous', 'busy_timeout'):
+                cursor.execute(f'PRAGMA {pragma}')
+                profile[pragma] = cursor.fetchone()[0]
+        profile['transaction_mode'] = options.get('transaction_mode') or 'DEFERRED'
+    return profile
+
+
+def metadata(dataset=None):
+    return {
+        'commit': git_commit(),
+        'timestamp': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'database_profile': database_profile(),
+        'dataset': dataset or {},
+    }
+
+
+def _lookup(values, path):
+    for key in path:
+        if not isinstance(values, dict):
+            return None
+        values = values.get(key)
+    return values
+
+
+def compare(baseline, current):
+    """[{section, name, metric, baseline, current, change_pct, better}] for metrics in both runs"""
+    rows = []
+    for section, path, bigger_is_better in COMPARED_METRICS:
+        for name, values in current.get(section, {}).items():
+            before = _lookup(baseline.get(section, {}).get(name), path)
+            after = _lookup(values, path)
+            if before is None or after is None:
+                continue
+            change = round((after - before) / before * 100, 1) if before else None
+            rows.append({
+                'section': section,
+                'name': name,
+                'metric': '.'.join(path),
+                'baseline': before,
+                'current': after,
+                'change_pct': change,
+                'better': after == before or (after > before) == bigger_is_better,
+            })
+    return rows
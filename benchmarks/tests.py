@@ -0,0 +1,72 @@
+from django.test import TestCase
+
+from . import datagen, micro
+from .explain import advise
+from .load import ENDPOINTS, WRITE_ENDPOINTS, count_queries, drive, get_endpoint
+from .results import compare
+
+
+class BenchmarkDataTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.counts = datagen.generate(scale=0.001, seed=1)
+
+
+class QueryBudgetTests(BenchmarkDataTestCase):
+    def test_endpoints_stay_within_their_query_budget(self):
+        for endpoint in ENDPOINTS:
+            with self.subTest(endpoint=endpoint.url_name):
+                queries, status_code = count_queries(endpoint)
+                self.assertEqual(status_code, 200)
+                self.assertLessEqual(queries, endpoint.query_budget)
+
+    def test_write_endpoints_stay_within_their_query_budget(self):
+        for endpoint in WRITE_ENDPOINTS:
+            with self.subTest(endpoint=endpoint.url_name):
+                queries, status_code = count_queries(endpoint)
+                self.assertEqual(status_code, 201)
+                self.assertLessEqual(queries, endpoint.query_budget)
+
+    def test_serializers_do_not_query(self):
+        for name in micro.CASES:
+            with self.subTest(serializer=name):
+                result = micro.run_case(name, count=20, repeat=1, number=1)
+                self.assertEqual(result['objects'], 20)
+                self.assertEqual(result['queries'], 0)
+
+
+class ExplainTests(BenchmarkDataTestCase):
+    def test_hot_views_do_not_scan_whole_tables(self):
+        flagged = [
+            (view['view'], view['query_string'], query['scans'], query['sql'])
+            for view in advise(top=10)
+            for query in view['checked'] if query['scans']
+        ]
+        self.assertEqual(flagged, [])
+
+
+class LoadDriverTests(BenchmarkDataTestCase):
+    def test_drive_reports_throughput_and_percentiles(self):
+        result = drive(get_endpoint('api_orders_list'), requests=5, warmup=1)
+        self.assertEqual(result['requests'], 5)
+        self.assertEqual(result['errors'], 0)
+        self.assertGreater(result['requests_per_second'], 0)
+        self.assertLessEqual(result['latency_ms']['p50'], result['latency_ms']['p99'])
+
+    def test_generated_data_is_deterministic_and_clearable(self):
+        self.assertEqual(self.counts['products'], 100)
+        self.assertEqual(self.counts['order_items'], 1000)
+        self.assertEqual(self.counts['job_sheets'], self.counts['service_requests'])
+        datagen.clear()
+        self.assertFalse(datagen.exists())
+
+
+class CompareTests(TestCase):
+    def test_compare_flags_regressions(self):
+        baseline = {'endpoints': {'api_orders_list': {'queries': 5, 'requests_per_second': 100.0}}}
+        current = {'endpoints': {'api_orders_list': {'queries': 7, 'requests_per_second': 120.0}}}
+        rows = {row['metric']: row for row in compare(baseline, current)}
+
+        self.assertFalse(rows['queries']['better'])
+        self.assertEqual(rows['queries']['change_pct'], 40.0)
+        self.assertTrue(rows['requests_per_second']['better'])
@@ -3,6 +3,16 @@ ASGI config for ecom_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn workers under gunicorn, e.g.
+
+    WEB_CONCURRENCY=4 CACHE_BACKEND=redis gunicorn ecom_project.asgi:application -k uvicorn.workers.UvicornWorker
+
+(several workers need a shared catalog cache; see CACHES in settings).
+
+Async views (store.async_views) then keep many requests in flight per worker;
+sync views still work, each running in a thread of its own. Compare it with
+the WSGI setup using `python manage.py run_http_benchmark`.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
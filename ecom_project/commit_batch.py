@@ -0,0 +1,35 @@
+# ecom_project/commit_batch.py - Coalesce per-row on_commit work into one call per transaction
+#
+#   refresh_stats = CommitBatch(refresh_technician_stats)
+#   refresh_stats.add(technician_id, ...)      # from a post_save receiver
+#
+# Values added by any number of writes are collected per thread, and the first
+# on_commit callback to run passes all of them to the function in one call; the
+# others find nothing left to do. Outside a transaction that happens at once.
+# Values added in a transaction that rolls back are passed along with the next
+# commit's, so the function must be safe to call for values that didn't change.
+
+import threading
+from django.db import transaction
+
+
+class CommitBatch:
+    def __init__(self, func):
+        self.func = func
+        self.local = threading.local()
+
+    def _pending(self):
+        if not hasattr(self.local, 'values'):
+            self.local.values = set()
+        return self.local.values
+
+    def add(self, *values):
+        self._pending().update(values)
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        pending = self._pending()
+        if pending:
+            values = set(pending)
+            pending.clear()
+            self.func(values)
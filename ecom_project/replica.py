@@ -0,0 +1,276 @@
+# ecom_project/replica.py - Route marked read-only views to the read replica
+#
+# Views wrapped with @read_from_replica (or using ReplicaReadMixin) run their
+# reads on the 'replica' database alias (see DATABASE in settings); writes, and
+# every unmarked view, stay on the primary. Marked views still read from the
+# primary when:
+#   - no replica is configured (DB_REPLICA_HOST / DB_REPLICA_NAME unset)
+#   - the request has already written something
+#   - the client wrote recently: ReplicaPinMiddleware sets a cookie after any
+#     request that writes, pinning that client to the primary for
+#     REPLICA_STICKY_SECONDS (read-your-writes, e.g. a new order in the history)
+#   - the replica is more than REPLICA_MAX_LAG_SECONDS behind or unreachable;
+#     the lag is measured at most every REPLICA_LAG_CHECK_SECONDS per process
+#
+# Local setup with two sqlite files: set DB_REPLICA_NAME=replica.sqlite3 and run
+# `python manage.py sync_replica --interval 2` next to the server. Each sync
+# copies the primary and stamps the copy; the lag is the age of that stamp.
+
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = 'replica'
+
+# Set on responses to requests that wrote; its lifetime is the stickiness window
+PIN_COOKIE = 'primary_pin'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# Table the sqlite replica is stamped with by sync_replica (the copy's only extra table)
+SQLITE_SYNC_TABLE = 'replica_sync'
+
+# Seconds since the last replayed transaction, 0 when the replica has replayed
+# everything it received (an idle primary would otherwise look like lag)
+POSTGRESQL_LAG_SQL = (
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+
+class ReplicaState:
+    """Routing state of the current request"""
+
+    def __init__(self):
+        self.replica_reads = False
+        self.wrote = False
+
+
+_state = ContextVar('replica_state', default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def measure_lag():
+    """Seconds the replica is behind the primary; raises DatabaseError when it can't tell"""
+    connection = connections[REPLICA_ALIAS]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(POSTGRESQL_LAG_SQL)
+            # NULL when the alias points at a primary
+            return float(cursor.fetchone()[0] or 0)
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'SELECT MAX(synced_at) FROM {SQLITE_SYNC_TABLE}')
+            synced_at = cursor.fetchone()[0]
+            if synced_at is None:
+                raise DatabaseError('replica has never been synced')
+            return max(time.time() - synced_at, 0.0)
+    return 0.0
+
+
+class LagMonitor:
+    """Last measured replica lag (None = unusable), re-measured every REPLICA_LAG_CHECK_SECONDS"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = None
+        self.lag = None
+
+    def current(self):
+        now = time.monotonic()
+        with self.lock:
+            if self.checked_at is not None and now - self.checked_at < settings.REPLICA_LAG_CHECK_SECONDS:
+                return self.lag
+            # Other requests keep using the previous value while this one measures
+            self.checked_at = now
+        try:
+            lag = measure_lag()
+        except DatabaseError as e:
+            logger.warning('Read replica unavailable, reading from the primary: %s', e)
+            lag = None
+        self.lag = lag
+        return lag
+
+    def reset(self):
+        with self.lock:
+            self.checked_at = None
+            self.lag = None
+
+
+lag_monitor = LagMonitor()
+
+
+def replica_usable():
+    if not replica_configured():
+        return False
+    lag = lag_monitor.current()
+    if lag is not None and lag > settings.REPLICA_MAX_LAG_SECONDS:
+        logger.info('Read replica is %.1fs behind, reading from the primary', lag)
+        return False
+    return lag is not None
+
+
+def is_pinned(request):
+    """True if this client wrote within the stickiness window"""
+    return request is not None and PIN_COOKIE in request.COOKIES
+
+
+@contextmanager
+def _routing(use_replica):
+    state = _state.get()
+    token = None
+    if state is None:
+        state = ReplicaState()
+        token = _state.set(state)
+    previous = state.replica_reads
+    state.replica_reads = use_replica
+    try:
+        yield state
+    finally:
+        state.replica_reads = previous
+        if token is not None:
+            _state.reset(token)
+
+
+@contextmanager
+def replica_reads(request=None):
+    """Send the reads of the block to the replica, unless the client is pinned or the replica lags"""
+    with _routing(not is_pinned(request) and replica_usable()) as state:
+        yield state
+
+
+@asynccontextmanager
+async def areplica_reads(request=None):
+    """replica_reads() for async views (the lag check may query the replica)"""
+    use_replica = not is_pinned(request) and await sync_to_async(replica_usable)()
+    with _routing(use_replica) as state:
+        yield state
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block, even in a replica-marked view"""
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous = state.replica_reads
+    state.replica_reads = False
+    try:
+        yield
+    finally:
+        state.replica_reads = previous
+
+
+def _render(response):
+    # TemplateResponse querysets are evaluated when rendered, after the view returns
+    if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+        response.render()
+    return response
+
+
+def read_from_replica(view):
+    """View decorator: read from the replica (see the module docstring for when it doesn't)"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapped(request, *args, **kwargs):
+            async with areplica_reads(request):
+                return await view(request, *args, **kwargs)
+        return async_wrapped
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        with replica_reads(request):
+            return _render(view(request, *args, **kwargs))
+    return wrapped
+
+
+class ReplicaReadMixin:
+    """Class-based view counterpart of @read_from_replica"""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(request):
+            return _render(super().dispatch(request, *args, **kwargs))
+
+
+class ReplicaRouter:
+    """Reads go to the replica only inside replica_reads(); writes always go to the primary"""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.replica_reads and not state.wrote:
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Rows read from the replica are the primary's rows
+        databases = {DEFAULT_DB_ALIAS, REPLICA_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary
+        return False if db == REPLICA_ALIAS else None
+
+
+class ReplicaPinMiddleware:
+    """
+    Tracks whether each request writes and pins clients that wrote to the
+    primary for REPLICA_STICKY_SECONDS. Not used without a replica.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = ReplicaState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    async def __acall__(self, request):
+        state = ReplicaState()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(request, response, state)
+
+    def pin(self, request, response, state):
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
@@ -2,8 +2,11 @@
 
 from pathlib import Path
 from datetime import timedelta
+import copy
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-jbx!=0@9n*(ptklw&c4y#as-yw3yzsd80d8vi9nv!rj+31^^mt'
@@ -23,6 +26,9 @@ INSTALLED_APPS = [
     'store',
     'services',
     'admin_panel',
+    'jobs',
+    'notifications',
+    'benchmarks',
     
     # Third-party Apps
     'rest_framework',
@@ -39,6 +45,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so it sees every query of the request; inactive unless QUERY_INSTRUMENTATION
+    'admin_panel.instrumentation.QueryInstrumentationMiddleware',
+    # Pins clients that just wrote to the primary; inactive without a replica
+    'ecom_project.replica.ReplicaPinMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,14 +78,170 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'ecom_project.wsgi.application'
+# Async views (store.async_views) only pay off under ASGI; see ecom_project/asgi.py
+ASGI_APPLICATION = 'ecom_project.asgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# ============= DATABASE =============
+# DB_ENGINE: 'sqlite' (default, single-node installs and tests) or 'postgresql'
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    # Connections are kept for DB_CONN_MAX_AGE seconds and checked before reuse
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'techverse'),
+            'USER': os.environ.get('DB_USER', 'techverse'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+            # Behind PgBouncer in transaction mode, server-side cursors (QuerySet.iterator()) break
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_PGBOUNCER', 'False') == 'True',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+            },
+        }
     }
+    # In-process connection pool; needs psycopg 3 with psycopg_pool instead of psycopg2,
+    # and replaces persistent connections (CONN_MAX_AGE must be 0)
+    if os.environ.get('DB_POOL', 'False') == 'True':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+elif DB_ENGINE == 'sqlite':
+    # DB_SQLITE_TUNED (default): WAL so readers don't block the writer, BEGIN IMMEDIATE so
+    # a writing transaction waits for the lock up front (busy timeout) instead of failing
+    # with "database is locked" when it upgrades from a read. False keeps Django's defaults
+    # (rollback journal), the baseline for benchmark comparisons.
+    if os.environ.get('DB_SQLITE_TUNED', 'True') == 'True':
+        SQLITE_OPTIONS = {
+            'timeout': int(os.environ.get('DB_SQLITE_TIMEOUT', 20)),
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA mmap_size=134217728;'
+            ),
+        }
+    else:
+        SQLITE_OPTIONS = {'init_command': 'PRAGMA journal_mode=DELETE;'}
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': SQLITE_OPTIONS,
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'sqlite' or 'postgresql', not {DB_ENGINE!r}")
+
+# Optional read replica, aliased 'replica': same settings as default except its
+# location (DB_REPLICA_HOST/DB_REPLICA_PORT for postgresql, DB_REPLICA_NAME for
+# the sqlite file, kept current by `manage.py sync_replica`). Tests mirror it to
+# default. Which reads go there: see READ REPLICA below.
+DB_REPLICA_HOST = os.environ.get('DB_REPLICA_HOST', '')
+DB_REPLICA_NAME = os.environ.get('DB_REPLICA_NAME', '')
+if DB_REPLICA_HOST or DB_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **copy.deepcopy(DATABASES['default']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DB_REPLICA_HOST:
+        DATABASES['replica']['HOST'] = DB_REPLICA_HOST
+        DATABASES['replica']['PORT'] = os.environ.get('DB_REPLICA_PORT', DATABASES['default'].get('PORT', ''))
+    if DB_REPLICA_NAME:
+        DATABASES['replica']['NAME'] = DB_REPLICA_NAME
+
+# ============= READ REPLICA =============
+# Views marked with ecom_project.replica.read_from_replica / ReplicaReadMixin read
+# from the 'replica' alias while it keeps up; everything else uses the primary
+DATABASE_ROUTERS = ['ecom_project.replica.ReplicaRouter']
+# After a client writes, its reads stay on the primary this long (read-your-writes)
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 15))
+# A replica further behind than this is skipped until it catches up
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+# How often each process re-measures the lag
+REPLICA_LAG_CHECK_SECONDS = float(os.environ.get('REPLICA_LAG_CHECK_SECONDS', 2))
+
+# ============= CACHES =============
+# CACHE_BACKEND: 'locmem' (default, also used by tests), 'file' or 'redis'.
+# The catalog cache is invalidated by bumping shared version counters, which a
+# locmem cache keeps per process: serving with several worker processes (gunicorn
+# reads WEB_CONCURRENCY as its worker count) or with DEBUG off needs file or redis.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_LOCATIONS = {
+    'locmem': 'techverse-catalog',
+    'file': str(BASE_DIR / 'cache' / 'catalog'),
+    'redis': 'redis://127.0.0.1:6379/1',
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_LOCATIONS[CACHE_BACKEND]),
+        'KEY_PREFIX': 'techverse',
+    },
+}
+
+if CACHE_BACKEND == 'locmem' and (WEB_CONCURRENCY > 1 or not DEBUG):
+    raise ImproperlyConfigured(
+        'CACHE_BACKEND=locmem only invalidates the catalog cache of one process; '
+        "set CACHE_BACKEND to 'redis' or 'file' when serving with several workers or DEBUG off"
+    )
+
+# Catalog API responses (store.cache) - alias and entry lifetime in seconds
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_TIMEOUT = int(os.environ.get('CATALOG_CACHE_TIMEOUT', 300))
+
+# Minutes a PENDING order holds its stock before release_expired_reservations frees it
+STOCK_RESERVATION_TTL_MINUTES = int(os.environ.get('STOCK_RESERVATION_TTL_MINUTES', 15))
+
+# ============= BACKGROUND JOBS =============
+# Queued with jobs.queue.enqueue() and run by `python manage.py run_worker`
+JOB_WORKER_CONCURRENCY = int(os.environ.get('JOB_WORKER_CONCURRENCY', 4))
+# RUNNING jobs locked longer than this are assumed lost and requeued
+JOB_LOCK_TIMEOUT_SECONDS = int(os.environ.get('JOB_LOCK_TIMEOUT_SECONDS', 600))
+# Succeeded jobs are pruned after this many days
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', 7))
+
+# ============= QUERY INSTRUMENTATION =============
+# Per-endpoint query count / latency stats (admin_panel.instrumentation), off by default
+QUERY_INSTRUMENTATION = os.environ.get('QUERY_INSTRUMENTATION', 'False') == 'True'
+# Most recent requests kept per endpoint for the percentiles
+QUERY_INSTRUMENTATION_SAMPLE_SIZE = int(os.environ.get('QUERY_INSTRUMENTATION_SAMPLE_SIZE', 1000))
+# Log a warning for requests slower than this (ms) or running at least this many queries (0 = off)
+QUERY_INSTRUMENTATION_SLOW_MS = int(os.environ.get('QUERY_INSTRUMENTATION_SLOW_MS', 0))
+QUERY_INSTRUMENTATION_SLOW_QUERIES = int(os.environ.get('QUERY_INSTRUMENTATION_SLOW_QUERIES', 0))
+
+# ============= NOTIFICATIONS =============
+# Order/service notifications are sent in batches by the notifications.dispatch job
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True') == 'True'
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'TechVerse <no-reply@techverse.local>')
+SMS_BACKEND = os.environ.get('SMS_BACKEND', 'notifications.sms.ConsoleBackend')
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 500))
+NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', 5))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -93,6 +259,9 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Seconds to cache the admin panel status tile counts (0 = always query)
+ADMIN_STATUS_COUNTERS_TTL = int(os.environ.get('ADMIN_STATUS_COUNTERS_TTL', 0))
 AUTH_USER_MODEL = 'users.CustomUser'
 SITE_ID = 1
 
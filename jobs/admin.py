@@ -0,0 +1,20 @@
+# jobs/admin.py - Inspect and retry background jobs
+
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+@admin.action(description='Retry selected jobs')
+def retry_jobs(modeladmin, request, queryset):
+    queryset.exclude(status='RUNNING').update(
+        status='QUEUED', run_at=timezone.now(), attempts=0, finished_at=None, last_error=''
+    )
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'idempotency_key')
+    readonly_fields = ('created_at', 'locked_by', 'locked_at', 'finished_at', 'last_error')
+    actions = [retry_jobs]
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,49 @@
+# jobs/management/commands/run_worker.py
+# Background worker: run queued jobs (see jobs.queue) until interrupted
+
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jobs.worker import Worker
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (image renditions, file cleanup, periodic sweeps, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'JOB_WORKER_CONCURRENCY', 4),
+            help='Number of worker threads (default: JOB_WORKER_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when no job is due (default: 1)',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no due job is left instead of waiting for more',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst'],
+        )
+        # Finish the jobs in progress on Ctrl+C / SIGTERM, then exit
+        signal.signal(signal.SIGINT, lambda *args: worker.stop())
+        signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+
+        self.stdout.write(f'Worker {worker.id} running with {worker.concurrency} thread(s)')
+        worker.run()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n=== WORKER STOPPED ===\n'
+                f'Jobs succeeded: {worker.succeeded}\n'
+                f'Jobs failed: {worker.failed}'
+            )
+        )
@@ -0,0 +1,105 @@
+# jobs/queue.py - Registering tasks and enqueueing jobs
+#
+#   @task('store.delete_files')
+#   def delete_files(paths): ...
+#
+#   enqueue('store.delete_files', paths=[...])                  # as soon as possible
+#   enqueue('store.delete_files', delay=timedelta(hours=1), ...) # scheduled
+#   enqueue(..., idempotency_key='order-item-price:42')         # at most one job per key
+#
+# A task runs inside one transaction, so a failed attempt leaves nothing behind
+# for the retry. Tasks that talk to the outside world (SMTP, SMS) and record
+# their progress as they go register with atomic=False and manage their own.
+#
+# enqueue() inserts the Job row in the current transaction: if the request
+# rolls back, its side effects are never run, and the worker never sees a job
+# before the data it refers to has committed. Task arguments must be JSON.
+
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import Job
+
+TASKS = {}
+
+MAX_BACKOFF = timedelta(hours=1)
+
+
+class Task:
+    def __init__(self, func, name, max_attempts, backoff, every, atomic):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        # Seconds before the first retry; doubled on every further attempt
+        self.backoff = backoff
+        # Periodic tasks are enqueued by the worker once per `every` interval
+        self.every = every
+        # Run inside one transaction (see the module docstring)
+        self.atomic = atomic
+
+    def __call__(self, **kwargs):
+        return self.func(**kwargs)
+
+    def enqueue(self, **kwargs):
+        return enqueue(self.name, **kwargs)
+
+    def retry_delay(self, attempts):
+        return min(timedelta(seconds=self.backoff * 2 ** max(attempts - 1, 0)), MAX_BACKOFF)
+
+
+def task(name, max_attempts=5, backoff=30, every=None, atomic=True):
+    """Register a function as a task under `name` (use '<app>.<action>')"""
+    def register(func):
+        if name in TASKS:
+            raise ValueError(f'Task "{name}" is already registered')
+        TASKS[name] = Task(func, name, max_attempts, backoff, every, atomic)
+        return TASKS[name]
+    return register
+
+
+def enqueue(name, run_at=None, delay=None, idempotency_key=None, **kwargs):
+    """
+    Queue a call of task `name` with `kwargs` and return its Job. With an
+    idempotency key, the job already queued (or run) under that key is
+    returned instead of adding another.
+    """
+    if name not in TASKS:
+        raise ValueError(f'Unknown task "{name}"')
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+
+    job = Job(
+        task=name, kwargs=kwargs, run_at=run_at,
+        max_attempts=TASKS[name].max_attempts, idempotency_key=idempotency_key
+    )
+    if idempotency_key is None:
+        job.save()
+        return job
+
+    existing = Job.objects.filter(idempotency_key=idempotency_key).first()
+    if existing:
+        return existing
+    try:
+        # Savepoint, so losing a race for the key doesn't break the caller's transaction
+        with transaction.atomic():
+            job.save()
+        return job
+    except IntegrityError:
+        return Job.objects.get(idempotency_key=idempotency_key)
+
+
+def schedule_periodic(now=None):
+    """Enqueue the current run of every periodic task (once per interval, via its key)"""
+    now = now or timezone.now()
+    jobs = []
+    for periodic in TASKS.values():
+        if not periodic.every:
+            continue
+        interval = periodic.every.total_seconds()
+        slot = int(now.timestamp() // interval)
+        jobs.append(enqueue(
+            periodic.name,
+            run_at=now - timedelta(seconds=now.timestamp() - slot * interval),
+            idempotency_key=f'{periodic.name}@{slot}'
+        ))
+    return jobs
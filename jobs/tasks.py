@@ -0,0 +1,13 @@
+# jobs/tasks.py - Housekeeping for the job table itself
+
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .models import Job
+from .queue import task
+
+@task('jobs.prune', every=timedelta(days=1))
+def prune_jobs():
+    """Delete succeeded jobs older than JOB_RETENTION_DAYS (failed ones stay for inspection)"""
+    cutoff = timezone.now() - timedelta(days=getattr(settings, 'JOB_RETENTION_DAYS', 7))
+    Job.objects.filter(status='SUCCEEDED', finished_at__lt=cutoff).delete()
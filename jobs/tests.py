@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Job
+from .queue import enqueue, task
+from .worker import claim_next, run_job
+
+
+@task('jobs.test_flaky', max_attempts=2, backoff=60)
+def flaky(marker):
+    # A write the failed attempt must not leave behind
+    Job.objects.create(task='jobs.prune', idempotency_key=marker)
+    raise RuntimeError('boom')
+
+
+class JobQueueTests(TestCase):
+    def test_idempotency_key_returns_the_queued_job(self):
+        first = enqueue('jobs.prune', idempotency_key='prune:today')
+        self.assertEqual(enqueue('jobs.prune', idempotency_key='prune:today'), first)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_failed_attempts_roll_back_and_retry_with_backoff(self):
+        job = enqueue('jobs.test_flaky', marker='side-effect')
+        self.assertFalse(run_job(claim_next('test-worker'), 'test-worker'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('QUEUED', 1))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=50))
+        self.assertFalse(Job.objects.filter(idempotency_key='side-effect').exists())
+
+        self.assertIsNone(claim_next('test-worker'))
+        self.assertFalse(run_job(claim_next('test-worker', now=job.run_at), 'test-worker'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('FAILED', 2))
+        self.assertIn('RuntimeError: boom', job.last_error)
@@ -0,0 +1,180 @@
+# jobs/worker.py - Claiming and running queued jobs
+#
+# A job is claimed with a conditional UPDATE (status QUEUED -> RUNNING), so any
+# number of worker threads and processes can poll the same table without a
+# broker or SELECT ... SKIP LOCKED: whoever's UPDATE matches the row owns it.
+# Jobs of a worker that died mid-run are requeued once their lock times out.
+
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Job
+from .queue import TASKS, schedule_periodic
+
+CLAIM_CANDIDATES = 10
+FINISH_RETRIES = 5
+
+
+def lock_timeout():
+    return timedelta(seconds=getattr(settings, 'JOB_LOCK_TIMEOUT_SECONDS', 600))
+
+
+def claim_next(worker_id, now=None):
+    """Claim the oldest due job for `worker_id`, or return None if there is none"""
+    now = now or timezone.now()
+    candidates = Job.objects.filter(status='QUEUED', run_at__lte=now).values_list('id', flat=True)
+    for job_id in candidates[:CLAIM_CANDIDATES]:
+        claimed = Job.objects.filter(pk=job_id, status='QUEUED').update(
+            status='RUNNING', locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def _finish(job, worker_id, **fields):
+    # Matching locked_by means a job requeued after a lock timeout can't be overwritten
+    for attempt in range(FINISH_RETRIES):
+        try:
+            return Job.objects.filter(pk=job.pk, status='RUNNING', locked_by=worker_id).update(
+                locked_by='', locked_at=None, **fields
+            )
+        except OperationalError as e:
+            # The database is busy (SQLite has a single writer); the work is done, so keep trying
+            error = e
+            time.sleep(0.05 * 2 ** attempt)
+    # Left RUNNING: requeue_stale() picks it up after the lock timeout
+    print(f"Error recording the outcome of job {job}: {error}")
+    return 0
+
+
+def run_job(job, worker_id):
+    """Run a claimed job and record the outcome; returns True if it succeeded"""
+    task = TASKS.get(job.task)
+    try:
+        if task is None:
+            raise LookupError(f'Unknown task "{job.task}"')
+        if task.atomic:
+            # A failed attempt leaves no partial writes behind for the retry
+            with transaction.atomic():
+                task(**job.kwargs)
+        else:
+            task(**job.kwargs)
+    except Exception as e:
+        now = timezone.now()
+        print(f"Error running job {job}: {e}")
+        if task is not None and job.attempts < job.max_attempts:
+            _finish(job, worker_id, status='QUEUED', run_at=now + task.retry_delay(job.attempts),
+                    last_error=traceback.format_exc())
+        else:
+            _finish(job, worker_id, status='FAILED', finished_at=now, last_error=traceback.format_exc())
+        return False
+
+    _finish(job, worker_id, status='SUCCEEDED', finished_at=timezone.now(), last_error='')
+    return True
+
+
+def requeue_stale(now=None):
+    """Requeue (or fail, when out of attempts) RUNNING jobs whose lock has timed out"""
+    now = now or timezone.now()
+    stale = Job.objects.filter(status='RUNNING', locked_at__lt=now - lock_timeout())
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='FAILED', finished_at=now, locked_by='', locked_at=None, last_error='Worker lock timed out'
+    )
+    requeued = stale.update(status='QUEUED', run_at=now, locked_by='', locked_at=None)
+    return requeued, failed
+
+
+class Worker:
+    """
+    Runs jobs on `concurrency` threads until stopped. With `burst`, each
+    thread exits once no due job is left (used by tests and cron-style runs).
+    """
+
+    def __init__(self, concurrency=1, poll_interval=1.0, burst=False):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+
+    def stop(self):
+        self.stopping.set()
+
+    def maintain(self):
+        """Housekeeping done by the main thread on every poll"""
+        try:
+            schedule_periodic()
+            requeue_stale()
+        except OperationalError as e:
+            # e.g. SQLite busy with another writer; try again next poll
+            print(f"Error scheduling jobs: {e}")
+
+    def work(self, thread_name, drain=False):
+        """Claim and run jobs; with `drain`, return as soon as none is due"""
+        worker_id = f'{self.id}:{thread_name}'
+        try:
+            while not self.stopping.is_set():
+                try:
+                    job = claim_next(worker_id)
+                except OperationalError as e:
+                    # Busy, not empty: don't let a burst run stop early
+                    print(f"Error claiming job: {e}")
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                if job is None:
+                    if self.burst or drain:
+                        return
+                    self.stopping.wait(self.poll_interval)
+                    continue
+
+                succeeded = run_job(job, worker_id)
+                with self.lock:
+                    if succeeded:
+                        self.succeeded += 1
+                    else:
+                        self.failed += 1
+                if not connection.in_atomic_block:
+                    # Drop connections past CONN_MAX_AGE or broken by the job
+                    close_old_connections()
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+
+    def run(self):
+        self.maintain()
+        if self.concurrency == 1:
+            # No extra thread (and so no extra DB connection) needed
+            while not self.stopping.is_set():
+                self.work('0', drain=True)
+                if self.burst or self.stopping.wait(self.poll_interval):
+                    break
+                self.maintain()
+            return
+
+        threads = [
+            threading.Thread(target=self.work, args=(str(index),), name=f'job-worker-{index}', daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                if self.stopping.wait(self.poll_interval):
+                    break
+                self.maintain()
+        finally:
+            self.stop()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,17 @@
+# notifications/admin.py - Outbox and delivery statistics
+
+from django.contrib import admin
+from .models import DispatchRun, NotificationEvent
+
+class NotificationEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'kind', 'status', 'attempts', 'created_at', 'dispatched_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('user__email', 'user__name')
+    raw_id_fields = ('user',)
+    readonly_fields = ('batch', 'claimed_at', 'last_error', 'created_at', 'dispatched_at')
+
+class DispatchRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'events', 'users', 'coalesced', 'emails_sent', 'sms_sent', 'skipped', 'failed')
+
+admin.site.register(NotificationEvent, NotificationEventAdmin)
+admin.site.register(DispatchRun, DispatchRunAdmin)
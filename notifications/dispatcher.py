@@ -0,0 +1,157 @@
+# notifications/dispatcher.py - Drain the notification outbox in batches
+#
+# One dispatch() call:
+#   1. claims up to NOTIFICATION_BATCH_SIZE pending events with a single UPDATE
+#   2. groups them per user and drops events superseded by a newer one
+#   3. sends each user ONE email / ONE SMS summarising their events, according
+#      to their email_notifications / sms_notifications flags, over a single
+#      email connection and a single SMS connection for the whole batch
+#   4. records the outcome on each user's events as soon as they are sent, and
+#      a DispatchRun row at the end
+# Failed events go back to PENDING until NOTIFICATION_MAX_ATTEMPTS is reached.
+#
+# The claim and every outcome are short transactions of their own and nothing
+# is sent inside one: a delivery is never rolled back (and re-sent) because a
+# later send failed, and SQLite's write lock isn't held across a network call.
+# Don't call dispatch() inside transaction.atomic().
+
+import uuid
+from datetime import timedelta
+from itertools import groupby
+from django.conf import settings
+from django.core import mail
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import sms
+from .models import DispatchRun, NotificationEvent
+from .outbox import coalesce, describe
+
+CLAIM_TIMEOUT = timedelta(minutes=10)
+# A failed event waits this long (from its last claim) before it is tried again
+RETRY_DELAY = timedelta(minutes=1)
+
+
+def batch_size():
+    return getattr(settings, 'NOTIFICATION_BATCH_SIZE', 500)
+
+
+def max_attempts():
+    return getattr(settings, 'NOTIFICATION_MAX_ATTEMPTS', 5)
+
+
+@transaction.atomic
+def _claim(size, now):
+    # Events of a dispatcher that died mid-batch become claimable again
+    NotificationEvent.objects.filter(status='SENDING', claimed_at__lt=now - CLAIM_TIMEOUT).update(status='PENDING')
+
+    token = uuid.uuid4().hex
+    ids = list(NotificationEvent.objects.filter(status='PENDING').exclude(
+        claimed_at__gt=now - RETRY_DELAY
+    ).values_list('id', flat=True)[:size])
+    NotificationEvent.objects.filter(pk__in=ids, status='PENDING').update(
+        status='SENDING', batch=token, claimed_at=now, attempts=F('attempts') + 1
+    )
+    return list(
+        NotificationEvent.objects.filter(batch=token, status='SENDING').select_related('user').order_by('user_id', 'id')
+    )
+
+
+def _mark(events, **fields):
+    """Record the outcome of `events` (committed at once, outside any batch-wide transaction)"""
+    if events:
+        with transaction.atomic():
+            NotificationEvent.objects.filter(pk__in=[event.pk for event in events]).update(**fields)
+
+
+def _email(user, lines):
+    if len(lines) == 1:
+        subject = lines[0]
+    else:
+        subject = f'You have {len(lines)} updates from TechVerse'
+    body = f"Hi {user.name or user.email},\n\n" + '\n'.join(f'- {line}' for line in lines) + '\n\n- TechVerse'
+    return mail.EmailMessage(subject, body, to=[user.email])
+
+
+def dispatch(size=None):
+    """Send one batch of pending notifications; returns the DispatchRun, or None if there was nothing to send"""
+    started_at = timezone.now()
+    events = _claim(size or batch_size(), started_at)
+    if not events:
+        return None
+
+    run = DispatchRun(started_at=started_at, events=len(events))
+    sent, skipped, failed = [], [], []
+
+    try:
+        email_connection, sms_connection = mail.get_connection(), sms.get_connection()
+        email_connection.open()
+        sms_connection.open()
+    except Exception:
+        # Can't reach the mail/SMS server: hand the whole batch back (it counts as an attempt)
+        NotificationEvent.objects.filter(pk__in=[event.pk for event in events]).update(status='PENDING')
+        raise
+
+    with email_connection, sms_connection:
+        for user_id, user_events in groupby(events, key=lambda event: event.user_id):
+            user_events, superseded = coalesce(list(user_events))
+            user = user_events[0].user
+            run.users += 1
+            run.coalesced += len(superseded)
+            skipped.extend(superseded)
+            _mark(superseded, status='SKIPPED', dispatched_at=timezone.now())
+
+            channels = []
+            if user.email_notifications and user.email:
+                channels.append('email')
+            if user.sms_notifications and user.phone:
+                channels.append('sms')
+            if not channels:
+                skipped.extend(user_events)
+                _mark(user_events, status='SKIPPED', dispatched_at=timezone.now())
+                continue
+
+            lines = [describe(event) for event in user_events]
+            delivered, errors = False, []
+            for channel in channels:
+                try:
+                    if channel == 'email':
+                        email_connection.send_messages([_email(user, lines)])
+                        run.emails_sent += 1
+                    else:
+                        sms_connection.send_messages([(user.phone, ' '.join(lines))])
+                        run.sms_sent += 1
+                    delivered = True
+                except Exception as e:
+                    print(f"Error sending {channel} notification to user {user_id}: {e}")
+                    errors.append(f'{channel}: {e}')
+
+            # Retry only if nothing got through, so nobody receives the same email twice
+            if delivered:
+                sent.extend(user_events)
+                _mark(user_events, status='SENT', dispatched_at=timezone.now())
+            else:
+                failed.extend(user_events)
+                _mark(
+                    user_events,
+                    status=Case(When(attempts__gte=max_attempts(), then=Value('FAILED')), default=Value('PENDING')),
+                    last_error='\n'.join(errors)
+                )
+
+    finished_at = timezone.now()
+    run.skipped = len(skipped)
+    run.failed = len(failed)
+    run.finished_at = finished_at
+    run.save()
+    return run
+
+
+def dispatch_all(size=None):
+    """Dispatch batches until the outbox is empty; returns the DispatchRuns"""
+    runs = []
+    while True:
+        run = dispatch(size)
+        if run is None:
+            return runs
+        runs.append(run)
@@ -0,0 +1,29 @@
+# notifications/management/commands/dispatch_notifications.py
+# Send pending notifications now (the job worker also does this every minute)
+
+from django.core.management.base import BaseCommand
+from notifications.dispatcher import dispatch_all
+
+class Command(BaseCommand):
+    help = 'Send pending order/service notifications in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Events per batch (default: NOTIFICATION_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        runs = dispatch_all(options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n=== NOTIFICATIONS DISPATCHED ===\n'
+                f'Batches: {len(runs)}\n'
+                f'Events: {sum(run.events for run in runs)}\n'
+                f'Emails sent: {sum(run.emails_sent for run in runs)}\n'
+                f'SMS sent: {sum(run.sms_sent for run in runs)}\n'
+                f'Skipped: {sum(run.skipped for run in runs)}\n'
+                f'Failed: {sum(run.failed for run in runs)}'
+            )
+        )
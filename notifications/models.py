@@ -0,0 +1,65 @@
+# notifications/models.py - Outbox of user notifications and dispatch statistics
+
+from django.conf import settings
+from django.db import models
+
+class NotificationEvent(models.Model):
+    """
+    Something a user should hear about. Written by notifications.outbox.notify()
+    in the same transaction as the state change; sent later, in batches, by
+    notifications.dispatcher.
+    """
+    KIND_CHOICES = (
+        ('order_status', 'Order status changed'),
+        ('order_technician_assigned', 'Technician assigned to order'),
+        ('order_assigned', 'Order assigned to technician'),
+        ('order_delivered', 'Order delivered'),
+        ('job_sheet_approved', 'Job sheet approved'),
+    )
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('SKIPPED', 'Skipped (notifications off)'),
+        ('FAILED', 'Failed'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notification_events')
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    context = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    # Set when a dispatcher claims the event
+    batch = models.CharField(max_length=32, blank=True, db_index=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='notification_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.user} ({self.status})"
+
+class DispatchRun(models.Model):
+    """Delivery statistics of one dispatcher batch"""
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    events = models.PositiveIntegerField(default=0)
+    users = models.PositiveIntegerField(default=0)
+    # Events folded into a newer event of the same kind and subject
+    coalesced = models.PositiveIntegerField(default=0)
+    emails_sent = models.PositiveIntegerField(default=0)
+    sms_sent = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Dispatch at {self.started_at:%Y-%m-%d %H:%M:%S} ({self.events} events)"
@@ -0,0 +1,51 @@
+# notifications/outbox.py - Recording notifications and turning them into text
+#
+# notify() only inserts a NotificationEvent; call it inside the transaction
+# that makes the state change so the two commit (or roll back) together. The
+# dispatcher sends them later, so a status update never waits on SMTP.
+
+from .models import NotificationEvent
+
+MESSAGES = {
+    'order_status': 'Your order #{order_id} is now {status}.',
+    'order_technician_assigned': '{technician} has been assigned to your order #{order_id}.',
+    'order_assigned': 'Order #{order_id} has been assigned to you.',
+    'order_delivered': 'Your order #{order_id} has been delivered.',
+    'job_sheet_approved': 'The customer approved job sheet #{job_sheet_id} for service request #{service_request_id}.',
+}
+
+# Several events of these kinds about the same subject collapse into the newest
+COALESCE_BY = {
+    'order_status': 'order_id',
+}
+
+
+def notify(user, kind, **context):
+    """Queue a notification for `user` (context values must be JSON); no-op without a user"""
+    if kind not in MESSAGES:
+        raise ValueError(f'Unknown notification kind "{kind}"')
+    if user is None:
+        return None
+    return NotificationEvent.objects.create(user=user, kind=kind, context=context)
+
+
+def describe(event):
+    return MESSAGES[event.kind].format(**event.context)
+
+
+def coalesce(events):
+    """Drop events superseded by a newer one about the same subject; returns (kept, dropped)"""
+    latest = {}
+    for event in events:
+        field = COALESCE_BY.get(event.kind)
+        if field and field in event.context:
+            latest[(event.kind, event.context[field])] = event.pk
+
+    kept, dropped = [], []
+    for event in events:
+        field = COALESCE_BY.get(event.kind)
+        if field and field in event.context and latest[(event.kind, event.context[field])] != event.pk:
+            dropped.append(event)
+        else:
+            kept.append(event)
+    return kept, dropped
@@ -0,0 +1,54 @@
+# notifications/sms.py - Pluggable SMS backends, shaped like Django's email backends
+#
+# SMS_BACKEND names the class to use. No SMS provider is integrated yet; the
+# console backend prints messages and the locmem backend collects them in
+# `outbox` for tests.
+
+import sys
+import threading
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+outbox = []
+
+
+class BaseSMSBackend:
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def send_messages(self, messages):
+        """Send [(phone, text), ...]; returns the number sent"""
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseSMSBackend):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.lock = threading.Lock()
+
+    def send_messages(self, messages):
+        with self.lock:
+            for phone, text in messages:
+                self.stream.write(f'SMS to {phone}: {text}\n')
+            self.stream.flush()
+        return len(messages)
+
+
+class LocmemBackend(BaseSMSBackend):
+    def send_messages(self, messages):
+        outbox.extend(messages)
+        return len(messages)
+
+
+def get_connection():
+    return import_string(getattr(settings, 'SMS_BACKEND', 'notifications.sms.ConsoleBackend'))()
@@ -0,0 +1,11 @@
+# notifications/tasks.py - Drain the outbox from the job worker
+
+from datetime import timedelta
+from jobs.queue import task
+from .dispatcher import dispatch_all
+
+# Not atomic: each batch is claimed, and each delivery recorded, in its own
+# short transaction, so a later failure can't roll back what was already sent
+@task('notifications.dispatch', every=timedelta(minutes=1), atomic=False)
+def dispatch_notifications():
+    dispatch_all()
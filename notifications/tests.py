@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+
+from jobs.queue import enqueue
+from jobs.worker import claim_next, run_job
+from . import sms
+from .dispatcher import dispatch_all
+from .models import NotificationEvent
+from .outbox import notify
+
+
+class FlakySMSBackend(sms.BaseSMSBackend):
+    """Works for the first connection, then the provider goes away"""
+    connections = 0
+
+    def __init__(self):
+        FlakySMSBackend.connections += 1
+        self.reachable = FlakySMSBackend.connections == 1
+
+    def open(self):
+        if not self.reachable:
+            raise ConnectionError('SMS provider unreachable')
+
+    def send_messages(self, messages):
+        return len(messages)
+
+
+@override_settings(NOTIFICATION_BATCH_SIZE=1, SMS_BACKEND='notifications.tests.FlakySMSBackend')
+class OutboxDispatchTests(TestCase):
+    def setUp(self):
+        FlakySMSBackend.connections = 0
+        users = get_user_model().objects
+        self.first = users.create_user(email='first@example.com', password='pass12345', name='First', sms_notifications=False)
+        self.second = users.create_user(email='second@example.com', password='pass12345', name='Second', sms_notifications=False)
+        notify(self.first, 'order_status', order_id=1, status='SHIPPED')
+        notify(self.second, 'order_status', order_id=2, status='SHIPPED')
+
+    def test_failed_later_batch_does_not_resend_delivered_events(self):
+        job = enqueue('notifications.dispatch')
+        self.assertFalse(run_job(claim_next('test-worker'), 'test-worker'))
+
+        # The first batch went out and stays SENT although the job failed on the second
+        self.assertEqual([message.to for message in mail.outbox], [['first@example.com']])
+        statuses = dict(NotificationEvent.objects.values_list('user__email', 'status'))
+        self.assertEqual(statuses, {'first@example.com': 'SENT', 'second@example.com': 'PENDING'})
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'QUEUED')
+
+        FlakySMSBackend.connections = 0
+        NotificationEvent.objects.update(claimed_at=None)
+        dispatch_all()
+        self.assertEqual([message.to for message in mail.outbox], [['first@example.com'], ['second@example.com']])
+        self.assertFalse(NotificationEvent.objects.exclude(status='SENT').exists())
@@ -0,0 +1,37 @@
+# services/management/commands/rebuild_technician_stats.py
+# Recompute every TechnicianStats row from ratings, orders and service requests
+
+from django.core.management.base import BaseCommand
+from services.models import TechnicianStats
+from services.technician_stats import refresh_technician_stats
+
+class Command(BaseCommand):
+    help = 'Rebuild the pre-aggregated TechnicianStats table for all technicians'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--technician',
+            type=int,
+            action='append',
+            help='Only rebuild this technician id (can be repeated)',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete stats rows of users who are no longer technicians',
+        )
+
+    def handle(self, *args, **options):
+        rows = refresh_technician_stats(options['technician'])
+
+        pruned = 0
+        if options['prune']:
+            pruned, _ = TechnicianStats.objects.exclude(technician__role='TECHNICIAN').delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n=== TECHNICIAN STATS REBUILT ===\n'
+                f'Rows written: {rows}\n'
+                f'Rows pruned: {pruned}'
+            )
+        )
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_jobsheet_jobsheetmaterial'),
+        ('users', '0002_customuser_free_service_categories'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TechnicianStats',
+            fields=[
+                ('technician', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='technician_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('average_rating', models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=3, null=True)),
+                ('ratings_1', models.PositiveIntegerField(default=0)),
+                ('ratings_2', models.PositiveIntegerField(default=0)),
+                ('ratings_3', models.PositiveIntegerField(default=0)),
+                ('ratings_4', models.PositiveIntegerField(default=0)),
+                ('ratings_5', models.PositiveIntegerField(default=0)),
+                ('total_orders', models.PositiveIntegerField(default=0)),
+                ('completed_orders', models.PositiveIntegerField(default=0)),
+                ('total_services', models.PositiveIntegerField(default=0)),
+                ('completed_services', models.PositiveIntegerField(default=0)),
+                ('month', models.DateField(blank=True, null=True)),
+                ('month_completed_orders', models.PositiveIntegerField(default=0)),
+                ('month_completed_services', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Technician Stats',
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:05
+
+from datetime import datetime, time
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+COUNTER_FIELDS = [
+    'rating_count', 'rating_sum', *[f'ratings_{star}' for star in range(1, 6)],
+    'total_orders', 'completed_orders', 'total_services', 'completed_services',
+    'month_completed_orders', 'month_completed_services',
+]
+
+
+def _grouped(queryset, **aggregates):
+    rows = queryset.values('technician').annotate(**aggregates).order_by()
+    return {row['technician']: row for row in rows}
+
+
+def backfill_technician_stats(apps, schema_editor):
+    # The aggregation of services.technician_stats.refresh_technician_stats, frozen
+    # here so the dashboard doesn't show every technician at zero until a rebuild
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Order = apps.get_model('store', 'Order')
+    ServiceRequest = apps.get_model('services', 'ServiceRequest')
+    TechnicianRating = apps.get_model('services', 'TechnicianRating')
+    TechnicianStats = apps.get_model('services', 'TechnicianStats')
+
+    ids = list(User.objects.filter(role='TECHNICIAN').values_list('pk', flat=True))
+    if not ids:
+        return
+    month = timezone.localdate().replace(day=1)
+    month_start = timezone.make_aware(datetime.combine(month, time.min))
+
+    ratings = _grouped(
+        TechnicianRating.objects.filter(technician__in=ids),
+        rating_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'ratings_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+    )
+    orders = _grouped(
+        Order.objects.filter(technician__in=ids),
+        total_orders=Count('id'),
+        completed_orders=Count('id', filter=Q(status='DELIVERED')),
+        month_completed_orders=Count('id', filter=Q(status='DELIVERED', order_date__gte=month_start)),
+    )
+    services = _grouped(
+        ServiceRequest.objects.filter(technician__in=ids),
+        total_services=Count('id'),
+        completed_services=Count('id', filter=Q(status='COMPLETED')),
+        month_completed_services=Count('id', filter=Q(status='COMPLETED', request_date__gte=month_start)),
+    )
+
+    rows = []
+    for technician_id in ids:
+        counters = {}
+        for source in (ratings, orders, services):
+            counters.update(source.get(technician_id, {}))
+        values = {field: counters.get(field) or 0 for field in COUNTER_FIELDS}
+        average = None
+        if values['rating_count']:
+            average = (Decimal(values['rating_sum']) / values['rating_count']).quantize(Decimal('0.01'))
+        rows.append(TechnicianStats(technician_id=technician_id, average_rating=average, month=month, **values))
+
+    TechnicianStats.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['technician'],
+        update_fields=[*COUNTER_FIELDS, 'average_rating', 'month', 'updated_at'],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0005_hot_path_indexes'),
+        ('store', '0009_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_technician_stats, migrations.RunPython.noop),
+    ]
@@ -39,6 +39,19 @@ class ServiceRequest(models.Model):
     request_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='SUBMITTED')
 
+    class Meta:
+        indexes = [
+            # Technician job feed, newest first
+            models.Index(fields=['technician', '-request_date'], name='service_tech_date_idx'),
+            # Admin list filtered by status / status counters
+            models.Index(fields=['status', '-request_date'], name='service_status_date_idx'),
+            # Technician stats and status counters
+            models.Index(fields=['technician', 'status'], name='service_tech_status_idx'),
+            models.Index(fields=['-request_date'], name='service_date_idx'),
+            # "Unassigned" admin filter and dashboard tiles
+            models.Index(fields=['-request_date'], condition=models.Q(technician__isnull=True), name='service_unassigned_idx'),
+        ]
+
     def __str__(self):
         return f"Service Request #{self.id} by {self.customer.name}"
 
@@ -62,9 +75,64 @@ class TechnicianRating(models.Model):
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Technician profile: their ratings, newest first
+            models.Index(fields=['technician', '-created_at'], name='rating_tech_created_idx'),
+        ]
+
     def __str__(self):
         return f"Rating for {self.technician.name} by {self.customer.name} - {self.rating} stars"
 
+class TechnicianStats(models.Model):
+    """
+    Pre-aggregated rating and job counters per technician.
+    Refreshed by services.signals whenever a rating, order or service request
+    of the technician changes; rebuild with `manage.py rebuild_technician_stats`.
+    """
+    technician = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='technician_stats')
+
+    # Ratings
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True, db_index=True)
+    ratings_1 = models.PositiveIntegerField(default=0)
+    ratings_2 = models.PositiveIntegerField(default=0)
+    ratings_3 = models.PositiveIntegerField(default=0)
+    ratings_4 = models.PositiveIntegerField(default=0)
+    ratings_5 = models.PositiveIntegerField(default=0)
+
+    # Jobs
+    total_orders = models.PositiveIntegerField(default=0)
+    completed_orders = models.PositiveIntegerField(default=0)
+    total_services = models.PositiveIntegerField(default=0)
+    completed_services = models.PositiveIntegerField(default=0)
+
+    # Completed jobs dated in `month` (first day of the month they were counted for)
+    month = models.DateField(null=True, blank=True)
+    month_completed_orders = models.PositiveIntegerField(default=0)
+    month_completed_services = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Technician Stats'
+
+    def __str__(self):
+        return f"Stats for technician #{self.technician_id}"
+
+    @property
+    def total_jobs(self):
+        return self.total_orders + self.total_services
+
+    @property
+    def completed_jobs(self):
+        return self.completed_orders + self.completed_services
+
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f'ratings_{star}') for star in range(1, 6)}
+
 class JobSheet(models.Model):
     """
     Professional Job Sheet created by technicians during service
@@ -138,6 +206,10 @@ class JobSheet(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Job Sheet'
         verbose_name_plural = 'Job Sheets'
+        indexes = [
+            # Admin list filtered by approval status, newest first
+            models.Index(fields=['approval_status', '-created_at'], name='jobsheet_approval_created_idx'),
+        ]
 
 
 class JobSheetMaterial(models.Model):
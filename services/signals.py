@@ -0,0 +1,45 @@
+# services/signals.py - Invalidate cached service catalog responses and keep technician stats current
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from ecom_project.commit_batch import CommitBatch
+from store.cache import bump
+from store.models import Order
+from .models import ServiceCategory, ServiceIssue, ServiceRequest, TechnicianRating
+from .technician_stats import refresh_technician_stats
+
+
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+@receiver(post_save, sender=ServiceIssue)
+@receiver(post_delete, sender=ServiceIssue)
+def invalidate_service_catalog(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump('services'))
+
+
+# ==================== TECHNICIAN STATS ====================
+
+# One refresh per transaction, of just the technicians its writes touched
+refresh_stats_on_commit = CommitBatch(refresh_technician_stats)
+
+
+@receiver(post_init, sender=Order)
+@receiver(post_init, sender=ServiceRequest)
+@receiver(post_init, sender=TechnicianRating)
+def remember_stats_technician(sender, instance, **kwargs):
+    # Needed to refresh the previous technician when a job is reassigned
+    instance._stats_technician_id = instance.technician_id
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=ServiceRequest)
+@receiver(post_delete, sender=ServiceRequest)
+@receiver(post_save, sender=TechnicianRating)
+@receiver(post_delete, sender=TechnicianRating)
+def refresh_stats_for_job(sender, instance, **kwargs):
+    technician_ids = {instance.technician_id, instance._stats_technician_id} - {None}
+    instance._stats_technician_id = instance.technician_id
+    if technician_ids:
+        refresh_stats_on_commit.add(*technician_ids)
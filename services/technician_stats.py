@@ -0,0 +1,98 @@
+# services/technician_stats.py - Build and read the TechnicianStats summary rows
+#
+# A refresh recomputes the affected technicians with three grouped queries
+# (ratings, orders, services) and upserts their rows, so it is exact no matter
+# how the source rows were changed. Signals refresh just the technicians
+# touched by a write; the rebuild command refreshes everyone.
+
+from datetime import datetime, time
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from store.models import Order
+from .models import ServiceRequest, TechnicianRating, TechnicianStats
+
+BULK_BATCH_SIZE = 1000
+STAR_FIELDS = [f'ratings_{star}' for star in range(1, 6)]
+COUNTER_FIELDS = [
+    'rating_count', 'rating_sum', *STAR_FIELDS,
+    'total_orders', 'completed_orders', 'total_services', 'completed_services',
+    'month_completed_orders', 'month_completed_services',
+]
+
+
+def current_month(today=None):
+    return (today or timezone.localdate()).replace(day=1)
+
+
+def _grouped(queryset, **aggregates):
+    rows = queryset.values('technician').annotate(**aggregates).order_by()
+    return {row['technician']: row for row in rows}
+
+
+def refresh_technician_stats(technician_ids=None, today=None):
+    """
+    Recompute the stats rows of `technician_ids` (every technician when None).
+    Returns the number of rows written.
+    """
+    month = current_month(today)
+    month_start = timezone.make_aware(datetime.combine(month, time.min))
+
+    users = get_user_model().objects.all()
+    if technician_ids is None:
+        users = users.filter(role='TECHNICIAN')
+    else:
+        users = users.filter(pk__in=[technician_id for technician_id in technician_ids if technician_id])
+    ids = list(users.values_list('pk', flat=True))
+    if not ids:
+        return 0
+
+    ratings = _grouped(
+        TechnicianRating.objects.filter(technician__in=ids),
+        rating_count=Count('id'),
+        rating_sum=Sum('rating'),
+        **{f'ratings_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+    )
+    orders = _grouped(
+        Order.objects.filter(technician__in=ids),
+        total_orders=Count('id'),
+        completed_orders=Count('id', filter=Q(status='DELIVERED')),
+        month_completed_orders=Count('id', filter=Q(status='DELIVERED', order_date__gte=month_start)),
+    )
+    services = _grouped(
+        ServiceRequest.objects.filter(technician__in=ids),
+        total_services=Count('id'),
+        completed_services=Count('id', filter=Q(status='COMPLETED')),
+        month_completed_services=Count('id', filter=Q(status='COMPLETED', request_date__gte=month_start)),
+    )
+
+    rows = []
+    for technician_id in ids:
+        counters = {}
+        for source in (ratings, orders, services):
+            counters.update(source.get(technician_id, {}))
+        values = {field: counters.get(field) or 0 for field in COUNTER_FIELDS}
+        average = None
+        if values['rating_count']:
+            average = (Decimal(values['rating_sum']) / values['rating_count']).quantize(Decimal('0.01'))
+        rows.append(TechnicianStats(technician_id=technician_id, average_rating=average, month=month, **values))
+
+    TechnicianStats.objects.bulk_create(
+        rows,
+        batch_size=BULK_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['technician'],
+        update_fields=[*COUNTER_FIELDS, 'average_rating', 'month', 'updated_at'],
+    )
+    return len(rows)
+
+
+def technician_stats(technician):
+    """Stats row for `technician`, (re)built first if missing or counted for a past month"""
+    stats = TechnicianStats.objects.filter(technician=technician).first()
+    if stats is None or stats.month != current_month():
+        refresh_technician_stats([technician.pk])
+        stats = TechnicianStats.objects.get(technician=technician)
+    return stats
@@ -1,3 +1,46 @@
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from . import signals
+from .models import ServiceCategory, ServiceRequest, TechnicianStats
+from .technician_stats import refresh_technician_stats
+
+
+class TechnicianStatsTests(TestCase):
+    def setUp(self):
+        users = get_user_model().objects
+        self.customer = users.create_user(email='customer@example.com', password='pass12345', name='Customer')
+        self.technician = users.create_user(
+            email='tech@example.com', password='pass12345', name='Tech', role='TECHNICIAN'
+        )
+        self.other = users.create_user(email='other@example.com', password='pass12345', name='Other', role='TECHNICIAN')
+        self.category = ServiceCategory.objects.create(name='Laptop repair')
+
+    def _request(self, status):
+        return ServiceRequest.objects.create(
+            customer=self.customer, technician=self.technician, service_category=self.category, status=status
+        )
+
+    def test_writes_refresh_only_their_technician_once_per_transaction(self):
+        with mock.patch.object(signals.refresh_stats_on_commit, 'func', wraps=refresh_technician_stats) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                for status in ('COMPLETED', 'COMPLETED', 'SUBMITTED'):
+                    self._request(status)
+
+        refresh.assert_called_once_with({self.technician.pk})
+        stats = TechnicianStats.objects.get(technician=self.technician)
+        self.assertEqual((stats.total_services, stats.completed_services), (3, 2))
+        self.assertFalse(TechnicianStats.objects.filter(technician=self.other).exists())
+
+    def test_migration_backfills_existing_technicians(self):
+        self._request('COMPLETED')
+        TechnicianStats.objects.all().delete()
+
+        migration = import_module('services.migrations.0006_backfill_technicianstats')
+        migration.backfill_technician_stats(apps, None)
+        rows = dict(TechnicianStats.objects.values_list('technician', 'completed_services'))
+        self.assertEqual(rows, {self.technician.pk: 1, self.other.pk: 0})
@@ -12,7 +12,11 @@ from rest_framework.decorators import api_view, permission_classes
 from .serializers import ServiceCategorySerializer, ServiceRequestSerializer, ServiceRequestHistorySerializer
 from .models import JobSheet, JobSheetMaterial
 from .serializers import JobSheetSerializer, JobSheetDetailSerializer
+from django.db import transaction
 from django.utils import timezone
+from notifications.outbox import notify
+from store import cache as catalog_cache
+from ecom_project.replica import ReplicaReadMixin
 
 @login_required
 def select_service_category(request):
@@ -129,20 +133,26 @@ def update_service_status(request, request_id):
     return redirect('technician_dashboard')
 
 # API Views
-class ServiceCategoryListAPIView(APIView):
+class ServiceCategoryListAPIView(ReplicaReadMixin, APIView):
     """
     API view to list all service categories and their nested issues.
     """
     permission_classes = [permissions.AllowAny]
     
     def get(self, request, format=None):
-        categories = ServiceCategory.objects.all()
-        serializer = ServiceCategorySerializer(
-            categories, 
-            many=True,
-            context={'request': request}  # Pass request context
-        )
-        return Response(serializer.data)
+        def build():
+            categories = ServiceCategory.objects.prefetch_related('issues')
+            serializer = ServiceCategorySerializer(
+                categories, 
+                many=True,
+                context={'request': request}  # Pass request context
+            )
+            return serializer.data
+
+        # is_free_for_user is per-user for AMC customers, so only cache the shared payload
+        if request.user.is_authenticated and request.user.role == 'AMC':
+            return Response(build())
+        return Response(catalog_cache.get_or_build('service_categories', ['services'], [], build))
 
 class ServiceRequestCreateAPIView(generics.CreateAPIView):
     queryset = ServiceRequest.objects.all()
@@ -571,9 +581,17 @@ def approve_job_sheet(request, job_sheet_id):
             )
         
         # Approve job sheet
-        job_sheet.approval_status = 'APPROVED'
-        job_sheet.approved_at = timezone.now()
-        job_sheet.save()
+        with transaction.atomic():
+            job_sheet.approval_status = 'APPROVED'
+            job_sheet.approved_at = timezone.now()
+            job_sheet.save()
+
+            technician = job_sheet.service_request.technician
+            if technician:
+                notify(
+                    technician, 'job_sheet_approved',
+                    job_sheet_id=job_sheet.id, service_request_id=job_sheet.service_request_id
+                )
         
         return Response(
             {
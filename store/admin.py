@@ -91,6 +91,7 @@ class OrderAdmin(admin.ModelAdmin):
         except Exception as e:
             return f"Error: {str(e)[:50]}"
     total_amount_safe.short_description = 'Total Amount'
+    total_amount_safe.admin_order_field = 'total_amount'
     
     def assignment_status(self, obj):
         try:
@@ -0,0 +1,172 @@
+# store/async_views.py - Async (ASGI) versions of the read-only catalog and technician feed APIs
+#
+# Same payloads, cursors and catalog cache namespaces as the DRF views they mirror
+# (ProductListAPIView, ProductDetailAPIView, TechnicianAssignedServicesView),
+# written against the async ORM so that under ASGI (ecom_project.asgi) a request
+# waiting on the database or the cache doesn't hold a worker thread. DRF views
+# are sync only, so these are plain Django views that authenticate, render,
+# answer HEAD / OPTIONS and report errors the way DRF does for the sync endpoints.
+#
+# They also work under WSGI, but each request then pays for its own event loop:
+# serve them through ASGI.
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import condition
+from rest_framework.exceptions import APIException, MethodNotAllowed, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from ecom_project.replica import read_from_replica
+from . import cache as catalog_cache
+from .conditional import (
+    aprime_list_state, aprime_product_state,
+    product_list_etag, product_list_last_modified,
+    product_detail_etag, product_detail_last_modified,
+)
+from .facets import get_facets
+from .filters import TRUE_VALUES
+from .models import Product
+from .pagination import ProductCursorPagination, TechnicianJobCursorPagination
+from .serializers import ProductDetailSerializer, ProductSerializer
+from .technician_jobs import assigned_services, serialize_service
+from .views import product_detail_queryset, product_list_queryset, requested_product_fields
+
+
+def json_response(data, status=200):
+    # DRF's encoder, so dates and decimals render exactly like the sync endpoints
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+def api_error(exc):
+    """Response for a DRF APIException, shaped like DRF's exception handler output"""
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, status=exc.status_code)
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def method_response(request):
+    """
+    What a read-only DRF view answers to anything but GET / HEAD: OPTIONS with
+    the allowed methods (DRF also describes the view in the body) and other
+    methods with DRF's 405. None for GET / HEAD.
+    """
+    if request.method in ('GET', 'HEAD'):
+        return None
+    if request.method == 'OPTIONS':
+        response = HttpResponse()
+    else:
+        response = api_error(MethodNotAllowed(request.method))
+    response['Allow'] = ', '.join(SAFE_METHODS)
+    return response
+
+
+def read_only_api(view):
+    """method_response() before the view, for views open to anyone"""
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        response = method_response(request)
+        if response is not None:
+            return response
+        return await view(request, *args, **kwargs)
+    return wrapped
+
+
+async def authenticate(request):
+    """The user DRF's default authentication would see: JWT first, then the session"""
+    result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    if result is not None:
+        return result[0]
+    return await request.auser()
+
+
+def conditional(prime, etag_func, last_modified_func):
+    """
+    condition() for async views: `prime` fetches what the (sync) ETag and
+    Last-Modified functions read with the async ORM before they run.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            try:
+                await prime(request, *args, **kwargs)
+                return await conditional_view(request, *args, **kwargs)
+            except APIException as e:
+                return api_error(e)
+        return wrapped
+    return decorator
+
+
+@read_only_api
+@read_from_replica
+@conditional(aprime_list_state, product_list_etag, product_list_last_modified)
+async def product_list(request):
+    """Async ProductListAPIView"""
+    drf_request = Request(request)
+    params = drf_request.query_params
+    fields = requested_product_fields(params)
+
+    async def build():
+        paginator = ProductCursorPagination()
+        page = await paginator.apaginate_queryset(product_list_queryset(params, fields), drf_request)
+        serializer = ProductSerializer(page, many=True, fields=fields, context={'request': drf_request})
+        return paginator.get_paginated_data(serializer.data)
+
+    data = await catalog_cache.aget_or_build(
+        'product_list', catalog_cache.product_list_namespaces(params),
+        [request.get_host(), request.is_secure(), request.path, sorted(params.lists())],
+        build
+    )
+    if params.get('facets', '').lower() in TRUE_VALUES:
+        data = {**data, 'facets': await sync_to_async(get_facets)(params)}
+    return json_response(data)
+
+
+@read_only_api
+@read_from_replica
+@conditional(aprime_product_state, product_detail_etag, product_detail_last_modified)
+async def product_detail(request, slug):
+    """Async ProductDetailAPIView"""
+    drf_request = Request(request)
+
+    async def build():
+        product = await product_detail_queryset().aget(slug=slug)
+        return ProductDetailSerializer(product, context={'request': drf_request}).data
+
+    try:
+        data = await catalog_cache.aget_or_build(
+            'product_detail', [f'product:{slug}'], [request.get_host(), request.is_secure(), slug], build
+        )
+    except Product.DoesNotExist:
+        return json_response({'detail': 'Product not found'}, status=404)
+    return json_response(data)
+
+
+async def technician_services(request):
+    """Async TechnicianAssignedServicesView (the technician job feed)"""
+    try:
+        user = await authenticate(request)
+        if not user.is_authenticated:
+            raise NotAuthenticated()
+    except APIException as e:
+        response = api_error(e)
+        if e.status_code == 401:
+            response['WWW-Authenticate'] = JWTAuthentication().authenticate_header(request)
+        return response
+    # Like DRF, the method is only looked at once the user is authenticated
+    not_get = method_response(request)
+    if not_get is not None:
+        return not_get
+    if user.role != 'TECHNICIAN':
+        return json_response({'error': 'Access denied'}, status=403)
+
+    paginator = TechnicianJobCursorPagination()
+    page = await paginator.apaginate_queryset(assigned_services(user), Request(request))
+    return json_response(paginator.get_paginated_data([serialize_service(service) for service in page]))
@@ -0,0 +1,205 @@
+# store/cache.py - Versioned read-through cache for catalog API responses
+#
+# Keys embed version counters for the namespaces they depend on:
+#   'catalog'          - bumped by category changes (every payload embeds its category)
+#   'products'         - bumped by any product/image/spec change (unfiltered lists)
+#   'category:<slug>'  - bumped by changes to products in that category (filtered lists)
+#   'product:<slug>'   - bumped by changes to that product (detail payloads)
+#   'services'         - bumped by service category/issue changes
+# Invalidation only increments counters; stale entries simply age out. Each
+# bump also records when it happened, so the versions and that time are the
+# ETag and Last-Modified of anything cached under the namespaces (store.conditional).
+#
+# With a read replica, catalog views read from it (ecom_project.replica). An
+# entry rebuilt right after an invalidation could then miss the change and be
+# cached under the new version, so for as long as the replica may lag, misses
+# on a freshly bumped namespace are built from the primary.
+
+import hashlib
+import math
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from django.conf import settings
+from django.core.cache import caches
+
+from ecom_project.replica import primary_reads, replica_configured
+
+VERSION_KEY_PREFIX = 'catalog:version:'
+BUMPED_KEY_PREFIX = 'catalog:bumped:'
+MODIFIED_KEY_PREFIX = 'catalog:modified:'
+
+
+def catalog_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def catalog_timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
+
+
+def _fresh_version():
+    """
+    Start counters from the clock so that a version key evicted from the
+    cache never comes back at a number an old entry was stored under.
+    """
+    return int(time.time() * 1000)
+
+
+def _state_keys(namespaces):
+    keys = {namespace: f'{VERSION_KEY_PREFIX}{namespace}' for namespace in namespaces}
+    return keys, [*keys.values(), *(f'{MODIFIED_KEY_PREFIX}{namespace}' for namespace in namespaces)]
+
+
+def _last_modified(found, namespaces):
+    # Unknown once any of the times is gone (cache restart, eviction)
+    times = [found.get(f'{MODIFIED_KEY_PREFIX}{namespace}') for namespace in namespaces]
+    if not times or None in times:
+        return None
+    return datetime.fromtimestamp(max(times), tz=timezone.utc)
+
+
+def get_state(namespaces):
+    """({namespace: version}, time of the last bump or None) with one cache read"""
+    cache = catalog_cache()
+    keys, read = _state_keys(namespaces)
+    found = cache.get_many(read)
+
+    versions = {}
+    for namespace, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = _fresh_version()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions[namespace] = version
+    return versions, _last_modified(found, namespaces)
+
+
+def get_versions(namespaces):
+    """Current version for each namespace, creating missing counters"""
+    return get_state(namespaces)[0]
+
+
+def bump(*namespaces):
+    """Invalidate every cached entry that depends on any of `namespaces`"""
+    cache = catalog_cache()
+    for namespace in set(namespaces):
+        key = f'{VERSION_KEY_PREFIX}{namespace}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _fresh_version(), None)
+    now = time.time()
+    cache.set_many({f'{MODIFIED_KEY_PREFIX}{namespace}': now for namespace in set(namespaces)}, None)
+    if replica_configured():
+        cache.set_many({f'{BUMPED_KEY_PREFIX}{namespace}': True for namespace in set(namespaces)}, _replica_window())
+
+
+def _replica_window():
+    """Seconds after a bump the replica may still serve the old rows"""
+    return math.ceil(settings.REPLICA_MAX_LAG_SECONDS + settings.REPLICA_LAG_CHECK_SECONDS)
+
+
+def recently_bumped(namespaces):
+    """True if any of `namespaces` was bumped within the replica window"""
+    if not replica_configured():
+        return False
+    keys = [f'{BUMPED_KEY_PREFIX}{namespace}' for namespace in namespaces]
+    return bool(catalog_cache().get_many(keys))
+
+
+async def arecently_bumped(namespaces):
+    if not replica_configured():
+        return False
+    keys = [f'{BUMPED_KEY_PREFIX}{namespace}' for namespace in namespaces]
+    return bool(await catalog_cache().aget_many(keys))
+
+
+async def aget_state(namespaces):
+    """get_state() for async views"""
+    cache = catalog_cache()
+    keys, read = _state_keys(namespaces)
+    found = await cache.aget_many(read)
+
+    versions = {}
+    for namespace, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = _fresh_version()
+            if not await cache.aadd(key, version, None):
+                version = await cache.aget(key, version)
+        versions[namespace] = version
+    return versions, _last_modified(found, namespaces)
+
+
+async def aget_versions(namespaces):
+    return (await aget_state(namespaces))[0]
+
+
+def _versioned_key(kind, namespaces, versions, parts):
+    version_part = '.'.join(str(versions[namespace]) for namespace in namespaces)
+    digest = hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'catalog:{kind}:{version_part}:{digest}'
+
+
+def make_key(kind, namespaces, *parts):
+    """Build a cache key for `kind` that changes whenever a namespace is bumped"""
+    namespaces = ['catalog', *namespaces]
+    return _versioned_key(kind, namespaces, get_versions(namespaces), parts)
+
+
+async def amake_key(kind, namespaces, *parts):
+    namespaces = ['catalog', *namespaces]
+    return _versioned_key(kind, namespaces, await aget_versions(namespaces), parts)
+
+
+def get_or_build(kind, namespaces, parts, builder):
+    """Return the cached value for (kind, parts) or build, store and return it"""
+    cache = catalog_cache()
+    key = make_key(kind, namespaces, *parts)
+    value = cache.get(key)
+    if value is None:
+        with primary_reads() if recently_bumped(['catalog', *namespaces]) else nullcontext():
+            value = builder()
+        cache.set(key, value, catalog_timeout())
+    return value
+
+
+async def aget_or_build(kind, namespaces, parts, builder):
+    """get_or_build() for async views; `builder` is a coroutine function"""
+    cache = catalog_cache()
+    key = await amake_key(kind, namespaces, *parts)
+    value = await cache.aget(key)
+    if value is None:
+        with primary_reads() if await arecently_bumped(['catalog', *namespaces]) else nullcontext():
+            value = await builder()
+        await cache.aset(key, value, catalog_timeout())
+    return value
+
+
+def product_list_namespaces(params):
+    """Namespaces a product list response depends on (besides 'catalog')"""
+    category = params.get('category')
+    return [f'category:{category}'] if category else ['products']
+
+
+def product_namespaces(slugs=(), category_slugs=()):
+    """Namespaces to bump when products with these slugs / categories change"""
+    namespaces = ['products']
+    namespaces += [f'product:{slug}' for slug in slugs if slug]
+    namespaces += [f'category:{slug}' for slug in category_slugs if slug]
+    return namespaces
+
+
+def invalidate_products(product_ids):
+    """
+    Bump the namespaces of these products once the current transaction
+    commits (for writes that bypass the model signals, e.g. queryset.update()).
+    """
+    from django.db import transaction
+    from .models import Product
+
+    rows = list(Product.objects.filter(pk__in=product_ids).values_list('slug', 'category__slug'))
+    namespaces = product_namespaces([slug for slug, _ in rows], [category for _, category in rows])
+    transaction.on_commit(lambda: bump(*namespaces))
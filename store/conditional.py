@@ -0,0 +1,90 @@
+# store/conditional.py - ETag / Last-Modified functions for the catalog APIs
+#
+# Used with django.views.decorators.http.condition so that If-None-Match /
+# If-Modified-Since requests get a 304 before anything is serialized.
+# Product.updated_at is touched whenever one of its images or specs changes
+# (see store.signals), so it versions the whole detail payload.
+#
+# Lists are versioned by the catalog cache namespaces their pages are cached
+# under (store.cache): one cache read, no SQL, and a category rename (which
+# bumps 'catalog') changes the ETag along with the embedded category. With
+# ?facets=true the catalog-wide 'products' namespace versions the counts too.
+#
+# Async views can't run these lookups on the event loop: they await
+# aprime_product_state() / aprime_list_state() first, after which the
+# functions below only read what was stored on the request.
+
+import hashlib
+from .cache import aget_state, get_state, product_list_namespaces
+from .filters import TRUE_VALUES
+from .models import Product
+
+
+def _etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+PRODUCT_STATE_ATTR = '_catalog_product_state'
+LIST_STATE_ATTR = '_catalog_list_state'
+
+
+def _product_state_query(slug):
+    return Product.objects.filter(slug=slug, is_active=True).values(
+        'id', 'updated_at', 'category_id', 'category__name', 'category__slug'
+    )
+
+
+def _product_state(request, slug):
+    """One small query per request, shared by the ETag and Last-Modified functions"""
+    if not hasattr(request, PRODUCT_STATE_ATTR):
+        setattr(request, PRODUCT_STATE_ATTR, _product_state_query(slug).first())
+    return getattr(request, PRODUCT_STATE_ATTR)
+
+
+async def aprime_product_state(request, slug, *args, **kwargs):
+    if not hasattr(request, PRODUCT_STATE_ATTR):
+        setattr(request, PRODUCT_STATE_ATTR, await _product_state_query(slug).afirst())
+
+
+def product_detail_etag(request, slug, *args, **kwargs):
+    state = _product_state(request, slug)
+    if state is None:
+        return None
+    return _etag(
+        'product', state['id'], state['updated_at'].isoformat(),
+        state['category_id'], state['category__name'], state['category__slug']
+    )
+
+
+def product_detail_last_modified(request, slug, *args, **kwargs):
+    state = _product_state(request, slug)
+    return state['updated_at'] if state else None
+
+
+def _list_namespaces(request):
+    namespaces = ['catalog', *product_list_namespaces(request.GET)]
+    # Facet counts span every category and are cached under 'products' (store.facets)
+    if request.GET.get('facets', '').lower() in TRUE_VALUES and 'products' not in namespaces:
+        namespaces.append('products')
+    return namespaces
+
+
+def _list_state(request):
+    if not hasattr(request, LIST_STATE_ATTR):
+        setattr(request, LIST_STATE_ATTR, get_state(_list_namespaces(request)))
+    return getattr(request, LIST_STATE_ATTR)
+
+
+async def aprime_list_state(request, *args, **kwargs):
+    if not hasattr(request, LIST_STATE_ATTR):
+        setattr(request, LIST_STATE_ATTR, await aget_state(_list_namespaces(request)))
+
+
+def product_list_etag(request, *args, **kwargs):
+    versions, _ = _list_state(request)
+    # The path too: the sync and async endpoints link to themselves (see store.async_views)
+    return _etag('products', request.path, sorted(versions.items()), sorted(request.GET.lists()))
+
+
+def product_list_last_modified(request, *args, **kwargs):
+    return _list_state(request)[1]
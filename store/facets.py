@@ -0,0 +1,107 @@
+# store/facets.py - Facet counts for the catalog filter sidebar
+#
+# Each facet is counted with the current filters applied EXCEPT its own, so
+# the sidebar shows how many products every alternative would give (picking
+# brand=HP still lists the other brands with their counts). Four grouped
+# queries in total, cached per filter signature in the catalog cache.
+
+from django.db.models import Count, Q
+from . import cache as catalog_cache
+from .filters import filter_products
+from .models import Product, ProductSpecification
+
+# Query params that select products; everything else (cursor, fields, ...) is ignored
+FILTER_PARAMS = ('category', 'brand', 'min_price', 'max_price', 'in_stock', 'is_featured', 'spec')
+
+# (key, label, min inclusive, max exclusive); None = open end
+PRICE_BANDS = [
+    ('under-1000', 'Under ₹1,000', None, 1000),
+    ('1000-5000', '₹1,000 - ₹5,000', 1000, 5000),
+    ('5000-20000', '₹5,000 - ₹20,000', 5000, 20000),
+    ('20000-50000', '₹20,000 - ₹50,000', 20000, 50000),
+    ('50000-100000', '₹50,000 - ₹1,00,000', 50000, 100000),
+    ('over-100000', 'Over ₹1,00,000', 100000, None),
+]
+
+SPEC_FACET_LIMIT = 30
+
+
+def _filter_params(params):
+    """{param: [values]} for the params that affect the product set"""
+    if hasattr(params, 'getlist'):
+        return {key: params.getlist(key) for key in FILTER_PARAMS if params.getlist(key)}
+    return {key: [params[key]] for key in FILTER_PARAMS if params.get(key)}
+
+
+class _Params(dict):
+    """Minimal QueryDict stand-in for filter_products over {param: [values]}"""
+
+    def get(self, key, default=None):
+        values = super().get(key)
+        return values[-1] if values else default
+
+    def getlist(self, key):
+        return list(super().get(key, []))
+
+
+def _products(params, *excluded):
+    remaining = _Params({key: values for key, values in params.items() if key not in excluded})
+    return filter_products(Product.objects.filter(is_active=True), remaining).order_by()
+
+
+def _price_band(key, lower, upper):
+    condition = Q()
+    if lower is not None:
+        condition &= Q(price__gte=lower)
+    if upper is not None:
+        condition &= Q(price__lt=upper)
+    return condition
+
+
+def compute_facets(params):
+    """Facet buckets for the filter set in `params` (uncached)"""
+    params = _filter_params(params)
+
+    categories = _products(params, 'category').values(
+        'category__slug', 'category__name'
+    ).annotate(count=Count('id')).order_by('-count', 'category__name')
+
+    brands = _products(params, 'brand').exclude(brand='').values(
+        'brand'
+    ).annotate(count=Count('id')).order_by('-count', 'brand')
+
+    price_counts = _products(params, 'min_price', 'max_price').aggregate(**{
+        key: Count('id', filter=_price_band(key, lower, upper))
+        for key, _, lower, upper in PRICE_BANDS
+    })
+
+    spec_pairs = ProductSpecification.objects.filter(
+        product__in=_products(params, 'spec').values('id')
+    ).values('name', 'value').annotate(
+        count=Count('product', distinct=True)
+    ).order_by('-count', 'name', 'value')[:SPEC_FACET_LIMIT]
+
+    specifications = {}
+    for pair in spec_pairs:
+        specifications.setdefault(pair['name'], []).append({'value': pair['value'], 'count': pair['count']})
+
+    return {
+        'category': [
+            {'slug': row['category__slug'], 'name': row['category__name'], 'count': row['count']}
+            for row in categories
+        ],
+        'brand': [{'value': row['brand'], 'count': row['count']} for row in brands],
+        'price': [
+            {'key': key, 'label': label, 'min': lower, 'max': upper, 'count': price_counts[key]}
+            for key, label, lower, upper in PRICE_BANDS
+        ],
+        'specifications': [
+            {'name': name, 'values': values} for name, values in specifications.items()
+        ],
+    }
+
+
+def get_facets(params):
+    """Cached compute_facets(); any catalog change invalidates every signature"""
+    signature = sorted((key, sorted(values)) for key, values in _filter_params(params).items())
+    return catalog_cache.get_or_build('product_facets', ['products'], [signature], lambda: compute_facets(params))
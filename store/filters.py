@@ -0,0 +1,103 @@
+# store/filters.py - Server-side filters for the product catalog API
+
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+from operator import or_
+from django.db.models import Exists, OuterRef, Q
+from rest_framework.exceptions import ValidationError
+from .models import ProductSpecification
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+def _parse_bool(params, key):
+    """Return True/False for a boolean query param, or None if it was not sent"""
+    raw = params.get(key)
+    if raw is None or raw == '':
+        return None
+    raw = raw.lower()
+    if raw in TRUE_VALUES:
+        return True
+    if raw in FALSE_VALUES:
+        return False
+    raise ValidationError({key: f'Expected a boolean value, got "{raw}"'})
+
+
+def _parse_decimal(params, key):
+    """Return a Decimal for a numeric query param, or None if it was not sent"""
+    raw = params.get(key)
+    if raw is None or raw == '':
+        return None
+    try:
+        return Decimal(raw)
+    except InvalidOperation:
+        raise ValidationError({key: f'Expected a number, got "{raw}"'})
+
+
+def _parse_specs(params):
+    """
+    Parse repeated `spec=Name:Value` params into {name: [values]}.
+    Several values for one name are alternatives; different names must all match.
+    """
+    if hasattr(params, 'getlist'):
+        raw_specs = params.getlist('spec')
+    else:
+        raw_specs = [params['spec']] if params.get('spec') else []
+
+    specs = {}
+    for raw in raw_specs:
+        name, separator, value = raw.partition(':')
+        if not separator or not name.strip() or not value.strip():
+            raise ValidationError({'spec': f'Expected "Name:Value", got "{raw}"'})
+        specs.setdefault(name.strip(), []).append(value.strip())
+    return specs
+
+
+def filter_products(queryset, params):
+    """
+    Apply catalog filters from query params.
+
+    Supported params:
+    - category: category slug
+    - brand: brand name (case-insensitive, comma-separated for several)
+    - min_price / max_price: inclusive price range
+    - in_stock: only products with stock > 0 (or == 0 when false)
+    - is_featured: featured flag
+    - spec: specification "Name:Value" (repeatable)
+    """
+    category = params.get('category')
+    if category:
+        queryset = queryset.filter(category__slug=category)
+
+    brand = params.get('brand')
+    if brand:
+        brands = [b.strip() for b in brand.split(',') if b.strip()]
+        if brands:
+            queryset = queryset.filter(reduce(or_, (Q(brand__iexact=b) for b in brands)))
+
+    min_price = _parse_decimal(params, 'min_price')
+    if min_price is not None:
+        queryset = queryset.filter(price__gte=min_price)
+
+    max_price = _parse_decimal(params, 'max_price')
+    if max_price is not None:
+        queryset = queryset.filter(price__lte=max_price)
+
+    in_stock = _parse_bool(params, 'in_stock')
+    if in_stock is True:
+        queryset = queryset.filter(stock__gt=0)
+    elif in_stock is False:
+        queryset = queryset.filter(stock=0)
+
+    is_featured = _parse_bool(params, 'is_featured')
+    if is_featured is not None:
+        queryset = queryset.filter(is_featured=is_featured)
+
+    for name, values in _parse_specs(params).items():
+        # EXISTS keeps one row per product however many specs match
+        queryset = queryset.filter(Exists(ProductSpecification.objects.filter(
+            product=OuterRef('pk'), name__iexact=name, value__in=values
+        )))
+
+    return queryset
@@ -0,0 +1,395 @@
+# store/importer.py - Bulk product import from CSV / JSON Lines
+#
+# Rows are validated, then written in chunks (one transaction per chunk; a dry run stops before writing):
+#   1. existing products are matched by slug, else by model_number, in one query
+#   2. new products get a unique slug - collisions resolved in one query per chunk
+#   3. products are upserted with bulk_create(update_conflicts=True) on slug
+#   4. specifications / additional images given in a row replace the old ones
+#      with one DELETE + one bulk_create each; files of replaced images that no
+#      row uses any more are removed by one store.delete_files job
+# bulk_create skips model signals (and the per-row delete signals are bypassed),
+# so the search index, catalog cache and image renditions are brought up to
+# date explicitly after each chunk.
+#
+# Columns (CSV header / JSONL keys):
+#   name, category (slug or name), price, stock      - required for new products
+#   slug, brand, model_number, description, delivery_time_info, weight,
+#   dimensions, warranty_period, features, meta_description, is_active,
+#   is_featured, image (storage path)                 - optional
+#   additional_images - storage paths; JSON list, or "a.jpg|b.jpg" in CSV
+#   specifications    - JSON object {name: value}; in CSV, one "spec:<Name>" column per spec
+
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+from operator import or_
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from jobs.queue import enqueue
+from .cache import invalidate_products
+from .models import Product, ProductCategory, ProductImage, ProductSpecification
+from .search import index_products
+from .signals import bulk_catalog_write
+
+IMPORT_CHUNK_SIZE = 500
+SLUG_QUERY_BATCH = 100
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+# Product fields an import row can set (besides category, image and slug)
+TEXT_FIELDS = (
+    'name', 'brand', 'model_number', 'description', 'delivery_time_info',
+    'dimensions', 'warranty_period', 'features', 'meta_description',
+)
+UPDATE_FIELDS = [
+    *TEXT_FIELDS, 'category', 'price', 'stock', 'weight', 'is_active', 'is_featured',
+    'image', 'image_renditions', 'updated_at',
+]
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.errors = []  # [{'row', 'key', 'errors'}]
+
+    def fail(self, row_number, key, messages):
+        self.errors.append({'row': row_number, 'key': key, 'errors': messages})
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def as_dict(self):
+        return {'created': self.created, 'updated': self.updated, 'failed': self.failed, 'errors': self.errors}
+
+
+# ==================== READING ====================
+
+def read_rows(stream, file_format):
+    """Yield (row number, dict) from a text stream; CSV spec:<Name> columns become `specifications`"""
+    if file_format == 'csv':
+        for number, row in enumerate(csv.DictReader(stream), start=2):
+            # An empty cell leaves the field as it is (or at its default for new products)
+            row = {column.strip(): value for column, value in row.items()
+                   if column and isinstance(value, str) and value.strip()}
+            specifications = {}
+            for column in list(row):
+                if column and column.startswith('spec:'):
+                    value = row.pop(column)
+                    specifications[column[5:].strip()] = value.strip()
+            if specifications:
+                row['specifications'] = specifications
+            if row.get('additional_images'):
+                row['additional_images'] = [path.strip() for path in row['additional_images'].split('|') if path.strip()]
+            yield number, row
+    elif file_format == 'jsonl':
+        for number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = {'_error': f'Invalid JSON: {e}'}
+                yield number, row if isinstance(row, dict) else {'_error': 'Expected a JSON object'}
+    else:
+        raise ValueError(f'Unsupported import format "{file_format}"')
+
+
+def detect_format(filename):
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def text_stream(binary_file):
+    """Decode an uploaded/opened binary file lazily (utf-8, BOM tolerated)"""
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+
+
+# ==================== VALIDATION ====================
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def _bool(value, errors, field):
+    if isinstance(value, bool):
+        return value
+    value = _text(value).lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    errors.append(f'{field}: expected a boolean, got "{value}"')
+
+
+def clean_row(row, categories, check_files=True):
+    """Return (cleaned dict, [errors]); only the columns present in the row are cleaned"""
+    if '_error' in row:
+        return None, [row['_error']]
+    errors = []
+    cleaned = {}
+
+    for field in TEXT_FIELDS:
+        if field in row and row[field] is not None:
+            cleaned[field] = _text(row[field])
+            max_length = Product._meta.get_field(field).max_length
+            if max_length and len(cleaned[field]) > max_length:
+                errors.append(f'{field}: longer than {max_length} characters')
+
+    if _text(row.get('slug')):
+        cleaned['slug'] = slugify(row['slug'])
+        if not cleaned['slug']:
+            errors.append(f'slug: "{row["slug"]}" is not a valid slug')
+
+    if _text(row.get('category')):
+        category = categories.get(_text(row['category']).lower())
+        if category is None:
+            errors.append(f'category: "{row["category"]}" does not exist')
+        cleaned['category'] = category
+
+    for field in ('price', 'weight'):
+        if field in row and _text(row[field]):
+            try:
+                cleaned[field] = Decimal(_text(row[field]))
+                if cleaned[field] < 0:
+                    errors.append(f'{field}: must not be negative')
+            except InvalidOperation:
+                errors.append(f'{field}: expected a number, got "{row[field]}"')
+        elif field == 'weight' and field in row:
+            cleaned[field] = None
+
+    if 'stock' in row and _text(row['stock']):
+        try:
+            cleaned['stock'] = int(_text(row['stock']))
+            if cleaned['stock'] < 0:
+                errors.append('stock: must not be negative')
+        except ValueError:
+            errors.append(f'stock: expected a whole number, got "{row["stock"]}"')
+
+    for field in ('is_active', 'is_featured'):
+        if field in row and row[field] is not None:
+            cleaned[field] = _bool(row[field], errors, field)
+
+    if _text(row.get('image')):
+        cleaned['image'] = _text(row['image'])
+    additional_images = row.get('additional_images')
+    if additional_images:
+        if isinstance(additional_images, str):
+            additional_images = [additional_images]
+        cleaned['additional_images'] = [_text(path) for path in additional_images if _text(path)]
+    if check_files:
+        for path in [cleaned.get('image')] + cleaned.get('additional_images', []):
+            if path and not default_storage.exists(path):
+                errors.append(f'image: file "{path}" not found')
+
+    specifications = row.get('specifications')
+    if specifications:
+        if isinstance(specifications, dict):
+            cleaned['specifications'] = [(_text(name), _text(value)) for name, value in specifications.items()
+                                         if _text(name) and _text(value)]
+        else:
+            errors.append('specifications: expected an object of name/value pairs')
+
+    return cleaned, errors
+
+
+# ==================== SLUGS ====================
+
+def taken_slugs(bases):
+    """Existing slugs equal to, or numbered variants of, any of `bases`"""
+    bases = sorted(set(bases))
+    taken = set()
+    for start in range(0, len(bases), SLUG_QUERY_BATCH):
+        batch = bases[start:start + SLUG_QUERY_BATCH]
+        condition = reduce(or_, [Q(slug=base) | Q(slug__startswith=f'{base}-') for base in batch])
+        taken.update(Product.objects.filter(condition).order_by().values_list('slug', flat=True))
+    return taken
+
+
+def next_free_slug(base, taken):
+    """`base`, or `base-N` with the lowest free N; the result is added to `taken`"""
+    slug, counter = base, 1
+    while slug in taken:
+        slug = f'{base}-{counter}'
+        counter += 1
+    taken.add(slug)
+    return slug
+
+
+def unique_slug(name):
+    """A slug for `name` not used by any product (one query)"""
+    base = slugify(name) or 'product'
+    return next_free_slug(base, taken_slugs([base]))
+
+
+# ==================== WRITING ====================
+
+def _existing_products(rows):
+    slugs = [cleaned['slug'] for _, cleaned in rows if cleaned.get('slug')]
+    model_numbers = [cleaned['model_number'] for _, cleaned in rows if cleaned.get('model_number') and not cleaned.get('slug')]
+    products = Product.objects.filter(Q(slug__in=slugs) | Q(model_number__in=model_numbers))
+    by_slug, by_model_number = {}, {}
+    for product in products:
+        by_slug[product.slug] = product
+        if product.model_number:
+            by_model_number.setdefault(product.model_number, product)
+    return by_slug, by_model_number
+
+
+def _match(cleaned, by_slug, by_model_number):
+    """The existing product a row updates: by slug if it has one, else by model_number"""
+    if cleaned.get('slug'):
+        return by_slug.get(cleaned['slug'])
+    if cleaned.get('model_number'):
+        return by_model_number.get(cleaned['model_number'])
+    return None
+
+
+def _build(rows, report):
+    """Unsaved Product objects for a chunk, plus (row number, cleaned, is update) for each"""
+    by_slug, by_model_number = _existing_products(rows)
+    taken = taken_slugs([
+        slugify(cleaned.get('name', '')) or 'product' for _, cleaned in rows
+        if not cleaned.get('slug') and _match(cleaned, by_slug, by_model_number) is None
+    ])
+    # Slugs given explicitly in this chunk are never handed out to generated ones
+    taken.update(cleaned['slug'] for _, cleaned in rows if cleaned.get('slug'))
+
+    products, built_rows, seen = [], [], set()
+    for number, cleaned in rows:
+        existing = _match(cleaned, by_slug, by_model_number)
+        if existing is None:
+            missing = [field for field in ('name', 'category', 'price', 'stock') if cleaned.get(field) in (None, '')]
+            if missing:
+                report.fail(number, cleaned.get('slug') or cleaned.get('name'),
+                            [f'{field}: required for a new product' for field in missing])
+                continue
+            product = Product(slug=cleaned.get('slug') or next_free_slug(slugify(cleaned['name']) or 'product', taken))
+        else:
+            # A pk-less copy: the upsert must conflict on slug, not on the primary key
+            product = Product(**{
+                field.attname: getattr(existing, field.attname)
+                for field in Product._meta.concrete_fields if not field.primary_key
+            })
+        if product.slug in seen:
+            report.fail(number, product.slug, ['slug: appears more than once in the same chunk'])
+            continue
+        seen.add(product.slug)
+
+        for field, value in cleaned.items():
+            if field not in ('slug', 'image', 'additional_images', 'specifications'):
+                setattr(product, field, value)
+        if 'image' in cleaned and cleaned['image'] != product.image.name:
+            product.image = cleaned['image']
+            product.image_renditions = {}  # pending for the renditions worker
+        products.append(product)
+        built_rows.append((number, cleaned, existing is not None))
+    return products, built_rows
+
+
+def _delete_unused_files(paths):
+    """Queue the removal of the files in `paths` that no product or product image refers to"""
+    paths = set(paths) - {''}
+    if not paths:
+        return
+    paths -= set(ProductImage.objects.filter(image__in=paths).values_list('image', flat=True))
+    paths -= set(Product.objects.filter(image__in=paths).values_list('image', flat=True))
+    if paths:
+        # Runs on the job worker once the chunk has committed (see jobs.queue)
+        enqueue('store.delete_files', paths=sorted(paths))
+
+
+def _save(products, built_rows):
+    """Upsert a chunk's products with their specifications and images, atomically"""
+    with transaction.atomic():
+        Product.objects.bulk_create(
+            products, update_conflicts=True, unique_fields=['slug'], update_fields=UPDATE_FIELDS
+        )
+        ids = {product.slug: product.pk for product in products}
+        if any(pk is None for pk in ids.values()):
+            # Backends that can't return ids from an upsert
+            ids = dict(Product.objects.filter(slug__in=ids).values_list('slug', 'pk'))
+        rows = [(ids[product.slug], product.name, cleaned) for product, (_, cleaned, _) in zip(products, built_rows)]
+
+        spec_rows = [(pk, cleaned) for pk, _, cleaned in rows if 'specifications' in cleaned]
+        if spec_rows:
+            with bulk_catalog_write():
+                ProductSpecification.objects.filter(product_id__in=[pk for pk, _ in spec_rows]).delete()
+            ProductSpecification.objects.bulk_create([
+                ProductSpecification(product_id=pk, name=name, value=value, order=order)
+                for pk, cleaned in spec_rows
+                for order, (name, value) in enumerate(cleaned['specifications'])
+            ])
+
+        image_rows = [(pk, name, cleaned) for pk, name, cleaned in rows if 'additional_images' in cleaned]
+        if image_rows:
+            old_images = ProductImage.objects.filter(product_id__in=[pk for pk, _, _ in image_rows])
+            old_files = set(old_images.values_list('image', flat=True))
+            with bulk_catalog_write():
+                old_images.delete()
+            ProductImage.objects.bulk_create([
+                ProductImage(product_id=pk, image=path, alt_text=f'{name} - Image {order + 1}'[:255], order=order)
+                for pk, name, cleaned in image_rows
+                for order, path in enumerate(cleaned['additional_images'])
+            ])
+            _delete_unused_files(old_files)
+
+        # What the model signals would have done
+        product_ids = list(ids.values())
+        transaction.on_commit(lambda: index_products(product_ids))
+        invalidate_products(product_ids)
+
+
+def import_products(rows, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False, check_files=True):
+    """
+    Import (row number, dict) rows (see read_rows) and return an ImportReport.
+    Invalid rows are reported and skipped; a chunk that fails to save is
+    rolled back as a whole and each of its rows reported.
+    """
+    report = ImportReport()
+    categories = {}
+    for category in ProductCategory.objects.all():
+        categories[category.slug.lower()] = category
+        categories.setdefault(category.name.lower(), category)
+
+    chunk = []
+
+    def flush():
+        if not chunk:
+            return
+        products, built_rows = _build(chunk, report)
+        chunk.clear()
+        if not products:
+            return
+        if not dry_run:
+            try:
+                _save(products, built_rows)
+            except DatabaseError as e:
+                print(f"Error importing rows {built_rows[0][0]}-{built_rows[-1][0]}: {e}")
+                for product, (number, _, _) in zip(products, built_rows):
+                    report.fail(number, product.slug, [f'database error: {e}'])
+                return
+        for _, _, updated in built_rows:
+            if updated:
+                report.updated += 1
+            else:
+                report.created += 1
+
+    for number, row in rows:
+        cleaned, errors = clean_row(row, categories, check_files=check_files)
+        if errors:
+            report.fail(number, _text(row.get('slug')) or _text(row.get('name')), errors)
+            continue
+        chunk.append((number, cleaned))
+        if len(chunk) >= chunk_size:
+            flush()
+    flush()
+
+    if not dry_run and (report.created or report.updated):
+        # Render new images in the background (the periodic sweep would also catch them)
+        enqueue('store.render_pending')
+    return report
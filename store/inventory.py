@@ -0,0 +1,176 @@
+# store/inventory.py - Stock reservations for checkout
+#
+# Stock only ever moves through conditional, set-based UPDATEs:
+#   UPDATE product SET stock = stock - <qty> WHERE id IN (...) AND stock >= <qty>
+# with one CASE expression covering every line of the order, so concurrent
+# checkouts can never oversell and an order costs one UPDATE, not one per item.
+# PENDING orders hold their units in StockReservation until they are
+# confirmed, cancelled, or swept by release_expired_reservations().
+#
+# A stock change bumps the product's detail page only; the catalog lists
+# (shared by every product) are bumped when a product sells out or comes back,
+# so availability and the in_stock filter stay exact while the unit count on
+# list pages may lag by up to CATALOG_CACHE_TIMEOUT.
+
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from .cache import bump, product_namespaces
+from .models import OrderItem, Product, StockReservation
+
+
+class InsufficientStock(Exception):
+    """Raised (and the transaction rolled back) when any line can't be covered"""
+
+    def __init__(self, shortages):
+        # [{'product_id', 'name', 'requested', 'available'}, ...]
+        self.shortages = shortages
+        super().__init__('; '.join(
+            f"Only {shortage['available']} items available in stock for {shortage['name']}"
+            for shortage in shortages
+        ))
+
+
+def reservation_ttl():
+    return timedelta(minutes=getattr(settings, 'STOCK_RESERVATION_TTL_MINUTES', 15))
+
+
+def order_lines(order):
+    """{product_id: total quantity} for an order, in one query"""
+    rows = OrderItem.objects.filter(order=order).values('product').annotate(total=Sum('quantity')).order_by()
+    return {row['product']: row['total'] for row in rows}
+
+
+def _per_product(lines):
+    return Case(
+        *[When(pk=product_id, then=Value(quantity)) for product_id, quantity in lines.items()],
+        output_field=PositiveIntegerField()
+    )
+
+
+def _invalidate_stock(lines, crossed_zero):
+    """
+    After the commit, bump the detail pages of the products in `lines` and,
+    for those whose new stock shows they `crossed_zero(stock, quantity)`, the lists.
+    """
+    rows = Product.objects.filter(pk__in=lines.keys()).values_list('id', 'slug', 'category__slug', 'stock')
+    namespaces = {f'product:{slug}' for _, slug, _, _ in rows}
+    crossed = [(slug, category) for product_id, slug, category, stock in rows if crossed_zero(stock, lines[product_id])]
+    if crossed:
+        namespaces.update(product_namespaces([slug for slug, _ in crossed], [category for _, category in crossed]))
+    transaction.on_commit(lambda: bump(*namespaces))
+
+
+def take_stock(lines):
+    """
+    Decrement stock for every {product_id: quantity} line in one UPDATE.
+    All or nothing: raises InsufficientStock if any product is short.
+    """
+    lines = {product_id: quantity for product_id, quantity in lines.items() if quantity}
+    if not lines:
+        return
+    with transaction.atomic():
+        delta = _per_product(lines)
+        updated = Product.objects.filter(pk__in=lines.keys(), stock__gte=delta).update(
+            stock=F('stock') - delta, updated_at=timezone.now()
+        )
+        if updated != len(lines):
+            raise InsufficientStock(_shortages(lines))
+        _invalidate_stock(lines, lambda stock, quantity: stock == 0)
+
+
+def return_stock(lines):
+    """Add {product_id: quantity} lines back to stock in one UPDATE"""
+    lines = {product_id: quantity for product_id, quantity in lines.items() if quantity}
+    if not lines:
+        return
+    with transaction.atomic():
+        delta = _per_product(lines)
+        Product.objects.filter(pk__in=lines.keys()).update(stock=F('stock') + delta, updated_at=timezone.now())
+        _invalidate_stock(lines, lambda stock, quantity: stock == quantity)
+
+
+def _shortages(lines):
+    products = Product.objects.filter(pk__in=lines.keys()).values('id', 'name', 'stock', 'is_active')
+    found = {product['id']: product for product in products}
+    shortages = []
+    for product_id, quantity in lines.items():
+        product = found.get(product_id)
+        available = product['stock'] if product else 0
+        if available < quantity:
+            shortages.append({
+                'product_id': product_id,
+                'name': product['name'] if product else f'product #{product_id}',
+                'requested': quantity,
+                'available': available,
+            })
+    return shortages
+
+
+# ==================== ORDER LIFECYCLE ====================
+
+def reserve_order_stock(order, lines=None, ttl=None):
+    """
+    Take stock for a PENDING order and record the holds. `lines` can be passed
+    when the caller already knows them, saving the items query.
+    """
+    lines = order_lines(order) if lines is None else lines
+    expires_at = timezone.now() + (ttl or reservation_ttl())
+    with transaction.atomic():
+        take_stock(lines)
+        return StockReservation.objects.bulk_create([
+            StockReservation(order=order, product_id=product_id, quantity=quantity, expires_at=expires_at)
+            for product_id, quantity in lines.items() if quantity
+        ])
+
+
+def _claim(reservations):
+    """Lock and delete reservations, returning the {product_id: quantity} they held"""
+    held = list(reservations.select_for_update(of=('self',)).values_list('id', 'product_id', 'quantity'))
+    StockReservation.objects.filter(id__in=[reservation_id for reservation_id, _, _ in held]).delete()
+    lines = defaultdict(int)
+    for _, product_id, quantity in held:
+        lines[product_id] += quantity
+    return dict(lines)
+
+
+def commit_order_stock(order):
+    """
+    Turn an order's holds into a sale. If the holds were already swept, the
+    stock is taken again (raising InsufficientStock if it has since sold out).
+    """
+    with transaction.atomic():
+        if not _claim(StockReservation.objects.filter(order=order)):
+            take_stock(order_lines(order))
+
+
+def release_order_stock(order):
+    """Give back whatever a PENDING order still holds"""
+    with transaction.atomic():
+        return_stock(_claim(StockReservation.objects.filter(order=order)))
+
+
+def restock_order(order):
+    """Return the stock of an order that had already been confirmed"""
+    with transaction.atomic():
+        return_stock(order_lines(order))
+
+
+def release_expired_reservations(now=None):
+    """
+    Sweep reservations: release expired holds of PENDING orders and holds of
+    cancelled orders; drop holds of orders that moved on without committing
+    them (e.g. confirmed from the admin panel). Returns (released, settled).
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        released = _claim(StockReservation.objects.filter(
+            Q(order__status='PENDING', expires_at__lte=now) | Q(order__status='CANCELLED')
+        ))
+        return_stock(released)
+        settled, _ = StockReservation.objects.exclude(order__status__in=['PENDING', 'CANCELLED']).delete()
+    return sum(released.values()), settled
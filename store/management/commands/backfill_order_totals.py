@@ -0,0 +1,68 @@
+# store/management/commands/backfill_order_totals.py
+# Recompute the stored Order.total_amount / item_count columns from OrderItems
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from store.models import Order
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized total_amount and item_count on every Order'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of orders to update per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many orders have stale totals',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        if dry_run:
+            stale = self._count_stale()
+            self.stdout.write(
+                self.style.WARNING(f'{stale} orders have totals that do not match their items')
+            )
+            return
+
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                Order.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                updated += Order.objects.filter(id__in=ids).update_totals()
+
+            last_id = ids[-1]
+            self.stdout.write(f'Updated {updated} orders (up to #{last_id})')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'\n=== BACKFILL COMPLETE ===\nOrders updated: {updated}')
+        )
+
+    def _count_stale(self):
+        """Compare stored totals against a fresh in-SQL calculation"""
+        from django.db.models import Count, DecimalField, F, Sum
+        from django.db.models.functions import Coalesce
+        from decimal import Decimal
+
+        fresh = Order.objects.annotate(
+            fresh_total=Coalesce(
+                Sum(F('items__quantity') * Coalesce(F('items__price'), F('items__product__price'))),
+                Decimal('0.00'),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+            fresh_count=Count('items'),
+        )
+        return fresh.exclude(total_amount=F('fresh_total'), item_count=F('fresh_count')).count()
@@ -0,0 +1,35 @@
+# store/management/commands/generate_renditions.py
+# Backfill renditions for product images (new uploads are rendered by the job worker)
+
+from django.core.management.base import BaseCommand
+from store.models import Product, ProductImage
+from store.renditions import process_pending
+
+class Command(BaseCommand):
+    help = 'Generate JPEG/WebP renditions for product images that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Maximum images per model',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Render every image again (e.g. after changing the rendition sizes)',
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            for model in (Product, ProductImage):
+                model.objects.exclude(image_renditions={}).update(image_renditions={})
+
+        rendered, failed = process_pending(limit=options['limit'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n=== RENDITIONS GENERATED ===\n'
+                f'Images rendered: {rendered}\n'
+                f'Failed: {failed}'
+            )
+        )
@@ -0,0 +1,78 @@
+# store/management/commands/import_products.py
+# Bulk create/update products from a supplier catalog (CSV or JSON Lines)
+
+import csv
+import json
+from django.core.management.base import BaseCommand, CommandError
+from store.importer import IMPORT_CHUNK_SIZE, detect_format, import_products, read_rows, text_stream
+
+class Command(BaseCommand):
+    help = 'Import products from a CSV or JSONL file, upserting by slug or model number'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file (see store/importer.py for the columns)')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help=f'Rows per transaction (default: {IMPORT_CHUNK_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row without saving anything',
+        )
+        parser.add_argument(
+            '--skip-file-check',
+            action='store_true',
+            help="Don't check that image paths exist in storage",
+        )
+        parser.add_argument(
+            '--report',
+            help='Write the per-row errors to this file (.csv or .json)',
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or detect_format(options['path'])
+        try:
+            with open(options['path'], 'rb') as source:
+                report = import_products(
+                    read_rows(text_stream(source), file_format),
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run'],
+                    check_files=not options['skip_file_check'],
+                )
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+
+        if options['report']:
+            self.write_report(options['report'], report.errors)
+        else:
+            for error in report.errors[:20]:
+                self.stdout.write(self.style.WARNING(f"Row {error['row']} ({error['key'] or '-'}): {'; '.join(error['errors'])}"))
+            if report.failed > 20:
+                self.stdout.write(self.style.WARNING(f'...and {report.failed - 20} more (use --report to save them all)'))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n=== IMPORT {'CHECKED (dry run)' if options['dry_run'] else 'COMPLETE'} ===\n"
+                f'Products created: {report.created}\n'
+                f'Products updated: {report.updated}\n'
+                f'Rows failed: {report.failed}'
+            )
+        )
+
+    def write_report(self, path, errors):
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            if path.endswith('.json'):
+                json.dump(errors, output, indent=2)
+                return
+            writer = csv.writer(output)
+            writer.writerow(['row', 'key', 'errors'])
+            for error in errors:
+                writer.writerow([error['row'], error['key'], '; '.join(error['errors'])])
@@ -0,0 +1,18 @@
+# store/management/commands/rebuild_search_index.py
+# Rebuild the full-text product search index from scratch
+
+from django.core.management.base import BaseCommand
+from store.search import is_indexed, rebuild_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the store_product_search full-text index'
+
+    def handle(self, *args, **options):
+        if not is_indexed():
+            self.stdout.write(self.style.WARNING('This database backend has no search index; search uses icontains'))
+            return
+
+        indexed = rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'\n=== SEARCH INDEX REBUILT ===\nProducts indexed: {indexed}')
+        )
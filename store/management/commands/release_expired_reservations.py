@@ -0,0 +1,35 @@
+# store/management/commands/release_expired_reservations.py
+# Return stock held by abandoned checkouts - run every few minutes from cron
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from store.inventory import release_expired_reservations
+from store.models import StockReservation
+
+class Command(BaseCommand):
+    help = 'Release expired stock reservations of PENDING orders and holds of cancelled orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many reservations would be released',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            stale = StockReservation.objects.filter(
+                Q(order__status='PENDING', expires_at__lte=timezone.now()) | Q(order__status='CANCELLED')
+            ).count()
+            self.stdout.write(self.style.WARNING(f'{stale} reservations would be released'))
+            return
+
+        released_units, settled = release_expired_reservations()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n=== SWEEP COMPLETE ===\n'
+                f'Units returned to stock: {released_units}\n'
+                f'Committed holds cleared: {settled}'
+            )
+        )
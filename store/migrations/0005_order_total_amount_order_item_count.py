@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:24
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_order_totals(apps, schema_editor):
+    Order = apps.get_model('store', 'Order')
+    OrderItem = apps.get_model('store', 'OrderItem')
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+
+    items = OrderItem.objects.filter(order=models.OuterRef('pk')).order_by().values('order')
+    line_total = models.ExpressionWrapper(
+        models.F('quantity') * Coalesce(models.F('price'), models.F('product__price')),
+        output_field=money
+    )
+    Order.objects.update(
+        total_amount=Coalesce(
+            models.Subquery(items.annotate(total=models.Sum(line_total)).values('total')),
+            models.Value(Decimal('0.00')),
+            output_field=money
+        ),
+        item_count=Coalesce(
+            models.Subquery(items.annotate(count=models.Count('id')).values('count')),
+            models.Value(0)
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0004_alter_orderitem_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of line items'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_amount',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
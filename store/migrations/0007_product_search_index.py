@@ -0,0 +1,65 @@
+# Full-text search index for products (see store/search.py)
+#
+# The DDL is written out here rather than imported from store.search, so later
+# changes to the search module don't change what this migration does.
+
+from django.db import migrations
+
+SQLITE_SQL = [
+    "CREATE VIRTUAL TABLE store_product_search USING fts5("
+    "name, brand, model_number, features, specifications, description, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+    """
+    INSERT INTO store_product_search (rowid, name, brand, model_number, features, specifications, description)
+    SELECT p.id, p.name, p.brand, p.model_number, p.features,
+           COALESCE((SELECT group_concat(s.value, ' ') FROM store_productspecification s WHERE s.product_id = p.id), ''),
+           p.description
+    FROM store_product p
+    """,
+]
+
+POSTGRESQL_SQL = [
+    "CREATE TABLE store_product_search ("
+    "product_id bigint PRIMARY KEY REFERENCES store_product(id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX store_product_search_document_gin ON store_product_search USING GIN (document)",
+    """
+    INSERT INTO store_product_search (product_id, document)
+    SELECT src.id,
+           setweight(to_tsvector('simple', COALESCE(src.name, '')), 'A') ||
+           setweight(to_tsvector('simple', COALESCE(src.brand, '')), 'B') ||
+           setweight(to_tsvector('simple', COALESCE(src.model_number, '')), 'B') ||
+           setweight(to_tsvector('simple', COALESCE(src.features, '')), 'C') ||
+           setweight(to_tsvector('simple', COALESCE(src.specifications, '')), 'C') ||
+           setweight(to_tsvector('simple', COALESCE(src.description, '')), 'D')
+    FROM (
+        SELECT p.id, p.name, p.brand, p.model_number, p.features,
+               COALESCE((SELECT string_agg(s.value, ' ') FROM store_productspecification s WHERE s.product_id = p.id), ''),
+               p.description
+        FROM store_product p
+    ) AS src (id, name, brand, model_number, features, specifications, description)
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+    # Other backends search with icontains filters and need no table
+    statements = {'sqlite': SQLITE_SQL, 'postgresql': POSTGRESQL_SQL}.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS store_product_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_stockreservation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
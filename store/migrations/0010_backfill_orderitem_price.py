@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:50
+
+from django.db import migrations, models
+
+
+def backfill_item_prices(apps, schema_editor):
+    # Items saved before prices were stored on them get the product's current price, once
+    OrderItem = apps.get_model('store', 'OrderItem')
+    Product = apps.get_model('store', 'Product')
+    OrderItem.objects.filter(price__isnull=True).update(
+        price=models.Subquery(Product.objects.filter(pk=models.OuterRef('product_id')).values('price')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_item_prices, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,10 @@
 # store/models.py - Fixed with proper error handling
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.conf import settings # To get the CustomUser model
 from decimal import Decimal
+from jobs.queue import enqueue
 
 class Address(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -35,6 +37,8 @@ class Product(models.Model):
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     image = models.ImageField(upload_to='products/', help_text="Main product image")  # Main image
+    # Resized JPEG/WebP copies of `image`, filled in by store.renditions (empty until generated)
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     stock = models.PositiveIntegerField(default=0)
     delivery_time_info = models.CharField(max_length=255, help_text="e.g., 'Delivered within 2-3 business days'")
     
@@ -57,6 +61,14 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Storefront listing: active products, newest first
+            models.Index(fields=['is_active', '-created_at'], name='product_active_created_idx'),
+            models.Index(fields=['category', 'is_active'], name='product_category_active_idx'),
+            # Low-stock lookups on the admin dashboards (stock < 5): the count in
+            # users.admin_views and the recent-activity entry in admin_panel.views
+            models.Index(fields=['stock'], name='product_stock_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -87,7 +99,8 @@ class Product(models.Model):
             seen_urls.add(main_url)
         
         # Add additional images, avoiding duplicates
-        additional_images = self.additional_images.all().order_by('order', 'id')
+        # Meta.ordering is already ('order', 'id'); plain .all() keeps prefetched rows usable
+        additional_images = self.additional_images.all()
         for img_obj in additional_images:
             if img_obj.image:
                 img_url = img_obj.image.url
@@ -101,6 +114,7 @@ class ProductImage(models.Model):
     """Additional images for products"""
     product = models.ForeignKey(Product, related_name='additional_images', on_delete=models.CASCADE)
     image = models.ImageField(upload_to='products/additional/')
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
     alt_text = models.CharField(max_length=255, blank=True, help_text="Alternative text for the image")
     is_primary = models.BooleanField(default=False, help_text="Set as primary image")
     order = models.PositiveIntegerField(default=0, help_text="Display order")
@@ -124,15 +138,16 @@ class ProductImage(models.Model):
         super().save(*args, **kwargs)
     
     def delete(self, *args, **kwargs):
-        """Override delete to remove image file from filesystem"""
-        if self.image:
-            try:
-                import os
-                if os.path.isfile(self.image.path):
-                    os.remove(self.image.path)
-            except (ValueError, OSError):
-                pass  # Handle cases where file doesn't exist
-        super().delete(*args, **kwargs)
+        """Override delete to remove the image file and its renditions once the delete has committed"""
+        from .renditions import unused_files  # store.renditions imports this module
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            paths = unused_files(self)
+            if paths:
+                # Storage I/O runs on the job worker, not in the request
+                enqueue('store.delete_files', paths=sorted(paths))
+        return result
 
 class ProductSpecification(models.Model):
     """Technical specifications for products"""
@@ -148,6 +163,48 @@ class ProductSpecification(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.name}: {self.value}"
 
+class OrderQuerySet(models.QuerySet):
+    def update_totals(self):
+        """
+        Recompute the stored total_amount/item_count for every order in this
+        queryset with a single UPDATE. Items without a stored price fall back
+        to the current product price.
+        """
+        items = OrderItem.objects.filter(order=models.OuterRef('pk')).order_by().values('order')
+        line_total = models.ExpressionWrapper(
+            models.F('quantity') * Coalesce(models.F('price'), models.F('product__price')),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2)
+        )
+        return self.update(
+            total_amount=Coalesce(
+                models.Subquery(items.annotate(total=models.Sum(line_total)).values('total')),
+                models.Value(Decimal('0.00')),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            ),
+            item_count=Coalesce(
+                models.Subquery(items.annotate(count=models.Count('id')).values('count')),
+                models.Value(0)
+            ),
+        )
+
+    def with_can_rate(self):
+        """
+        Annotate `can_rate_flag`: delivered, has a technician and not yet rated
+        by its customer. One EXISTS subquery instead of a query per order.
+        """
+        from services.models import TechnicianRating  # services.models imports this module
+
+        rated = TechnicianRating.objects.filter(order=models.OuterRef('pk'), customer=models.OuterRef('customer'))
+        return self.annotate(can_rate_flag=models.ExpressionWrapper(
+            models.Q(status='DELIVERED', technician__isnull=False) & ~models.Exists(rated),
+            output_field=models.BooleanField()
+        ))
+
+    def can_rate_flags(self, orders):
+        """{order_id: can_rate} for already-loaded orders, in one query"""
+        ids = [order.pk for order in orders]
+        return dict(self.filter(pk__in=ids).with_can_rate().values_list('pk', 'can_rate_flag'))
+
 class Order(models.Model):
     STATUS_CHOICES = (
         ('PENDING', 'Pending'),
@@ -164,22 +221,33 @@ class Order(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     shipping_address = models.ForeignKey(Address, on_delete=models.SET_NULL, null=True, blank=True)
 
+    # Denormalized totals - kept in sync by store.signals whenever OrderItems change
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'), db_index=True, editable=False)
+    item_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of line items")
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Customer order history, newest first
+            models.Index(fields=['customer', '-order_date'], name='order_customer_date_idx'),
+            # Technician job lists and stats
+            models.Index(fields=['technician', 'status'], name='order_tech_status_idx'),
+            # Admin list filtered by status / status counters
+            models.Index(fields=['status', '-order_date'], name='order_status_date_idx'),
+            # Unfiltered admin list, recent orders, analytics date ranges
+            models.Index(fields=['-order_date'], name='order_date_idx'),
+            # "Unassigned" admin filter and dashboard tiles
+            models.Index(fields=['-order_date'], condition=models.Q(technician__isnull=True), name='order_unassigned_idx'),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} by {self.customer.name if self.customer else 'Guest'}"
 
-    @property
-    def total_amount(self):
-        """Calculate total amount with proper error handling"""
-        try:
-            total = Decimal('0.00')
-            for item in self.items.all():
-                item_total = item.get_total_item_price()
-                if item_total is not None:
-                    total += item_total
-            return total
-        except Exception as e:
-            print(f"Error calculating total amount for order {self.id}: {e}")
-            return Decimal('0.00')
+    def update_totals(self):
+        """Recompute the stored totals in SQL and refresh this instance"""
+        Order.objects.filter(pk=self.pk).update_totals()
+        self.refresh_from_db(fields=['total_amount', 'item_count'])
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
@@ -193,14 +261,12 @@ class OrderItem(models.Model):
     def get_total_item_price(self):
         """Calculate total item price with proper error handling"""
         try:
-            # Use the stored price from order time, fallback to current product price
+            # Use the stored price from order time (backfilled by migration 0010 for
+            # old items), falling back to the current product price
             item_price = self.price
             if item_price is None:
                 if self.product and self.product.price:
                     item_price = self.product.price
-                    # Update the stored price for future reference
-                    self.price = item_price
-                    self.save(update_fields=['price'])
                 else:
                     print(f"Warning: No price found for OrderItem {self.id} (Product: {self.product})")
                     return Decimal('0.00')
@@ -219,4 +285,26 @@ class OrderItem(models.Model):
         """Override save to ensure price is set"""
         if self.price is None and self.product:
             self.price = self.product.price
-        super().save(*args, **kwargs)
\ No newline at end of file
+        # Atomic so the order totals update (post_save signal) commits with the item
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
+class StockReservation(models.Model):
+    """
+    Units held for a PENDING order. Product.stock is decremented when the
+    reservation is taken, so stock always means "available to sell".
+    Managed by store.inventory; expired holds are released by the
+    release_expired_reservations command.
+    """
+    order = models.ForeignKey(Order, related_name='reservations', on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, related_name='reservations', on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.quantity} of {self.product_id} held for Order #{self.order_id}"
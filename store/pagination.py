@@ -0,0 +1,38 @@
+# store/pagination.py - Cursor pagination for catalog and technician APIs
+
+from asgiref.sync import sync_to_async
+from rest_framework.pagination import CursorPagination
+
+
+class AsyncCursorPaginationMixin:
+    """
+    apaginate_queryset(): CursorPagination.paginate_queryset() for the async
+    views (store.async_views), run in a thread since it reads the page with
+    the sync ORM. Cursors and links are DRF's own, so they work on either endpoint.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+    def get_paginated_data(self, data):
+        """The body get_paginated_response() would return, as a plain dict"""
+        return {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+
+
+class ProductCursorPagination(AsyncCursorPaginationMixin, CursorPagination):
+    """
+    Keyset pagination for the product catalog.
+    Newest products first; the cursor is opaque so clients just follow `next`.
+    """
+    page_size = 24
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class TechnicianJobCursorPagination(AsyncCursorPaginationMixin, CursorPagination):
+    """Keyset pagination for a technician's job feed, newest requests first"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-request_date', '-id')
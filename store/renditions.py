@@ -0,0 +1,158 @@
+# store/renditions.py - Resized JPEG/WebP copies of product images
+#
+# Renditions are written to content-addressed paths,
+#   renditions/<sha256[:2]>/<sha256>/<width>w.<ext>
+# so identical uploads share files and a URL never changes meaning. The
+# result is stored on the row's `image_renditions` JSON field:
+#   {'source': <image name>, 'hash': <sha256>, 'files': {'200': {'jpeg': path, 'webp': path}, ...}}
+# Rows with an empty map are pending. store.signals empties the map whenever a
+# row's image changes and queues a store.render_image job, so the rendering runs
+# on the job worker, never in the upload request itself.
+
+import hashlib
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import invalidate_products
+from .models import Product, ProductImage
+
+RENDITION_WIDTHS = (200, 400, 800)
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+RENDITION_ROOT = 'renditions'
+
+
+def content_hash(field_file):
+    digest = hashlib.sha256()
+    field_file.open('rb')
+    try:
+        for chunk in field_file.chunks():
+            digest.update(chunk)
+    finally:
+        field_file.close()
+    return digest.hexdigest()
+
+
+def rendition_path(digest, width, extension):
+    return f'{RENDITION_ROOT}/{digest[:2]}/{digest}/{width}w.{extension}'
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == 'jpeg':
+        image.convert('RGB').save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def build_renditions(field_file):
+    """Write every rendition of `field_file` (skipping files that already exist) and return the map"""
+    digest = content_hash(field_file)
+    field_file.open('rb')
+    try:
+        with Image.open(field_file) as source:
+            source = ImageOps.exif_transpose(source)
+            if source.mode not in ('RGB', 'RGBA'):
+                source = source.convert('RGBA' if 'transparency' in source.info else 'RGB')
+
+            # Never upscale: widths above the original collapse onto the original width
+            widths = sorted({min(width, source.width) for width in RENDITION_WIDTHS})
+            files = {}
+            for width in widths:
+                height = max(1, round(source.height * width / source.width))
+                resized = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+                files[str(width)] = {}
+                for fmt, extension in (('jpeg', 'jpg'), ('webp', 'webp')):
+                    path = rendition_path(digest, width, extension)
+                    if not default_storage.exists(path):
+                        default_storage.save(path, ContentFile(_encode(resized, fmt)))
+                    files[str(width)][fmt] = path
+    finally:
+        field_file.close()
+
+    return {'source': field_file.name, 'hash': digest, 'files': files}
+
+
+def render_instance(instance):
+    """
+    Generate renditions for one Product/ProductImage row. The map is only
+    saved if the row still points at the same image, so a re-upload during
+    processing is never overwritten with stale renditions.
+    """
+    renditions = build_renditions(instance.image)
+    model = type(instance)
+    updated = model.objects.filter(pk=instance.pk, image=instance.image.name).update(image_renditions=renditions)
+    if updated:
+        instance.image_renditions = renditions
+        # Catalog payloads embed the srcset; let cached copies and ETags move on
+        product_id = instance.pk if model is Product else instance.product_id
+        Product.objects.filter(pk=product_id).update(updated_at=timezone.now())
+        invalidate_products([product_id])
+    return bool(updated)
+
+
+def pending(model):
+    """Rows of `model` that have an image but no renditions yet"""
+    return model.objects.filter(image_renditions={}).exclude(image='')
+
+
+def process_pending(limit=None):
+    """Render pending rows of every image model; returns (rendered, failed)"""
+    rendered = failed = 0
+    for model in (Product, ProductImage):
+        rows = pending(model).order_by('pk')
+        for instance in (rows[:limit] if limit else rows):
+            try:
+                if render_instance(instance):
+                    rendered += 1
+            except (OSError, ValueError) as e:
+                # Missing/corrupt source file: record it so the worker doesn't retry
+                # every pass; a new upload resets the map and queues it again
+                print(f"Error rendering {model.__name__} #{instance.pk}: {e}")
+                model.objects.filter(pk=instance.pk, image=instance.image.name).update(
+                    image_renditions={'source': instance.image.name, 'error': str(e)}
+                )
+                failed += 1
+    return rendered, failed
+
+
+def unused_files(instance):
+    """
+    The image of a deleted Product/ProductImage row and its renditions, minus
+    the files another row still uses (renditions are shared by content hash)
+    """
+    paths = {instance.image.name} if instance.image else set()
+    renditions = instance.image_renditions or {}
+    digest = renditions.get('hash')
+    if digest and not any(model.objects.filter(image_renditions__hash=digest).exists() for model in (Product, ProductImage)):
+        paths |= {path for formats in renditions.get('files', {}).values() for path in formats.values()}
+    paths -= set(ProductImage.objects.filter(image__in=paths).values_list('image', flat=True))
+    paths -= set(Product.objects.filter(image__in=paths).values_list('image', flat=True))
+    return paths
+
+
+# ==================== READING ====================
+
+def rendition_urls(renditions, request=None):
+    """
+    srcset-style map for a stored renditions dict, or None while pending:
+    {'thumbnail': url, 'jpeg': 'url 200w, url 400w, ...', 'webp': '...'}
+    """
+    files = (renditions or {}).get('files')
+    if not files:
+        return None
+
+    def url(path):
+        location = default_storage.url(path)
+        return request.build_absolute_uri(location) if request else location
+
+    widths = sorted(files, key=int)
+    return {
+        'thumbnail': url(files[widths[0]]['jpeg']),
+        'jpeg': ', '.join(f"{url(files[width]['jpeg'])} {width}w" for width in widths),
+        'webp': ', '.join(f"{url(files[width]['webp'])} {width}w" for width in widths),
+    }
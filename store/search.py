@@ -0,0 +1,165 @@
+# store/search.py - Full-text product search index
+#
+# The index lives in its own table, store_product_search:
+#   SQLite      - an FTS5 virtual table (rowid = product id), ranked with bm25()
+#   PostgreSQL  - a weighted tsvector column with a GIN index, ranked with ts_rank_cd()
+# Other backends fall back to icontains filters. Rows are rewritten per product
+# by store.signals after commit; `manage.py rebuild_search_index` rebuilds everything.
+# The tables are created by store migration 0007, which spells out its own DDL.
+
+import re
+from functools import reduce
+from operator import and_, or_
+from django.db import connection, connections, router
+from django.db.models import Q
+from .models import Product
+
+INDEX_TABLE = 'store_product_search'
+INDEX_BATCH_SIZE = 500
+MAX_TERMS = 8
+
+# Column -> (bm25 weight for SQLite, tsvector weight class for PostgreSQL)
+COLUMNS = {
+    'name': (10.0, 'A'),
+    'brand': (6.0, 'B'),
+    'model_number': (6.0, 'B'),
+    'features': (3.0, 'C'),
+    'specifications': (3.0, 'C'),
+    'description': (1.0, 'D'),
+}
+FALLBACK_FIELDS = ['name', 'brand', 'model_number', 'features', 'specifications__value', 'description']
+
+
+def is_indexed():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def _source_sql(vendor):
+    """SELECT producing (product id, one text value per indexed column)"""
+    concat = "group_concat(s.value, ' ')" if vendor == 'sqlite' else "string_agg(s.value, ' ')"
+    return f"""
+        SELECT p.id, p.name, p.brand, p.model_number, p.features,
+               COALESCE((SELECT {concat} FROM store_productspecification s WHERE s.product_id = p.id), ''),
+               p.description
+        FROM store_product p
+    """
+
+
+def _document_sql():
+    """tsvector expression over the columns of _source_sql() aliased as `src`"""
+    parts = [
+        f"setweight(to_tsvector('simple', COALESCE(src.{column}, '')), '{weight}')"
+        for column, (_, weight) in COLUMNS.items()
+    ]
+    return ' || '.join(parts)
+
+
+def _insert(cursor, vendor, product_ids):
+    where, params = '', []
+    if product_ids is not None:
+        where = f" WHERE p.id IN ({', '.join(['%s'] * len(product_ids))})"
+        params = list(product_ids)
+    source = _source_sql(vendor) + where
+    if vendor == 'sqlite':
+        cursor.execute(f"INSERT INTO {INDEX_TABLE} (rowid, {', '.join(COLUMNS)}) {source}", params)
+    else:
+        aliases = ', '.join(['id', *COLUMNS])
+        cursor.execute(
+            f"INSERT INTO {INDEX_TABLE} (product_id, document) "
+            f"SELECT src.id, {_document_sql()} FROM ({source}) AS src ({aliases})",
+            params
+        )
+
+
+def index_products(product_ids):
+    """Rewrite the index rows of these products (deleted products just drop out)"""
+    if not is_indexed():
+        return
+    key = 'rowid' if connection.vendor == 'sqlite' else 'product_id'
+    product_ids = sorted(set(product_ids))
+    with connection.cursor() as cursor:
+        for start in range(0, len(product_ids), INDEX_BATCH_SIZE):
+            batch = product_ids[start:start + INDEX_BATCH_SIZE]
+            cursor.execute(
+                f"DELETE FROM {INDEX_TABLE} WHERE {key} IN ({', '.join(['%s'] * len(batch))})", batch
+            )
+            _insert(cursor, connection.vendor, batch)
+
+
+def rebuild_index():
+    """Rebuild the whole index in one statement; returns the number of indexed products"""
+    if not is_indexed():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {INDEX_TABLE}")
+        _insert(cursor, connection.vendor, None)
+    return Product.objects.count()
+
+
+# ==================== QUERYING ====================
+
+def query_terms(query):
+    """Lower-cased word tokens of a user query (punctuation dropped, so safe to quote)"""
+    return re.findall(r'[^\W_]+', query.lower())[:MAX_TERMS]
+
+
+def substring_q(query, fields=FALLBACK_FIELDS):
+    """Q matching products that contain every term of `query` in one of `fields` (no index)"""
+    return reduce(and_, [
+        reduce(or_, [Q(**{f'{field}__icontains': term}) for field in fields])
+        for term in query_terms(query)
+    ], Q())
+
+
+def search_product_ids(query, limit=20, active_only=True):
+    """
+    Product ids matching every term of `query`, best match first. Each term
+    also matches as a prefix, so partial input works for autocomplete.
+    `limit=None` returns every match.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+
+    # Served by whichever database the router picks for reads, so
+    # @read_from_replica views search the replica's copy of the index
+    reader = connections[router.db_for_read(Product)]
+    active = ' AND p.is_active' if active_only else ''
+    if reader.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight, _ in COLUMNS.values())
+        sql = (
+            f"SELECT p.id FROM {INDEX_TABLE} JOIN store_product p ON p.id = {INDEX_TABLE}.rowid "
+            f"WHERE {INDEX_TABLE} MATCH %s{active} "
+            f"ORDER BY bm25({INDEX_TABLE}, {weights}), p.id LIMIT %s"
+        )
+        params = [match, -1 if limit is None else limit]
+    elif reader.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        sql = (
+            f"SELECT p.id FROM {INDEX_TABLE} i JOIN store_product p ON p.id = i.product_id "
+            f"WHERE i.document @@ to_tsquery('simple', %s){active} "
+            f"ORDER BY ts_rank_cd(i.document, to_tsquery('simple', %s)) DESC, p.id"
+        )
+        params = [tsquery, tsquery]
+        if limit is not None:
+            sql += ' LIMIT %s'
+            params.append(limit)
+    else:
+        products = Product.objects.filter(substring_q(query))
+        if active_only:
+            products = products.filter(is_active=True)
+        ids = products.distinct().order_by('-created_at').values_list('id', flat=True)
+        return list(ids if limit is None else ids[:limit])
+
+    with reader.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_products(query, limit=20, queryset=None):
+    """Active products matching `query` in rank order"""
+    ids = search_product_ids(query, limit=limit)
+    queryset = Product.objects.all() if queryset is None else queryset
+    found = queryset.in_bulk(ids)
+    return [found[product_id] for product_id in ids if product_id in found]
@@ -1,6 +1,7 @@
 # store/serializers.py - Updated with better can_rate logic
 from rest_framework import serializers
 from .models import Product, ProductCategory, ProductImage, ProductSpecification, Address, Order, OrderItem
+from .renditions import rendition_urls
 
 class ProductCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,27 +9,48 @@ class ProductCategorySerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug']
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'order']
+        fields = ['id', 'image', 'srcset', 'alt_text', 'is_primary', 'order']
+
+    def get_srcset(self, obj):
+        """Resized JPEG/WebP variants, or None until the renditions worker has run"""
+        return rendition_urls(obj.image_renditions, self.context.get('request'))
 
 class ProductSpecificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductSpecification
         fields = ['id', 'name', 'value', 'order']
 
-class ProductSerializer(serializers.ModelSerializer):
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that takes an optional `fields` kwarg and only
+    renders those fields (used for the `?fields=` projection).
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            allowed = set(fields)
+            for field_name in set(self.fields) - allowed:
+                self.fields.pop(field_name)
+
+class ProductSerializer(DynamicFieldsModelSerializer):
     # To show the category name instead of just its ID
     category = ProductCategorySerializer(read_only=True)
     additional_images = ProductImageSerializer(many=True, read_only=True)
     specifications = ProductSpecificationSerializer(many=True, read_only=True)
     features_list = serializers.SerializerMethodField()
     all_images = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
-            'id', 'name', 'slug', 'description', 'price', 'image', 'category', 
+            'id', 'name', 'slug', 'description', 'price', 'image', 'image_srcset', 'category', 
             'stock', 'delivery_time_info', 'brand', 'model_number', 'weight', 
             'dimensions', 'warranty_period', 'features', 'features_list', 
             'is_featured', 'is_active', 'additional_images', 'specifications',
@@ -42,6 +64,10 @@ class ProductSerializer(serializers.ModelSerializer):
         """Return all images avoiding duplicates - uses the fixed model property"""
         return obj.all_images
 
+    def get_image_srcset(self, obj):
+        """Resized JPEG/WebP variants of the main image, or None until rendered"""
+        return rendition_urls(obj.image_renditions, self.context.get('request'))
+
 class ProductDetailSerializer(ProductSerializer):
     """Extended serializer for product detail view with all related data"""
     
@@ -120,6 +146,10 @@ class OrderItemSerializer(serializers.ModelSerializer):
         try:
             if obj.product and obj.product.image:
                 request = self.context.get('request')
+                # Order lists only need a thumbnail; use the smallest rendition once it exists
+                renditions = rendition_urls(obj.product.image_renditions, request)
+                if renditions:
+                    return renditions['thumbnail']
                 if request:
                     return request.build_absolute_uri(obj.product.image.url)
                 else:
@@ -129,7 +159,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
             return None
 
 class OrderSerializer(serializers.ModelSerializer):
-    items = OrderItemSerializer(many=True, read_only=True)
+    items = serializers.SerializerMethodField()
     shipping_address_details = AddressSerializer(source='shipping_address', read_only=True)
     technician_name = serializers.CharField(source='technician.name', read_only=True)
     technician_phone = serializers.CharField(source='technician.phone', read_only=True)
@@ -147,8 +177,35 @@ class OrderSerializer(serializers.ModelSerializer):
             'customer_email', 'can_rate'
         ]
     
+    def get_items(self, obj):
+        """
+        Line items, from context['order_items'] - {order_id: [OrderItem]} the
+        view already holds (e.g. just bulk-created) - or else obj.items, which
+        uses a prefetch_related('items') if there is one
+        """
+        items = self.context.get('order_items', {}).get(obj.pk)
+        if items is None:
+            items = obj.items.all()
+        return OrderItemSerializer(items, many=True, context=self.context).data
+
     def get_can_rate(self, obj):
-        """Check if user can rate this order"""
+        """
+        Check if user can rate this order.
+
+        List views should not pay a query per row, so the flag is looked up in:
+        1. context['can_rate'] - {order_id: bool} precomputed by the view
+           (e.g. with Order.objects.can_rate_flags(orders))
+        2. obj.can_rate_flag - annotated by Order.objects.with_can_rate()
+        3. a query for this one order
+        """
+        flags = self.context.get('can_rate')
+        if flags is not None and obj.pk in flags:
+            return flags[obj.pk]
+
+        annotated = getattr(obj, 'can_rate_flag', None)
+        if annotated is not None:
+            return annotated
+
         try:
             # Import here to avoid circular imports
             from services.models import TechnicianRating
@@ -159,10 +216,10 @@ class OrderSerializer(serializers.ModelSerializer):
             # 3. No rating exists yet for this order by this customer
             return (
                 obj.status == 'DELIVERED' and 
-                obj.technician is not None and
+                obj.technician_id is not None and
                 not TechnicianRating.objects.filter(
                     order=obj, 
-                    customer=obj.customer
+                    customer_id=obj.customer_id
                 ).exists()
             )
         except Exception as e:
@@ -0,0 +1,154 @@
+# store/signals.py - Keep denormalized order totals and catalog caches in sync
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from jobs.queue import enqueue
+from .cache import bump, product_namespaces
+from .models import Order, OrderItem, Product, ProductCategory, ProductImage, ProductSpecification
+from .search import index_products
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def sync_order_totals(sender, instance, **kwargs):
+    """Recompute Order.total_amount/item_count when one of its items changes"""
+    Order.objects.filter(pk=instance.order_id).update_totals()
+
+    # Keep an in-memory order (e.g. the one passed to OrderItem.objects.create) current
+    if OrderItem.order.is_cached(instance):
+        order = instance.order
+        if order.pk is not None:
+            order.refresh_from_db(fields=['total_amount', 'item_count'])
+
+
+@receiver(pre_delete, sender=Order)
+def release_deleted_order_stock(sender, instance, **kwargs):
+    """Reservations cascade with the order; give their units back first"""
+    from .inventory import release_order_stock
+    release_order_stock(instance)
+
+
+# ==================== CATALOG CACHE INVALIDATION ====================
+
+# Set by bulk writers (store.importer) that touch updated_at, reindex and bump
+# the cache once for all the products they change, instead of per child row
+_bulk_write = ContextVar('catalog_bulk_write', default=False)
+
+
+@contextmanager
+def bulk_catalog_write():
+    """Skip the per-row image/specification receivers below inside the block"""
+    token = _bulk_write.set(True)
+    try:
+        yield
+    finally:
+        _bulk_write.reset(token)
+
+
+def _bump_on_commit(*namespaces):
+    """Invalidate after the write is visible, so readers can't re-cache old rows"""
+    transaction.on_commit(lambda: bump(*namespaces))
+
+
+def _invalidate_products(slugs, category_ids):
+    category_slugs = ProductCategory.objects.filter(
+        id__in=[category_id for category_id in category_ids if category_id]
+    ).values_list('slug', flat=True)
+    _bump_on_commit(*product_namespaces(slugs, list(category_slugs)))
+
+
+@receiver(post_init, sender=Product)
+def remember_catalog_keys(sender, instance, **kwargs):
+    # Needed to invalidate the old slug/category when a product is renamed or moved.
+    # Raw attributes, so deferred loads (.only()) don't query per instance.
+    instance._catalog_slug = instance.__dict__.get('slug')
+    instance._catalog_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    _invalidate_products(
+        {instance.slug, instance._catalog_slug},
+        {instance.category_id, instance._catalog_category_id}
+    )
+    instance._catalog_slug = instance.slug
+    instance._catalog_category_id = instance.category_id
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductSpecification)
+@receiver(post_delete, sender=ProductSpecification)
+def invalidate_product_children(sender, instance, **kwargs):
+    if _bulk_write.get():
+        return
+    product = Product.objects.filter(pk=instance.product_id).values('slug', 'category_id').first()
+    if product:
+        # Images/specs have no timestamp of their own; updated_at versions the
+        # whole detail payload for ETag / Last-Modified (see store.conditional)
+        Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+        _invalidate_products({product['slug']}, {product['category_id']})
+    else:
+        # Product is being deleted too; its own signal covers the detail key
+        _bump_on_commit('products')
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def invalidate_category(sender, instance, **kwargs):
+    _bump_on_commit('catalog', 'products', f'category:{instance.slug}')
+
+
+# ==================== SEARCH INDEX ====================
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def reindex_product(sender, instance, **kwargs):
+    product_id = instance.pk
+    transaction.on_commit(lambda: index_products([product_id]))
+
+
+@receiver(post_save, sender=ProductSpecification)
+@receiver(post_delete, sender=ProductSpecification)
+def reindex_product_specifications(sender, instance, **kwargs):
+    if _bulk_write.get():
+        return
+    product_id = instance.product_id
+    transaction.on_commit(lambda: index_products([product_id]))
+
+
+# ==================== IMAGE RENDITIONS ====================
+
+def _image_name(instance):
+    value = instance.__dict__.get('image')
+    return getattr(value, 'name', value)
+
+
+@receiver(post_init, sender=Product)
+@receiver(post_init, sender=ProductImage)
+def remember_rendition_source(sender, instance, **kwargs):
+    instance._rendition_source = _image_name(instance)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ProductImage)
+def queue_renditions(sender, instance, created, **kwargs):
+    """Empty the renditions map of a new image and queue the job that renders it"""
+    image_name = _image_name(instance)
+    if image_name == instance._rendition_source and not created:
+        return
+    if instance.image_renditions:
+        sender.objects.filter(pk=instance.pk).update(image_renditions={})
+        instance.image_renditions = {}
+    if image_name:
+        enqueue(
+            'store.render_image',
+            model=sender._meta.label, pk=instance.pk, image=image_name,
+            idempotency_key=f'render:{sender._meta.label}:{instance.pk}:{image_name}'
+        )
+    instance._rendition_source = image_name
@@ -0,0 +1,35 @@
+# store/tasks.py - Background jobs for the store app (run by `manage.py run_worker`)
+
+from datetime import timedelta
+from django.apps import apps
+from django.core.files.storage import default_storage
+
+from jobs.queue import task
+from .inventory import release_expired_reservations
+from .renditions import process_pending, render_instance
+
+
+@task('store.render_image', max_attempts=3)
+def render_image(model, pk, image):
+    """Render one uploaded image, unless it has been replaced or rendered since"""
+    instance = apps.get_model(model).objects.filter(pk=pk, image=image, image_renditions={}).first()
+    if instance:
+        render_instance(instance)
+
+
+@task('store.render_pending', every=timedelta(minutes=15))
+def render_pending():
+    """Catch up on images whose render_image job failed or predates the queue"""
+    process_pending()
+
+
+@task('store.delete_files')
+def delete_files(paths):
+    for path in paths:
+        if path and default_storage.exists(path):
+            default_storage.delete(path)
+
+
+@task('store.release_expired_reservations', every=timedelta(minutes=5))
+def release_reservations():
+    release_expired_reservations()
@@ -0,0 +1,58 @@
+# store/technician_jobs.py - Shared job feed for the technician service endpoints
+#
+# The job sheet id/status come from a LEFT JOIN on the one-to-one relation,
+# so a page costs one query no matter how many jobs the technician has.
+
+from django.db.models import F
+from services.models import ServiceRequest
+from .pagination import TechnicianJobCursorPagination
+
+
+def assigned_services(technician):
+    """Services assigned to `technician` with their job sheet id and status annotated"""
+    return ServiceRequest.objects.filter(
+        technician=technician
+    ).select_related(
+        'customer', 'service_category', 'issue', 'service_location'
+    ).annotate(
+        job_sheet_ref=F('job_sheet__id'),
+        job_sheet_state=F('job_sheet__approval_status'),
+    )
+
+
+def serialize_service(service):
+    customer = service.customer
+    location = service.service_location
+    return {
+        'id': service.id,
+        'customer': {
+            'name': customer.name if customer else 'Unknown',
+            'phone': customer.phone if customer else 'N/A',
+            'email': customer.email if customer else 'N/A',
+        },
+        'service_category': {
+            'name': service.service_category.name
+        },
+        'issue': {
+            'description': service.issue.description
+        } if service.issue else None,
+        'custom_description': service.custom_description,
+        'service_location': {
+            'street_address': location.street_address,
+            'city': location.city,
+            'state': location.state,
+            'pincode': location.pincode,
+        } if location else None,
+        'request_date': service.request_date,
+        'status': service.status,
+        'has_job_sheet': service.job_sheet_ref is not None,
+        'job_sheet_status': service.job_sheet_state,
+        'job_sheet_id': service.job_sheet_ref,
+    }
+
+
+def job_feed_response(request, view=None):
+    """Cursor-paginated response with the requesting technician's services"""
+    paginator = TechnicianJobCursorPagination()
+    page = paginator.paginate_queryset(assigned_services(request.user), request, view=view)
+    return paginator.get_paginated_response([serialize_service(service) for service in page])
@@ -4,13 +4,17 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from django.db import transaction
 from django.db.models import Avg, Count, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .models import Order, OrderItem
 from .serializers import OrderSerializer
+from .technician_jobs import job_feed_response
 from services.models import ServiceRequest, TechnicianRating
 from services.serializers import ServiceRequestSerializer
+from services.technician_stats import technician_stats as get_technician_stats
+from notifications.outbox import notify
 
 class TechnicianAssignedOrdersView(APIView):
     """Get orders assigned to the technician"""
@@ -56,65 +60,14 @@ class TechnicianAssignedOrdersView(APIView):
         return Response(orders_data)
 
 class TechnicianAssignedServicesView(APIView):
-    """Get service requests assigned to the technician"""
+    """Get service requests assigned to the technician (cursor-paginated, see store.technician_jobs)"""
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
         if request.user.role != 'TECHNICIAN':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        from services.models import JobSheet
-        
-        services = ServiceRequest.objects.filter(
-            technician=request.user
-        ).select_related(
-            'customer', 'service_category', 'issue', 'service_location'
-        ).order_by('-request_date')
-        
-        # Enhanced serializer data with job sheet information
-        services_data = []
-        for service in services:
-            # Check for job sheet
-            try:
-                job_sheet = JobSheet.objects.get(service_request=service)
-                has_job_sheet = True
-                job_sheet_status = job_sheet.approval_status
-                job_sheet_id = job_sheet.id
-            except JobSheet.DoesNotExist:
-                has_job_sheet = False
-                job_sheet_status = None
-                job_sheet_id = None
-            
-            service_data = {
-                'id': service.id,
-                'customer': {
-                    'name': service.customer.name if service.customer else 'Unknown',
-                    'phone': service.customer.phone if service.customer else 'N/A',
-                    'email': service.customer.email if service.customer else 'N/A',
-                },
-                'service_category': {
-                    'name': service.service_category.name
-                },
-                'issue': {
-                    'description': service.issue.description
-                } if service.issue else None,
-                'custom_description': service.custom_description,
-                'service_location': {
-                    'street_address': service.service_location.street_address if service.service_location else '',
-                    'city': service.service_location.city if service.service_location else '',
-                    'state': service.service_location.state if service.service_location else '',
-                    'pincode': service.service_location.pincode if service.service_location else '',
-                } if service.service_location else None,
-                'request_date': service.request_date,
-                'status': service.status,
-                # Job sheet fields - NEW
-                'has_job_sheet': has_job_sheet,
-                'job_sheet_status': job_sheet_status,
-                'job_sheet_id': job_sheet_id,
-            }
-            services_data.append(service_data)
-        
-        return Response(services_data)
+        return job_feed_response(request, view=self)
 
 class TechnicianStatsView(APIView):
     """Get technician statistics"""
@@ -124,40 +77,18 @@ class TechnicianStatsView(APIView):
         if request.user.role != 'TECHNICIAN':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        technician = request.user
-        
-        # Order stats
-        total_orders = Order.objects.filter(technician=technician).count()
-        completed_orders = Order.objects.filter(technician=technician, status='DELIVERED').count()
-        
-        # Service stats
-        total_services = ServiceRequest.objects.filter(technician=technician).count()
-        completed_services = ServiceRequest.objects.filter(technician=technician, status='COMPLETED').count()
-        
-        # Rating stats
-        ratings = TechnicianRating.objects.filter(technician=technician)
-        average_rating = ratings.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
-        
-        # This month completed tasks
-        current_month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        this_month_orders = Order.objects.filter(
-            technician=technician, 
-            status='DELIVERED',
-            order_date__gte=current_month
-        ).count()
-        this_month_services = ServiceRequest.objects.filter(
-            technician=technician, 
-            status='COMPLETED',
-            request_date__gte=current_month
-        ).count()
-        
+        # Pre-aggregated counters (services.technician_stats) instead of six live queries
+        technician_stats = get_technician_stats(request.user)
+
         stats = {
-            'total_orders': total_orders,
-            'completed_orders': completed_orders,
-            'total_services': total_services,
-            'completed_services': completed_services,
-            'average_rating': round(average_rating, 1) if average_rating else 0,
-            'this_month_completed': this_month_orders + this_month_services,
+            'total_orders': technician_stats.total_orders,
+            'completed_orders': technician_stats.completed_orders,
+            'total_services': technician_stats.total_services,
+            'completed_services': technician_stats.completed_services,
+            'average_rating': round(float(technician_stats.average_rating), 1) if technician_stats.average_rating else 0,
+            'rating_count': technician_stats.rating_count,
+            'rating_histogram': technician_stats.rating_histogram,
+            'this_month_completed': technician_stats.month_completed_orders + technician_stats.month_completed_services,
         }
         
         return Response(stats)
@@ -176,8 +107,10 @@ class CompleteOrderView(APIView):
             if order.status == 'DELIVERED':
                 return Response({'error': 'Order already marked as delivered'}, status=status.HTTP_400_BAD_REQUEST)
             
-            order.status = 'DELIVERED'
-            order.save()
+            with transaction.atomic():
+                order.status = 'DELIVERED'
+                order.save()
+                notify(order.customer, 'order_delivered', order_id=order.id)
             
             return Response({'message': 'Order marked as delivered successfully'})
             
@@ -1,3 +1,738 @@
-from django.test import TestCase
+import hashlib
+import tempfile
+from importlib import import_module
+import threading
+import time
+from decimal import Decimal
+from io import BytesIO, StringIO
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from PIL import Image
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ecom_project import replica
+from jobs.models import Job
+from jobs.queue import TASKS
+from services.models import TechnicianRating
+from . import cache as catalog_cache, views
+from .filters import filter_products
+from .importer import import_products
+from .search import search_product_ids
+from .inventory import (
+    InsufficientStock, commit_order_stock, release_expired_reservations,
+    release_order_stock, reserve_order_stock, return_stock, take_stock,
+)
+from .renditions import build_renditions, rendition_path, rendition_urls
+from .models import (
+    Address, Order, OrderItem, Product, ProductCategory, ProductImage, ProductSpecification, StockReservation
+)
+
+
+def make_product(category, slug, stock):
+    return Product.objects.create(
+        category=category, name=slug.title(), slug=slug, description='-',
+        price=Decimal('100.00'), image='products/test.jpg', stock=stock,
+        delivery_time_info='2-3 days'
+    )
+
+
+def make_order(customer, lines):
+    order = Order.objects.create(customer=customer, status='PENDING')
+    for product, quantity in lines:
+        OrderItem.objects.create(order=order, product=product, quantity=quantity, price=product.price)
+    return order
+
+
+class OrderTotalsTests(TestCase):
+    def setUp(self):
+        self.customer = get_user_model().objects.create_user(
+            email='totals@example.com', password='pass12345', name='Totals'
+        )
+        category = ProductCategory.objects.create(name='Storage', slug='storage')
+        self.disk = make_product(category, 'disk', 10)
+        self.stick = make_product(category, 'stick', 10)
+
+    def test_item_writes_keep_stored_totals_in_sync(self):
+        order = make_order(self.customer, [(self.disk, 2), (self.stick, 1)])
+        order.refresh_from_db()
+        self.assertEqual((order.total_amount, order.item_count), (Decimal('300.00'), 2))
+
+        item = order.items.get(product=self.disk)
+        item.quantity = 5
+        item.save()
+        order.refresh_from_db()
+        self.assertEqual(order.total_amount, Decimal('600.00'))
+
+        item.delete()
+        order.refresh_from_db()
+        self.assertEqual((order.total_amount, order.item_count), (Decimal('100.00'), 1))
+
+    def test_backfill_command_repairs_stale_totals(self):
+        order = make_order(self.customer, [(self.disk, 3)])
+        Order.objects.update(total_amount=Decimal('0.00'), item_count=0)
+
+        out = StringIO()
+        call_command('backfill_order_totals', '--dry-run', stdout=out)
+        self.assertIn('1 orders have totals', out.getvalue())
+        call_command('backfill_order_totals', stdout=StringIO())
+        order.refresh_from_db()
+        self.assertEqual((order.total_amount, order.item_count), (Decimal('300.00'), 1))
+
+
+class OrderListTests(TestCase):
+    def setUp(self):
+        self.customer = get_user_model().objects.create_user(
+            email='history@example.com', password='pass12345', name='History'
+        )
+        self.technician = get_user_model().objects.create_user(
+            email='fixer@example.com', password='pass12345', name='Fixer', role='TECHNICIAN'
+        )
+        self.product = make_product(ProductCategory.objects.create(name='Routers', slug='routers'), 'router', 50)
+        self.client.force_login(self.customer)
+
+    def _delivered_order(self, rated=False):
+        order = make_order(self.customer, [(self.product, 1)])
+        order.status = 'DELIVERED'
+        order.technician = self.technician
+        order.save()
+        if rated:
+            TechnicianRating.objects.create(
+                technician=self.technician, customer=self.customer, order=order, rating=5
+            )
+        return order
+
+    def test_can_rate_costs_no_query_per_order(self):
+        rated = self._delivered_order(rated=True)
+        unrated = self._delivered_order()
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get('/api/orders/')
+        flags = {order['id']: order['can_rate'] for order in response.json()}
+        self.assertEqual(flags, {rated.id: False, unrated.id: True})
+
+        for _ in range(5):
+            self._delivered_order()
+        with self.assertNumQueries(len(few)):
+            response = self.client.get('/api/orders/')
+        self.assertEqual(len(response.json()), 7)
+
+
+class CatalogFilterTests(TestCase):
+    def test_brand_filter_is_case_insensitive_for_several_brands(self):
+        category = ProductCategory.objects.create(name='Audio', slug='audio')
+        for slug, brand in [('buds', 'Sony'), ('pods', 'APPLE'), ('bar', 'Bose')]:
+            product = make_product(category, slug, 1)
+            Product.objects.filter(pk=product.pk).update(brand=brand)
+
+        products = filter_products(Product.objects.all(), {'brand': 'sony, apple'})
+        self.assertEqual(sorted(products.values_list('slug', flat=True)), ['buds', 'pods'])
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        caches[settings.CATALOG_CACHE_ALIAS].clear()
+        laptops = ProductCategory.objects.create(name='Laptops', slug='laptops')
+        phones = ProductCategory.objects.create(name='Phones', slug='phones')
+        for category, slug, brand, price in [
+            (laptops, 'hp-1', 'HP', '45000.00'),
+            (laptops, 'hp-2', 'HP', '60000.00'),
+            (laptops, 'dell-1', 'Dell', '55000.00'),
+            (phones, 'hp-phone', 'HP', '900.00'),
+        ]:
+            product = make_product(category, slug, 3)
+            Product.objects.filter(pk=product.pk).update(brand=brand, price=Decimal(price))
+
+    def test_each_facet_ignores_its_own_filter(self):
+        data = self.client.get('/api/products/', {'category': 'laptops', 'brand': 'hp', 'facets': 'true'}).json()
+        facets = data['facets']
+        # Other brands stay listed with what picking them would give
+        self.assertEqual(facets['brand'], [{'value': 'HP', 'count': 2}, {'value': 'Dell', 'count': 1}])
+        self.assertEqual(
+            [(row['slug'], row['count']) for row in facets['category']], [('laptops', 2), ('phones', 1)]
+        )
+        prices = {row['key']: row['count'] for row in facets['price']}
+        self.assertEqual((prices['20000-50000'], prices['50000-100000'], prices['under-1000']), (1, 1, 0))
+        self.assertEqual(len(data['results']), 2)
+
+    def test_facets_are_cached_until_the_catalog_changes(self):
+        params = {'category': 'laptops', 'facets': 'true'}
+        self.client.get('/api/products/', params)
+        with CaptureQueriesContext(connection) as cached:
+            self.client.get('/api/products/', params)
+        self.assertFalse([query for query in cached if 'GROUP BY' in query['sql']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.get(slug='dell-1')
+            product.brand = 'Lenovo'
+            product.save()
+        brands = self.client.get('/api/products/', params).json()['facets']['brand']
+        self.assertIn({'value': 'Lenovo', 'count': 1}, brands)
+
+
+class ProductImportTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        ProductCategory.objects.create(name='Cameras', slug='cameras')
+        for name in ('a.jpg', 'b.jpg', 'c.jpg', 'd.jpg'):
+            default_storage.save(name, ContentFile(b'jpeg'))
+
+    def _import(self, images, specs):
+        rows = [(1, {
+            'slug': 'cam', 'name': 'Cam', 'category': 'cameras', 'price': '10', 'stock': '1', 'image': 'a.jpg',
+            'additional_images': images, 'specifications': specs,
+        })]
+        with self.captureOnCommitCallbacks(execute=True):
+            report = import_products(rows)
+        self.assertEqual(report.failed, 0, report.errors)
+
+    def test_reimport_replaces_children_and_queues_unused_files(self):
+        self._import(['b.jpg', 'c.jpg'], {'Zoom': '3x'})
+        self._import(['a.jpg', 'c.jpg', 'd.jpg'], {'Zoom': '5x', 'Sensor': 'APS-C'})
+
+        product = Product.objects.get(slug='cam')
+        self.assertEqual(sorted(product.additional_images.values_list('image', flat=True)), ['a.jpg', 'c.jpg', 'd.jpg'])
+        self.assertEqual(dict(product.specifications.values_list('name', 'value')), {'Zoom': '5x', 'Sensor': 'APS-C'})
+        # Only b.jpg is no longer used (a.jpg is also the main image)
+        job = Job.objects.get(task='store.delete_files')
+        self.assertEqual(job.kwargs, {'paths': ['b.jpg']})
+        TASKS[job.task](**job.kwargs)
+        self.assertFalse(default_storage.exists('b.jpg'))
+        self.assertTrue(default_storage.exists('c.jpg'))
+
+    def test_reimport_queries_do_not_grow_with_children(self):
+        self._import(['b.jpg'], {'Zoom': '3x'})
+        with CaptureQueriesContext(connection) as few:
+            self._import(['c.jpg'], {'Zoom': '5x'})
+        self._import(['b.jpg', 'c.jpg', 'd.jpg'], {'Zoom': '1x', 'Sensor': 'FF', 'Mount': 'E'})
+        with CaptureQueriesContext(connection) as many:
+            self._import(['a.jpg', 'c.jpg', 'd.jpg'], {'Zoom': '2x', 'Sensor': 'APS-C', 'Mount': 'RF'})
+        self.assertEqual(len(many), len(few))
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        caches[settings.CATALOG_CACHE_ALIAS].clear()
+        category = ProductCategory.objects.create(name='Monitors', slug='monitors')
+        self.product = make_product(category, 'screen', 2)
+
+    def test_product_save_invalidates_cached_pages(self):
+        self.assertEqual(self.client.get('/api/products/').json()['results'][0]['price'], '100.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = Decimal('80.00')
+            self.product.save()
+        self.assertEqual(self.client.get('/api/products/').json()['results'][0]['price'], '80.00')
+        self.assertEqual(self.client.get('/api/products/screen/').json()['price'], '80.00')
+
+    def test_stock_changes_bump_lists_only_when_crossing_zero(self):
+        namespaces = ['products', 'category:monitors', 'product:screen']
+
+        def bumped(change):
+            before = catalog_cache.get_versions(namespaces)
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            after = catalog_cache.get_versions(namespaces)
+            return sorted(namespace for namespace in namespaces if after[namespace] != before[namespace])
+
+        self.assertEqual(bumped(lambda: take_stock({self.product.pk: 1})), ['product:screen'])
+        self.assertEqual(bumped(lambda: take_stock({self.product.pk: 1})), sorted(namespaces))
+        self.assertEqual(bumped(lambda: return_stock({self.product.pk: 1})), sorted(namespaces))
+        self.assertEqual(bumped(lambda: return_stock({self.product.pk: 1})), ['product:screen'])
+
+
+class ConditionalCatalogTests(TestCase):
+    def setUp(self):
+        caches[settings.CATALOG_CACHE_ALIAS].clear()
+        self.category = ProductCategory.objects.create(name='Tablets', slug='tablets')
+        make_product(self.category, 'tab', 3)
+
+    def test_unchanged_list_is_a_304_without_queries(self):
+        response = self.client.get('/api/products/?category=tablets')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/products/?category=tablets', headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_category_rename_changes_the_list_etag(self):
+        etag = self.client.get('/api/products/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Slates'
+            self.category.save()
+
+        response = self.client.get('/api/products/', headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['category']['name'], 'Slates')
+
+
+    def test_edit_in_another_category_changes_the_facets_etag(self):
+        other = ProductCategory.objects.create(name='Phones', slug='phones')
+        phone = make_product(other, 'phone', 3)
+        query = '/api/products/?category=tablets&facets=true'
+        etag = self.client.get(query)['ETag']
+        plain_etag = self.client.get('/api/products/?category=tablets')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            phone.is_active = False
+            phone.save()
+
+        response = self.client.get(query, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['slug'] for row in response.json()['facets']['category']], ['tablets'])
+        # Without facets the page only depends on its own category
+        response = self.client.get('/api/products/?category=tablets', headers={'if-none-match': plain_etag})
+        self.assertEqual(response.status_code, 304)
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        category = ProductCategory.objects.create(name='Computers', slug='computers')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bag = make_product(category, 'bag', 5)
+            self.bag.description = 'Padded sleeve for any laptop'
+            self.bag.save()
+            self.laptop = make_product(category, 'gaming-laptop', 5)
+            self.hidden = make_product(category, 'old-laptop', 5)
+            self.hidden.is_active = False
+            self.hidden.save()
+            ProductSpecification.objects.create(product=self.laptop, name='RAM', value='32GB DDR5')
+
+    def test_fts5_ranks_name_matches_first_and_matches_prefixes(self):
+        self.assertEqual(connection.vendor, 'sqlite')
+        self.assertEqual(search_product_ids('lapt'), [self.laptop.pk, self.bag.pk])
+        self.assertEqual(search_product_ids('ddr5'), [self.laptop.pk])
+        self.assertEqual(search_product_ids('old lap', active_only=False), [self.hidden.pk])
+
+    def test_search_runs_on_the_database_routed_for_reads(self):
+        with mock.patch('store.search.router.db_for_read', return_value='default') as route:
+            self.assertEqual(search_product_ids('ddr5'), [self.laptop.pk])
+        route.assert_called_once_with(Product)
+
+    def test_migration_builds_the_index_from_existing_products(self):
+        migration = import_module('store.migrations.0007_product_search_index')
+        # Not entered: SQLite can't toggle foreign key checks inside the test transaction
+        schema_editor = connection.schema_editor()
+        migration.drop_search_index(None, schema_editor)
+        migration.create_search_index(None, schema_editor)
+        self.assertEqual(search_product_ids('ddr5 gaming'), [self.laptop.pk])
+
+
+class OrderItemPriceTests(TestCase):
+    def test_total_of_an_item_without_price_does_not_write(self):
+        customer = get_user_model().objects.create_user(email='old@example.com', password='pass12345', name='Old')
+        product = make_product(ProductCategory.objects.create(name='Cables', slug='cables'), 'cable', 5)
+        item = make_order(customer, [(product, 3)]).items.get()
+        OrderItem.objects.filter(pk=item.pk).update(price=None)
+        item.refresh_from_db()
+        jobs = Job.objects.count()
+
+        # Just the product lookup
+        with self.assertNumQueries(1):
+            self.assertEqual(item.get_total_item_price(), Decimal('300.00'))
+        self.assertEqual(Job.objects.count(), jobs)
+
+
+def png_bytes(width, height, color='red'):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class RenditionTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.category = ProductCategory.objects.create(name='Cameras', slug='cameras')
+        self.product = make_product(self.category, 'camera', 1)
+        # make_product's image file doesn't exist; drop its render job
+        Job.objects.all().delete()
+
+    def _run_jobs(self, task):
+        for job in Job.objects.filter(task=task, status='QUEUED'):
+            TASKS[job.task](**job.kwargs)
+            job.delete()
+
+    def test_renditions_are_content_hashed_and_never_upscaled(self):
+        content = png_bytes(600, 300)
+        digest = hashlib.sha256(content).hexdigest()
+        name = default_storage.save('products/wide.png', ContentFile(content))
+
+        renditions = build_renditions(default_storage.open(name))
+        self.assertEqual(renditions['hash'], digest)
+        self.assertEqual(sorted(renditions['files'], key=int), ['200', '400', '600'])
+        for width, formats in renditions['files'].items():
+            for fmt, extension in (('jpeg', 'jpg'), ('webp', 'webp')):
+                self.assertEqual(formats[fmt], rendition_path(digest, width, extension))
+                with default_storage.open(formats[fmt]) as f, Image.open(f) as image:
+                    self.assertEqual(image.size, (int(width), int(width) // 2))
+
+        # Same content again: same map, nothing rewritten
+        files = sorted(default_storage.listdir(f'renditions/{digest[:2]}/{digest}')[1])
+        copy = default_storage.save('products/copy.png', ContentFile(content))
+        self.assertEqual(build_renditions(default_storage.open(copy))['files'], renditions['files'])
+        self.assertEqual(sorted(default_storage.listdir(f'renditions/{digest[:2]}/{digest}')[1]), files)
+
+    def test_saving_an_image_queues_its_render_job(self):
+        name = default_storage.save('products/cam.png', ContentFile(png_bytes(500, 500)))
+        self.product.image = name
+        self.product.save()
+        self.assertEqual(self.product.image_renditions, {})
+        self._run_jobs('store.render_image')
+
+        self.product.refresh_from_db()
+        srcset = rendition_urls(self.product.image_renditions)
+        self.assertEqual(srcset['thumbnail'], default_storage.url(self.product.image_renditions['files']['200']['jpeg']))
+        self.assertRegex(srcset['webp'], r'^\S+/200w\.webp 200w, \S+/400w\.webp 400w, \S+/500w\.webp 500w$')
+        self.assertIsNone(rendition_urls({}))
+
+    def test_sweep_renders_pending_rows_and_records_broken_ones(self):
+        name = default_storage.save('gallery/side.png', ContentFile(png_bytes(300, 200)))
+        with mock.patch('store.signals.enqueue'):
+            image = ProductImage.objects.create(product=self.product, image=name)
+        TASKS['store.render_pending']()
+
+        image.refresh_from_db()
+        self.assertEqual(sorted(image.image_renditions['files']), ['200', '300'])
+        # make_product's image file doesn't exist
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.image_renditions['source'], 'products/test.jpg')
+        self.assertIn('error', self.product.image_renditions)
+
+    def test_deleting_an_image_queues_its_file_and_unshared_renditions(self):
+        content = png_bytes(300, 300, 'blue')
+        images = [
+            ProductImage.objects.create(
+                product=self.product, image=default_storage.save(f'gallery/{index}.png', ContentFile(content))
+            )
+            for index in range(2)
+        ]
+        self._run_jobs('store.render_image')
+        for image in images:
+            image.refresh_from_db()
+        renditions = {
+            path for formats in images[0].image_renditions['files'].values() for path in formats.values()
+        }
+
+        # The other image still shows the same renditions
+        images[0].delete()
+        self.assertEqual(Job.objects.get(task='store.delete_files').kwargs['paths'], [images[0].image.name])
+        self._run_jobs('store.delete_files')
+
+        images[1].delete()
+        paths = Job.objects.get(task='store.delete_files').kwargs['paths']
+        self.assertEqual(set(paths), renditions | {images[1].image.name})
+        self._run_jobs('store.delete_files')
+        self.assertFalse(any(default_storage.exists(path) for path in paths))
+
+
+class ProductImageDeleteTests(TestCase):
+    def test_delete_view_leaves_file_removal_to_the_job_worker(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        path = default_storage.save('gallery.jpg', ContentFile(b'jpeg'))
+        product = make_product(ProductCategory.objects.create(name='Drones', slug='drones'), 'drone', 1)
+        image = ProductImage.objects.create(product=product, image=path)
+        request = RequestFactory().post('/')
+        request.user = get_user_model().objects.create_superuser(
+            email='staff@example.com', password='pass12345', name='Staff'
+        )
+
+        response = views.delete_product_image(request, image.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ProductImage.objects.filter(pk=image.pk).exists())
+        self.assertTrue(default_storage.exists(path))
+        job = Job.objects.get(task='store.delete_files')
+        TASKS[job.task](**job.kwargs)
+        self.assertFalse(default_storage.exists(path))
+
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        self.customer = get_user_model().objects.create_user(
+            email='buyer@example.com', password='pass12345', name='Buyer'
+        )
+        category = ProductCategory.objects.create(name='Laptops', slug='laptops')
+        self.laptop = make_product(category, 'laptop', 5)
+        self.mouse = make_product(category, 'mouse', 1)
+
+    def test_reserve_is_all_or_nothing(self):
+        order = make_order(self.customer, [(self.laptop, 2), (self.mouse, 2)])
+        with self.assertRaises(InsufficientStock) as raised:
+            reserve_order_stock(order)
+        self.assertEqual(raised.exception.shortages[0]['product_id'], self.mouse.id)
+
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.stock, 5)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_release_and_commit(self):
+        order = make_order(self.customer, [(self.laptop, 2)])
+        reserve_order_stock(order)
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.stock, 3)
+
+        release_order_stock(order)
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.stock, 5)
+
+        # Holds already gone: committing takes the stock again
+        commit_order_stock(order)
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.stock, 3)
+
+    def test_sweeper_releases_only_expired_pending_holds(self):
+        expired = make_order(self.customer, [(self.laptop, 1)])
+        live = make_order(self.customer, [(self.laptop, 1)])
+        reserve_order_stock(expired, ttl=timedelta(minutes=-1))
+        reserve_order_stock(live)
+
+        released, settled = release_expired_reservations()
+
+        self.assertEqual((released, settled), (1, 0))
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.stock, 4)
+        self.assertEqual(list(StockReservation.objects.values_list('order', flat=True)), [live.id])
+
+
+class BulkOrderTests(TestCase):
+    # session + user, address, products, order, rollup dirty-day flag, items,
+    # stock UPDATE, catalog slugs, reservations, plus 6 savepoint statements
+    EXPECTED_QUERIES = 16
+
+    def setUp(self):
+        self.customer = get_user_model().objects.create_user(
+            email='cart@example.com', password='pass12345', name='Cart'
+        )
+        self.address = Address.objects.create(
+            user=self.customer, street_address='1 Main St', city='Kochi', state='Kerala', pincode='682001'
+        )
+        category = ProductCategory.objects.create(name='Accessories', slug='accessories')
+        self.products = [make_product(category, f'item-{index}', 10) for index in range(30)]
+        self.client.force_login(self.customer)
+
+    def _post(self, items):
+        return self.client.post(
+            '/api/orders/create-bulk/',
+            {'address_id': self.address.id, 'items': items},
+            content_type='application/json'
+        )
+
+    def test_query_count_does_not_grow_with_cart_size(self):
+        # Both requests run in the test's transaction, which flags today's rollup day once
+        for size, expected in ((1, self.EXPECTED_QUERIES), (30, self.EXPECTED_QUERIES - 1)):
+            items = [{'product_slug': product.slug, 'quantity': 2} for product in self.products[:size]]
+            with self.assertNumQueries(expected):
+                response = self._post(items)
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(len(response.json()['items']), size)
+
+        order = Order.objects.latest('id')
+        self.assertEqual(order.total_amount, Decimal('6000.00'))
+        self.assertEqual(order.item_count, 30)
+        self.assertEqual(Product.objects.get(slug='item-0').stock, 6)
+
+    def test_short_line_rejects_whole_order(self):
+        response = self._post([
+            {'product_slug': 'item-0', 'quantity': 1},
+            {'product_slug': 'item-1', 'quantity': 11},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Product.objects.get(slug='item-0').stock, 10)
+
+    def test_unknown_slug(self):
+        response = self._post([{'product_slug': 'missing', 'quantity': 1}])
+        self.assertEqual(response.status_code, 404)
+
+
+class StockReservationConcurrencyTests(TransactionTestCase):
+    """Hammer one SKU from many threads; stock must never be oversold"""
+
+    THREADS = 12
+    STOCK = 5
+
+    def setUp(self):
+        self.customer = get_user_model().objects.create_user(
+            email='flash@example.com', password='pass12345', name='Flash'
+        )
+        category = ProductCategory.objects.create(name='Phones', slug='phones')
+        self.product = make_product(category, 'phone', self.STOCK)
+        self.orders = [make_order(self.customer, [(self.product, 1)]) for _ in range(self.THREADS)]
+
+    def _checkout(self, order, barrier, outcomes):
+        try:
+            barrier.wait()
+            for _ in range(50):
+                try:
+                    reserve_order_stock(order)
+                    outcomes.append('reserved')
+                    return
+                except InsufficientStock:
+                    outcomes.append('sold_out')
+                    return
+                except OperationalError:
+                    # SQLite allows one writer at a time; retry like a client would
+                    continue
+            outcomes.append('gave_up')
+        finally:
+            connection.close()
+
+    def test_no_oversell_under_contention(self):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes = []
+        threads = [
+            threading.Thread(target=self._checkout, args=(order, barrier, outcomes))
+            for order in self.orders
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.product.refresh_from_db()
+        reserved = outcomes.count('reserved')
+        self.assertEqual(len(outcomes), self.THREADS)
+        self.assertNotIn('gave_up', outcomes)
+        self.assertEqual(reserved, self.STOCK)
+        self.assertEqual(self.product.stock, 0)
+        self.assertEqual(StockReservation.objects.count(), reserved)
+
+
+@mock.patch('ecom_project.replica.replica_configured', return_value=True)
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = replica.ReplicaRouter()
+        self.factory = RequestFactory()
+        self.set_lag(0.5)
+        self.addCleanup(replica.lag_monitor.reset)
+
+    def set_lag(self, seconds):
+        replica.lag_monitor.checked_at = time.monotonic()
+        replica.lag_monitor.lag = seconds
+
+    def read_alias(self, request):
+        @replica.read_from_replica
+        def view(request):
+            return HttpResponse(self.router.db_for_read(Product) or 'default')
+        return view(request).content.decode()
+
+    def test_marked_view_reads_from_replica(self, configured):
+        self.assertEqual(self.read_alias(self.factory.get('/')), replica.REPLICA_ALIAS)
+        self.assertIsNone(self.router.db_for_read(Product))
+
+    def test_pinned_client_reads_from_primary(self, configured):
+        request = self.factory.get('/')
+        request.COOKIES[replica.PIN_COOKIE] = '1'
+        self.assertEqual(self.read_alias(request), 'default')
+
+    def test_lagging_or_unreachable_replica_falls_back_to_primary(self, configured):
+        self.set_lag(60)
+        self.assertEqual(self.read_alias(self.factory.get('/')), 'default')
+        self.set_lag(None)
+        self.assertEqual(self.read_alias(self.factory.get('/')), 'default')
+
+    def test_reads_after_a_write_stay_on_primary(self, configured):
+        with replica.replica_reads(self.factory.get('/')):
+            self.assertEqual(self.router.db_for_read(Product), replica.REPLICA_ALIAS)
+            self.assertEqual(self.router.db_for_write(Product), 'default')
+            self.assertIsNone(self.router.db_for_read(Product))
+
+    def test_middleware_pins_clients_that_wrote(self, configured):
+        def writes(request):
+            self.router.db_for_write(Order)
+            return HttpResponse()
+
+        response = replica.ReplicaPinMiddleware(writes)(self.factory.get('/'))
+        self.assertEqual(response.cookies[replica.PIN_COOKIE]['max-age'], 15)
+        response = replica.ReplicaPinMiddleware(lambda request: HttpResponse())(self.factory.get('/'))
+        self.assertNotIn(replica.PIN_COOKIE, response.cookies)
+
+    @mock.patch('store.cache.replica_configured', return_value=True)
+    def test_catalog_rebuilds_right_after_a_bump_read_from_primary(self, cache_configured, configured):
+        catalog_cache.bump('products')
+        aliases = []
+
+        def build():
+            aliases.append(self.router.db_for_read(Product))
+            return []
+
+        with replica.replica_reads(self.factory.get('/')):
+            catalog_cache.get_or_build('test', ['products'], ['fresh'], build)
+            catalog_cache.get_or_build('test', ['services'], ['quiet'], build)
+        self.assertEqual(aliases, [None, replica.REPLICA_ALIAS])
+
+
+def cursor(link):
+    return parse_qs(urlsplit(link).query).get('cursor') if link else None
+
+
+class AsyncViewParityTests(TestCase):
+    """The async (ASGI) endpoints answer like the DRF views they mirror"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = ProductCategory.objects.create(name='Phones', slug='phones')
+        for index in range(30):
+            make_product(category, f'phone-{index}', index)
+
+    def setUp(self):
+        caches[settings.CATALOG_CACHE_ALIAS].clear()
+
+    def assertSamePage(self, sync_data, async_data):
+        self.assertEqual(async_data['results'], sync_data['results'])
+        self.assertEqual(cursor(async_data['next']), cursor(sync_data['next']))
+        self.assertEqual(cursor(async_data['previous']), cursor(sync_data['previous']))
+
+    async def test_product_list_pages_match(self):
+        query = '?category=phones&page_size=10&fields=name,slug,price'
+        sync_page = (await sync_to_async(self.client.get)('/api/products/' + query)).json()
+        async_page = (await self.async_client.get('/api/async/products/' + query)).json()
+        self.assertSamePage(sync_page, async_page)
+        self.assertEqual(len(async_page['results']), 10)
+
+        following = '?' + urlsplit(sync_page['next']).query
+        sync_next = (await sync_to_async(self.client.get)('/api/products/' + following)).json()
+        async_next = (await self.async_client.get('/api/async/products/' + following)).json()
+        self.assertSamePage(sync_next, async_next)
+
+    async def test_product_detail_and_errors_match(self):
+        for path in ('phone-3/', 'missing/'):
+            with self.subTest(path=path):
+                sync_response = await sync_to_async(self.client.get)('/api/products/' + path)
+                async_response = await self.async_client.get('/api/async/products/' + path)
+                self.assertEqual(async_response.status_code, sync_response.status_code)
+                self.assertEqual(async_response.json(), sync_response.json())
+
+        response = await self.async_client.get('/api/async/products/phone-3/')
+        response = await self.async_client.get('/api/async/products/phone-3/', headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_methods_match(self):
+        for method in ('head', 'options', 'post'):
+            for path in ('products/', 'products/phone-3/', 'technician/assigned-services/'):
+                with self.subTest(method=method, path=path):
+                    sync_response = await sync_to_async(getattr(self.client, method))('/api/' + path)
+                    async_response = await getattr(self.async_client, method)('/api/async/' + path)
+                    self.assertEqual(async_response.status_code, sync_response.status_code)
+                    if method != 'head' and sync_response.status_code != 401:
+                        self.assertEqual(async_response['Allow'], sync_response['Allow'])
+
+    async def test_technician_feed_requires_authentication(self):
+        sync_response = await sync_to_async(self.client.get)('/api/technician/assigned-services/')
+        async_response = await self.async_client.get('/api/async/technician/assigned-services/')
+        self.assertEqual(async_response.status_code, 401)
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertEqual(async_response['WWW-Authenticate'], sync_response['WWW-Authenticate'])
@@ -1,7 +1,7 @@
 # store/urls.py - Updated with technician API endpoints
 
 from django.urls import path
-from . import views
+from . import async_views, views
 from .technician_views import (
     TechnicianAssignedOrdersView,
     TechnicianAssignedServicesView, 
@@ -23,6 +23,7 @@ urlpatterns = [
 
     # API endpoints
     path('api/products/', views.ProductListAPIView.as_view(), name='api_product_list'),
+    path('api/products/search/', views.search_products_api, name='api_product_search'),
     path('api/products/<slug:slug>/', views.ProductDetailAPIView.as_view(), name='api_product_detail'),
     path('api/addresses/', views.AddressListAPIView.as_view(), name='api_address_list'),
     path('api/addresses/create/', views.AddressCreateAPIView.as_view(), name='api_address_create'),
@@ -42,6 +43,11 @@ urlpatterns = [
     path('api/technician/stats/', TechnicianStatsView.as_view(), name='api_technician_stats'),
     path('api/technician/complete-order/<int:order_id>/', CompleteOrderView.as_view(), name='api_complete_order'),
     path('api/technician/complete-service/<int:service_id>/', CompleteServiceView.as_view(), name='api_complete_service'),
+
+    # Async versions of the read-only catalog / technician feed APIs, for ASGI servers
+    path('api/async/products/', async_views.product_list, name='api_async_product_list'),
+    path('api/async/products/<slug:slug>/', async_views.product_detail, name='api_async_product_detail'),
+    path('api/async/technician/assigned-services/', async_views.technician_services, name='api_async_technician_services'),
     
     path('admin/delete-product-image/<int:image_id>/', views.delete_product_image, name='delete_product_image'),
 
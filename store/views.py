@@ -11,15 +11,36 @@ from .serializers import (
 )
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from .filters import filter_products, TRUE_VALUES
+from .facets import get_facets
+from . import cache as catalog_cache
+from . import search as product_search
+from .pagination import ProductCursorPagination
+from .technician_jobs import job_feed_response
+from .inventory import (
+    InsufficientStock, reserve_order_stock, commit_order_stock,
+    release_order_stock, restock_order,
+)
+from django.db import transaction
 from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, condition
+from django.utils.decorators import method_decorator
+from .conditional import (
+    product_list_etag, product_list_last_modified,
+    product_detail_etag, product_detail_last_modified,
+)
 from django.contrib.admin.views.decorators import staff_member_required
 from django.views.decorators.csrf import csrf_exempt
-import os
+from decimal import Decimal
 from services.models import ServiceRequest
+from ecom_project.replica import ReplicaReadMixin, read_from_replica
 
 def product_list(request):
-    products = Product.objects.filter(is_active=True)
+    products = catalog_cache.get_or_build(
+        'product_list_page', ['products'], [],
+        lambda: list(Product.objects.filter(is_active=True))
+    )
     context = {
         'products': products
     }
@@ -40,14 +61,21 @@ def buy_now(request, slug):
     if product.stock <= 0:
         return redirect('product_detail', slug=slug)
     
-    order = Order.objects.create(customer=request.user, status='PENDING')
-    
-    order_item = OrderItem.objects.create(
-        order=order,
-        product=product,
-        quantity=1,
-        price=product.price
-    )
+    try:
+        with transaction.atomic():
+            order = Order.objects.create(customer=request.user, status='PENDING')
+
+            order_item = OrderItem.objects.create(
+                order=order,
+                product=product,
+                quantity=1,
+                price=product.price
+            )
+
+            # Hold the unit while the customer picks an address and pays
+            reserve_order_stock(order, {product.id: 1})
+    except InsufficientStock:
+        return redirect('product_detail', slug=slug)
     
     return redirect('select_address', order_id=order.id)
 
@@ -80,19 +108,18 @@ def payment_page(request, order_id):
 
 @login_required
 def confirm_order(request, order_id):
-    order = get_object_or_404(Order, id=order_id, customer=request.user)
-    
-    # Reduce stock for each item
-    for item in order.items.all():
-        if item.product.stock >= item.quantity:
-            item.product.stock -= item.quantity
-            item.product.save()
-        else:
-            # Handle insufficient stock
-            return redirect('payment_page', order_id=order.id)
-    
-    order.status = 'PROCESSING'
-    order.save()
+    try:
+        with transaction.atomic():
+            # Row lock: a double submit must not confirm (and take stock) twice
+            order = get_object_or_404(Order.objects.select_for_update(), id=order_id, customer=request.user)
+            if order.status == 'PENDING':
+                # Turns the reservation into a sale, re-taking stock if it expired
+                commit_order_stock(order)
+                order.status = 'PROCESSING'
+                order.save()
+    except InsufficientStock:
+        return redirect('payment_page', order_id=order_id)
+
     return redirect('order_successful', order_id=order.id)
 
 @login_required
@@ -112,26 +139,84 @@ def update_order_status(request, order_id):
     return redirect('technician_dashboard')
 
 # API Views
-class ProductListAPIView(APIView):
+def requested_product_fields(params):
+    """Parse `?fields=` into a list of serializer fields, or None for all fields"""
+    raw = params.get('fields')
+    if not raw:
+        return None
+    requested = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = set(requested) - set(ProductSerializer.Meta.fields)
+    if unknown:
+        raise ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+    return requested
+
+
+def product_list_queryset(params, fields=None):
+    """Filtered active products, prefetching only the nested relations `fields` renders"""
+    products = Product.objects.filter(is_active=True).select_related('category')
+    products = filter_products(products, params)
+    if fields is None or {'additional_images', 'all_images'} & set(fields):
+        products = products.prefetch_related('additional_images')
+    if fields is None or 'specifications' in fields:
+        products = products.prefetch_related('specifications')
+    return products
+
+
+def product_detail_queryset():
+    return Product.objects.filter(is_active=True).select_related('category').prefetch_related('additional_images', 'specifications')
+
+
+@method_decorator(condition(etag_func=product_list_etag, last_modified_func=product_list_last_modified), name='get')
+class ProductListAPIView(ReplicaReadMixin, generics.ListAPIView):
     """
-    API view to list all active products.
+    API view to list active products.
+    Cursor-paginated, with server-side filters (see store.filters) and an
+    optional `?fields=id,name,slug,price,image` projection for listing grids.
+    `?facets=true` adds sidebar facet counts (see store.facets).
+    Supports conditional GET (see store.conditional).
     """
+    serializer_class = ProductSerializer
+    pagination_class = ProductCursorPagination
     permission_classes = [permissions.AllowAny]
-    def get(self, request, format=None):
-        products = Product.objects.filter(is_active=True).select_related('category').prefetch_related('additional_images', 'specifications')
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
 
-class ProductDetailAPIView(generics.RetrieveAPIView):
+    def get_requested_fields(self):
+        return requested_product_fields(self.request.query_params)
+
+    def get_queryset(self):
+        # Only prefetch the nested relations the response will actually render
+        return product_list_queryset(self.request.query_params, self.get_requested_fields())
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Category-filtered pages only depend on that category's products
+        data = catalog_cache.get_or_build(
+            'product_list', catalog_cache.product_list_namespaces(request.query_params),
+            # The path too: `next` / `previous` links point back at the endpoint (see store.async_views)
+            [request.get_host(), request.is_secure(), request.path, sorted(request.query_params.lists())],
+            lambda: super(ProductListAPIView, self).list(request, *args, **kwargs).data
+        )
+        if request.query_params.get('facets', '').lower() in TRUE_VALUES:
+            # Cached separately: the same counts serve every page of a filter set
+            data = {**data, 'facets': get_facets(request.query_params)}
+        return Response(data)
+
+@method_decorator(condition(etag_func=product_detail_etag, last_modified_func=product_detail_last_modified), name='get')
+class ProductDetailAPIView(ReplicaReadMixin, generics.RetrieveAPIView):
     """
     API view to get detailed product information by slug.
+    Supports conditional GET (see store.conditional).
     """
     serializer_class = ProductDetailSerializer
     lookup_field = 'slug'
     permission_classes = [permissions.AllowAny]
     
     def get_queryset(self):
-        return Product.objects.filter(is_active=True).select_related('category').prefetch_related('additional_images', 'specifications')
+        return product_detail_queryset()
     
     def get_object(self):
         slug = self.kwargs.get('slug')
@@ -141,6 +226,43 @@ class ProductDetailAPIView(generics.RetrieveAPIView):
             from django.http import Http404
             raise Http404("Product not found")
 
+    def retrieve(self, request, *args, **kwargs):
+        slug = self.kwargs.get('slug')
+        data = catalog_cache.get_or_build(
+            'product_detail', [f'product:{slug}'],
+            [request.get_host(), request.is_secure(), slug],
+            lambda: super(ProductDetailAPIView, self).retrieve(request, *args, **kwargs).data
+        )
+        return Response(data)
+
+SEARCH_RESULT_FIELDS = ['id', 'name', 'slug', 'price', 'image', 'image_srcset', 'brand', 'model_number', 'category', 'stock']
+SEARCH_MAX_LIMIT = 50
+
+@read_from_replica
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def search_products_api(request):
+    """
+    Ranked full-text product search (see store.search).
+    ?q=<terms>&limit=<1-50>; every term also matches as a prefix, so the
+    endpoint doubles as autocomplete.
+    """
+    query = request.query_params.get('q', '').strip()
+    try:
+        limit = int(request.query_params.get('limit', 20))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+    if not query:
+        return Response({'query': query, 'results': []})
+
+    products = product_search.search_products(
+        query, limit=limit, queryset=Product.objects.select_related('category')
+    )
+    serializer = ProductSerializer(products, many=True, fields=SEARCH_RESULT_FIELDS, context={'request': request})
+    return Response({'query': query, 'results': serializer.data})
+
 class AddressListAPIView(generics.ListAPIView):
     serializer_class = AddressSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -196,7 +318,7 @@ class AddressDeleteAPIView(generics.DestroyAPIView):
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class UserOrdersListView(generics.ListAPIView):
+class UserOrdersListView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -204,17 +326,23 @@ class UserOrdersListView(generics.ListAPIView):
         return Order.objects.filter(
             customer=self.request.user
         ).select_related(
-            'shipping_address', 'technician'
+            'customer', 'shipping_address', 'technician'
         ).prefetch_related(
             'items__product'
-        ).order_by('-order_date')
+        ).with_can_rate().order_by('-order_date')
 
-class OrderDetailView(generics.RetrieveAPIView):
+class OrderDetailView(ReplicaReadMixin, generics.RetrieveAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Order.objects.filter(customer=self.request.user)
+        return Order.objects.filter(
+            customer=self.request.user
+        ).select_related(
+            'customer', 'shipping_address', 'technician'
+        ).prefetch_related(
+            'items__product'
+        ).with_can_rate()
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -238,29 +366,27 @@ def create_order(request):
         product = get_object_or_404(Product, slug=product_slug, is_active=True)
         address = get_object_or_404(Address, id=address_id, user=request.user)
         
-        # Check stock
-        if product.stock < quantity:
-            return Response(
-                {'error': f'Only {product.stock} items available in stock'}, 
-                status=400
-            )
-        
-        # Create order
-        order = Order.objects.create(
-            customer=request.user,
-            status='PENDING',
-            shipping_address=address
-        )
-        
-        # Create order item
-        OrderItem.objects.create(
-            order=order,
-            product=product,
-            quantity=quantity,
-            price=product.price
-        )
-        
-        # Don't reduce stock until order is confirmed
+        try:
+            with transaction.atomic():
+                # Create order
+                order = Order.objects.create(
+                    customer=request.user,
+                    status='PENDING',
+                    shipping_address=address
+                )
+
+                # Create order item
+                OrderItem.objects.create(
+                    order=order,
+                    product=product,
+                    quantity=quantity,
+                    price=product.price
+                )
+
+                # Hold the stock until the order is confirmed or the hold expires
+                reserve_order_stock(order, {product.id: int(quantity)})
+        except InsufficientStock as e:
+            return Response({'error': str(e)}, status=400)
         
         # Serialize and return
         serializer = OrderSerializer(order)
@@ -283,44 +409,55 @@ def create_bulk_order(request):
         if not address_id or not items:
             return Response({'error': 'Items and address are required'}, status=400)
 
-        # Validate address
-        address = get_object_or_404(Address, id=address_id, user=request.user)
-
-        # Validate stock for all items first to avoid partial orders
-        validated_items = []
+        # Merge repeated slugs so each product is one line
+        quantities = {}
         for raw in items:
             product_slug = raw.get('product_slug')
-            quantity = int(raw.get('quantity', 1))
             if not product_slug:
                 return Response({'error': 'Each item must include product_slug'}, status=400)
+            try:
+                quantity = int(raw.get('quantity', 1))
+            except (TypeError, ValueError):
+                return Response({'error': f'Invalid quantity for {product_slug}'}, status=400)
+            if quantity < 1:
+                return Response({'error': f'Invalid quantity for {product_slug}'}, status=400)
+            quantities[product_slug] = quantities.get(product_slug, 0) + quantity
 
-            product = get_object_or_404(Product, slug=product_slug, is_active=True)
+        # Validate address
+        address = get_object_or_404(Address, id=address_id, user=request.user)
 
-            if product.stock < quantity:
-                return Response(
-                    {'error': f'Only {product.stock} items available in stock for {product.name}'},
-                    status=400
-                )
+        # Resolve every slug in one query
+        products = Product.objects.filter(slug__in=quantities.keys(), is_active=True).in_bulk(field_name='slug')
+        missing = [slug for slug in quantities if slug not in products]
+        if missing:
+            return Response({'error': f"Products not found: {', '.join(missing)}"}, status=404)
 
-            validated_items.append((product, quantity))
+        lines = [(products[slug], quantity) for slug, quantity in quantities.items()]
 
-        # Create the single order
-        order = Order.objects.create(
-            customer=request.user,
-            status='PENDING',
-            shipping_address=address
-        )
+        try:
+            with transaction.atomic():
+                # Totals are known up front, so the order is written once
+                # (bulk_create below skips the OrderItem signals that maintain them)
+                order = Order.objects.create(
+                    customer=request.user,
+                    status='PENDING',
+                    shipping_address=address,
+                    total_amount=sum((product.price * quantity for product, quantity in lines), Decimal('0.00')),
+                    item_count=len(lines),
+                )
 
-        # Create order items
-        for product, quantity in validated_items:
-            OrderItem.objects.create(
-                order=order,
-                product=product,
-                quantity=quantity,
-                price=product.price
-            )
+                order_items = OrderItem.objects.bulk_create([
+                    OrderItem(order=order, product=product, quantity=quantity, price=product.price)
+                    for product, quantity in lines
+                ])
 
-        serializer = OrderSerializer(order)
+                # One conditional UPDATE holds stock for every line, or none of them
+                reserve_order_stock(order, {product.id: quantity for product, quantity in lines})
+        except InsufficientStock as e:
+            return Response({'error': str(e)}, status=400)
+
+        # Serialize from the objects we already hold instead of re-reading them
+        serializer = OrderSerializer(order, context={'order_items': {order.pk: order_items}})
         return Response(serializer.data, status=201)
 
     except Exception as e:
@@ -333,22 +470,23 @@ def cancel_order(request, order_id):
     Cancel an order (only if pending/processing)
     """
     try:
-        order = get_object_or_404(Order, id=order_id, customer=request.user)
-        
-        if order.status not in ['PENDING', 'PROCESSING']:
-            return Response(
-                {'error': 'Order cannot be cancelled'}, 
-                status=400
-            )
-        
-        # If order was processing, restore stock
-        if order.status == 'PROCESSING':
-            for item in order.items.all():
-                item.product.stock += item.quantity
-                item.product.save()
-        
-        order.status = 'CANCELLED'
-        order.save()
+        with transaction.atomic():
+            order = get_object_or_404(Order.objects.select_for_update(), id=order_id, customer=request.user)
+
+            if order.status not in ['PENDING', 'PROCESSING']:
+                return Response(
+                    {'error': 'Order cannot be cancelled'},
+                    status=400
+                )
+
+            # Processing orders already took their stock; pending ones only hold it
+            if order.status == 'PROCESSING':
+                restock_order(order)
+            else:
+                release_order_stock(order)
+
+            order.status = 'CANCELLED'
+            order.save()
         
         serializer = OrderSerializer(order)
         return Response(serializer.data)
@@ -364,12 +502,7 @@ def delete_product_image(request, image_id):
         from .models import ProductImage
         image = ProductImage.objects.get(id=image_id)
         
-        # Delete the actual file
-        if image.image:
-            if os.path.isfile(image.image.path):
-                os.remove(image.image.path)
-        
-        # Delete the database record
+        # Deletes the record; the file is removed by a store.delete_files job
         image.delete()
         
         return JsonResponse({'success': True})
@@ -381,62 +514,9 @@ def delete_product_image(request, image_id):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def get_assigned_services(request):
-    """Get services assigned to technician with job sheet status"""
+    """Get services assigned to technician with job sheet status (same feed as the technician API)"""
     if request.user.role != 'TECHNICIAN':
         return Response({'error': 'Unauthorized'}, status=403)
     
-    from services.models import JobSheet
-    
-    # Get services with related data
-    services = ServiceRequest.objects.filter(
-        technician=request.user
-    ).select_related(
-        'customer', 
-        'service_category', 
-        'service_location',
-        'issue'
-    ).prefetch_related('job_sheet')  # This is important!
-    
-    services_data = []
-    for service in services:
-        # Try to get the job sheet for this service
-        try:
-            job_sheet = JobSheet.objects.get(service_request=service)
-            has_job_sheet = True
-            job_sheet_status = job_sheet.approval_status
-            job_sheet_id = job_sheet.id
-        except JobSheet.DoesNotExist:
-            has_job_sheet = False
-            job_sheet_status = None
-            job_sheet_id = None
-        
-        service_data = {
-            'id': service.id,
-            'customer': {
-                'name': service.customer.name,
-                'phone': service.customer.phone,
-            },
-            'service_category': {
-                'name': service.service_category.name,
-            },
-            'issue': {
-                'description': service.issue.description
-            } if service.issue else None,
-            'custom_description': service.custom_description,
-            'service_location': {
-                'street_address': service.service_location.street_address,
-                'city': service.service_location.city,
-                'state': service.service_location.state,
-                'pincode': service.service_location.pincode,
-            },
-            'request_date': service.request_date.isoformat(),
-            'status': service.status,
-            # Job sheet fields - FIXED
-            'has_job_sheet': has_job_sheet,
-            'job_sheet_status': job_sheet_status,
-            'job_sheet_id': job_sheet_id,
-        }
-        services_data.append(service_data)
-    
-    return Response(services_data)
+    return job_feed_response(request)
     
\ No newline at end of file
@@ -770,7 +770,7 @@ interface Product {
   id: number;
   name: string;
   slug: string;
-  description: string;
+  description?: string;
   price: string;
   image: string;
   category: {
@@ -785,14 +785,18 @@ export const StorePage: React.FC = () => {
   const { enqueueSnackbar } = useSnackbar();
   
   const products = useProductStore((state) => state.products);
+  const categoryFacets = useProductStore((state) => state.categories);
+  const nextProductsUrl = useProductStore((state) => state.nextProductsUrl);
   const fetchProducts = useProductStore((state) => state.fetchProducts);
+  const fetchMoreProducts = useProductStore((state) => state.fetchMoreProducts);
+  const searchProducts = useProductStore((state) => state.searchProducts);
   const addToCart = useCartStore((state) => state.addToCart);
   
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('All Products');
   const [activeTab, setActiveTab] = useState('All Products');
-  const [visibleProducts, setVisibleProducts] = useState(8);
   const [error, setError] = useState<string | null>(null);
   const [searchParams] = useSearchParams();
 
@@ -803,14 +807,14 @@ export const StorePage: React.FC = () => {
     delay: 300,
   });
 
-  const filteredProducts = products.filter(product => {
-    const matchesSearch = product.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         product.description.toLowerCase().includes(searchTerm.toLowerCase());
-    const matchesCategory = selectedCategory === 'All Products' || product.category.name === selectedCategory;
-    return matchesSearch && matchesCategory;
-  });
+  // The category filter runs on the server; search results span every category
+  const searching = searchTerm.trim() !== '';
+  const filteredProducts = products.filter(product =>
+    !searching || selectedCategory === 'All Products' || product.category?.name === selectedCategory
+  );
 
-  const categories = ['All Products', ...Array.from(new Set(products.map(p => p.category.name)))];
+  const categories = ['All Products', ...categoryFacets.map(c => c.name)];
+  const selectedSlug = categoryFacets.find(c => c.name === selectedCategory)?.slug;
 
   useEffect(() => {
     const catParam = searchParams.get('category');
@@ -822,20 +826,18 @@ export const StorePage: React.FC = () => {
     if (normalizedParam === 'all' || normalizedParam === normalize('All Products')) {
       setSelectedCategory('All Products');
       setActiveTab('All Products');
-      setVisibleProducts(8);
       return;
     }
 
-    const categoryNames = ['All Products', ...Array.from(new Set(products.map(p => p.category.name)))];
-    let matchName = categoryNames.find(c => normalize(c) === normalizedParam);
+    let matchName = categories.find(c => normalize(c) === normalizedParam);
 
     if (!matchName) {
-      const matchProduct = products.find(p => normalize(p.category.slug) === normalizedParam);
-      if (matchProduct) matchName = matchProduct.category.name;
+      const matchFacet = categoryFacets.find(c => normalize(c.slug) === normalizedParam);
+      if (matchFacet) matchName = matchFacet.name;
     }
 
     if (!matchName) {
-      const partialMatch = categoryNames.find(c => {
+      const partialMatch = categories.find(c => {
         const nc = normalize(c);
         return nc.includes(normalizedParam) || normalizedParam.includes(nc);
       });
@@ -845,24 +847,28 @@ export const StorePage: React.FC = () => {
     const finalMatch = matchName || 'All Products';
     setSelectedCategory(finalMatch);
     setActiveTab(finalMatch);
-    setVisibleProducts(8);
-  }, [products, searchParams]);
+  }, [categoryFacets, searchParams]);
 
   useEffect(() => {
-    const loadProducts = async () => {
+    // Debounced so typing doesn't fire a request per key
+    const timer = setTimeout(async () => {
       setLoading(true);
       setError(null);
       try {
-        await fetchProducts();
+        if (searching) {
+          await searchProducts(searchTerm.trim());
+        } else {
+          await fetchProducts(selectedSlug);
+        }
       } catch (err) {
         console.error('Error fetching products:', err);
         setError('Failed to load products. Please check your connection.');
       } finally {
-        setTimeout(() => setLoading(false), 500);
+        setLoading(false);
       }
-    };
-    loadProducts();
-  }, [fetchProducts]);
+    }, searching ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [fetchProducts, searchProducts, searchTerm, selectedSlug]);
 
   const handleAddToCart = (product: Product) => {
     addToCart(product, 1);
@@ -881,14 +887,18 @@ export const StorePage: React.FC = () => {
     navigate(`/product/${product.slug}`);
   };
 
-  const loadMoreProducts = () => {
-    setVisibleProducts(prev => prev + 8);
+  const loadMoreProducts = async () => {
+    setLoadingMore(true);
+    try {
+      await fetchMoreProducts();
+    } finally {
+      setLoadingMore(false);
+    }
   };
 
   const handleCategoryChange = (category: string) => {
     setSelectedCategory(category);
     setActiveTab(category);
-    setVisibleProducts(8);
   };
 
   return (
@@ -989,7 +999,7 @@ export const StorePage: React.FC = () => {
               </Button>
             </Box>
           ) : (
-            filteredProducts.slice(0, visibleProducts).map((product) => (
+            filteredProducts.map((product) => (
               <ProductCard key={product.id}>
                 <ProductImageArea onClick={() => handleViewDetails(product)}>
                   <img 
@@ -1042,9 +1052,9 @@ export const StorePage: React.FC = () => {
           )}
         </ProductGrid>
 
-        {!loading && !error && visibleProducts < filteredProducts.length && (
-          <LoadMoreButton onClick={loadMoreProducts}>
-            Load More Products ({filteredProducts.length - visibleProducts} remaining)
+        {!loading && !error && !searching && nextProductsUrl && (
+          <LoadMoreButton onClick={loadMoreProducts} disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load More Products'}
           </LoadMoreButton>
         )}
       </ProductsSection>
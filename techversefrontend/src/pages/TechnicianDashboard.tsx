@@ -235,16 +235,28 @@ export const TechnicianDashboard: React.FC = () => {
     checkTechnicianAccess();
   }, [isAuthenticated, checkAuthStatus, enqueueSnackbar, navigate]);
 
+  // The job feed is cursor-paginated; the tabs count and list every job, so follow `next` to the end
+  const fetchAllServiceRequests = async () => {
+    const services: ServiceRequest[] = [];
+    let url: string | null = '/api/technician/assigned-services/?page_size=200';
+    while (url) {
+      const response: { data: { results: ServiceRequest[]; next: string | null } } = await apiClient.get(url);
+      services.push(...response.data.results);
+      url = response.data.next;
+    }
+    return services;
+  };
+
   const fetchDashboardData = async () => {
     setLoading(true);
     try {
-      const [ordersRes, servicesRes, statsRes] = await Promise.all([
+      const [ordersRes, services, statsRes] = await Promise.all([
         apiClient.get('/api/technician/assigned-orders/'),
-        apiClient.get('/api/technician/assigned-services/'),
+        fetchAllServiceRequests(),
         apiClient.get('/api/technician/stats/'),
       ]);
       setOrders(ordersRes.data);
-      setServiceRequests(servicesRes.data);
+      setServiceRequests(services);
       setStats(statsRes.data);
     } catch (error) {
       enqueueSnackbar('Failed to load dashboard data', { variant: 'error' });
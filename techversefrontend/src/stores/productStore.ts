@@ -9,7 +9,7 @@ interface Product {
   id: number;
   name: string;
   slug: string;
-  description: string;
+  description?: string;
   price: string;
   image: string;
   category: {
@@ -19,6 +19,13 @@ interface Product {
   };
 }
 
+// A category tab, with its product count, from the catalog facets
+interface CategoryFacet {
+  slug: string;
+  name: string;
+  count: number;
+}
+
 // Define the shape of an address
 interface Address {
   id: number;
@@ -32,28 +39,73 @@ interface Address {
 // Define the shape of our store's state
 interface ProductState {
   products: Product[];
+  categories: CategoryFacet[];
+  nextProductsUrl: string | null;
   addresses: Address[];
-  fetchProducts: () => Promise<void>;
+  fetchProducts: (category?: string) => Promise<void>;
+  fetchMoreProducts: () => Promise<void>;
+  searchProducts: (query: string) => Promise<void>;
   fetchAddresses: () => Promise<void>;
 }
 
 // Create the store
-export const useProductStore = create<ProductState>((set) => ({
+// Only what the grid renders, one page per request (see ProductListAPIView)
+const GRID_FIELDS = 'id,name,slug,description,price,image,image_srcset,category';
+const PRODUCTS_URL = 'http://127.0.0.1:8000/api/products/';
+
+interface ProductPage {
+  results: Product[];
+  next: string | null;
+  facets?: { category: CategoryFacet[] };
+}
+
+// Create the store
+export const useProductStore = create<ProductState>((set, get) => ({
   products: [],
+  categories: [],
+  nextProductsUrl: null,
   addresses: [],
-  fetchProducts: async () => {
+  fetchProducts: async (category) => {
     try {
-      console.log('Fetching products...');
       // Use direct axios for public endpoints
-      const response = await axios.get('http://127.0.0.1:8000/api/products/', {
-        timeout: 5000
-      });
-      console.log('Products response:', response.data);
-      set({ products: response.data });
+      // First page of one category tab, filtered server-side; the tabs themselves
+      // come from the category facet, fetched with the first page only
+      const params: Record<string, string> = { fields: GRID_FIELDS, page_size: '24' };
+      if (category) params.category = category;
+      if (get().categories.length === 0) params.facets = 'true';
+      const response: { data: ProductPage } = await axios.get(PRODUCTS_URL, { params, timeout: 5000 });
+      set({ products: response.data.results, nextProductsUrl: response.data.next });
+      if (response.data.facets) set({ categories: response.data.facets.category });
     } catch (error) {
       console.error("Failed to fetch products:", error);
       // Set empty array on error so UI shows "no products" instead of loading forever
-      set({ products: [] });
+      set({ products: [], nextProductsUrl: null });
+    }
+  },
+  fetchMoreProducts: async () => {
+    const url = get().nextProductsUrl;
+    if (!url) return;
+    try {
+      const response: { data: ProductPage } = await axios.get(url, { timeout: 5000 });
+      set((state) => ({
+        products: [...state.products, ...response.data.results],
+        nextProductsUrl: response.data.next,
+      }));
+    } catch (error) {
+      console.error("Failed to fetch more products:", error);
+    }
+  },
+  searchProducts: async (query) => {
+    try {
+      // Ranked full-text search over the whole catalog (one page of best matches)
+      const response: { data: { results: Product[] } } = await axios.get(`${PRODUCTS_URL}search/`, {
+        params: { q: query, limit: 50 },
+        timeout: 5000
+      });
+      set({ products: response.data.results, nextProductsUrl: null });
+    } catch (error) {
+      console.error("Failed to search products:", error);
+      set({ products: [], nextProductsUrl: null });
     }
   },
   fetchAddresses: async () => {
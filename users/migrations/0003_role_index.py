@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_customuser_free_service_categories'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['role', 'name'], name='user_role_name_idx'),
+        ),
+    ]
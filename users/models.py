@@ -66,6 +66,12 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Technician pickers and role-filtered admin lists
+            models.Index(fields=['role', 'name'], name='user_role_name_idx'),
+        ]
+
     def __str__(self):
         return self.email
     
@@ -3,7 +3,6 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
-from django.db.models import Avg
 from django.http import JsonResponse, HttpResponse
 from django.middleware.csrf import get_token 
 from django.contrib.auth import get_user_model
@@ -22,6 +21,7 @@ from .forms import CustomerRegistrationForm, AddressForm
 from .serializers import UserSerializer, UserProfileUpdateSerializer
 from store.models import Order
 from services.models import ServiceRequest, TechnicianRating
+from services.technician_stats import technician_stats
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from allauth.socialaccount.providers.google.views import oauth2_login
@@ -68,15 +68,12 @@ def technician_dashboard(request):
         return redirect('product_list')
     
     technician = request.user
-    completed_orders = Order.objects.filter(technician=technician, status='DELIVERED').count()
-    completed_services = ServiceRequest.objects.filter(technician=technician, status='COMPLETED').count()
-    total_jobs = completed_orders + completed_services
-    ratings = TechnicianRating.objects.filter(technician=technician).order_by('-created_at')
-    average_rating = ratings.aggregate(Avg('rating'))
+    stats = technician_stats(technician)
+    ratings = TechnicianRating.objects.filter(technician=technician).select_related('customer').order_by('-created_at')
     
     context = {
-        'total_jobs': total_jobs,
-        'average_rating': average_rating['rating__avg'],
+        'total_jobs': stats.completed_jobs,
+        'average_rating': stats.average_rating,
         'ratings': ratings,
     }
     return render(request, 'users/technician_dashboard.html', context)